@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark do custo de montagem da crew por análise
+=====================================================
+
+Compara a montagem de uma crew por análise antes e depois da CrewFactory:
+
+- config: leitura e validação do crew_config.yaml (build_crew_template) contra
+  o template em cache por processo (load_crew_template)
+- crew: CodebaseAnalysisCrewV2 montada do zero (YAML, validação e cache de
+  respostas aberto a cada análise, como antes) contra CrewFactory.create com
+  release (API key, tools sem repositório e LLMs dos agentes reaproveitados)
+- agent/task: custo que continua por análise, a criação dos Agent e Task do
+  CrewAI (parte de CrewFactory.create)
+
+Nenhuma chamada ao LLM é feita; sem GEMINI_API_KEY uma chave fictícia é usada.
+A etapa "crew" exige o CrewAI instalado.
+
+Uso:
+    python benchmarks/bench_crew_setup.py [--repeat N] [--repo DIRETORIO]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.crew_factory import (  # noqa: E402
+    CONFIG_PATH,
+    build_crew_template,
+    clear_template_cache,
+    load_crew_template,
+)
+
+
+def run(label: str, func, repeat: int) -> float:
+    """Executa func repeat vezes e imprime a mediana; devolve a mediana em segundos"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    median = statistics.median(timings)
+    print(f"{label:<36} {median * 1000:10.2f} ms/análise  (min {min(timings) * 1000:.2f} ms)")
+    return median
+
+
+def compare(before: float, after: float) -> None:
+    if after:
+        print(f"🚀 Speedup: {before / after:.1f}x\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=20, help="Análises simuladas por etapa")
+    parser.add_argument("--repo", help="Repositório ao qual as tools são ligadas")
+    args = parser.parse_args()
+
+    print("📄 Configuração")
+    before = run(
+        "build_crew_template (por análise)", lambda: build_crew_template(CONFIG_PATH), args.repeat
+    )
+    load_crew_template()
+    after = run("load_crew_template (em cache)", load_crew_template, args.repeat)
+    compare(before, after)
+
+    try:
+        from src.crew_avaliadora import CodebaseAnalysisCrewV2, CrewFactory
+    except ImportError as e:
+        print(f"⚠️ Etapa 'crew' ignorada: {e}")
+        return
+
+    os.environ.setdefault("GEMINI_API_KEY", "bench-sem-chamadas-ao-llm")
+    with tempfile.TemporaryDirectory(prefix="bench_crew_") as temp_dir:
+        repo = args.repo or temp_dir
+
+        def fresh_crew():
+            clear_template_cache()
+            CodebaseAnalysisCrewV2(repo_path=repo)
+
+        print("🤝 Crew")
+        before = run("CodebaseAnalysisCrewV2 (do zero)", fresh_crew, args.repeat)
+        factory = CrewFactory()
+        factory.release(factory.create(repo_path=repo))
+        after = run(
+            "CrewFactory.create + release",
+            lambda: factory.release(factory.create(repo_path=repo)),
+            args.repeat,
+        )
+        compare(before, after)
+
+        crew = factory.create(repo_path=repo)
+
+        def agents_and_tasks():
+            crew.agents = crew._create_agents_from_config()
+            crew.tasks = crew._create_tasks_from_config()
+
+        print("🧩 Agent/Task (restante por análise)")
+        remaining = run("Agent + Task do CrewAI", agents_and_tasks, args.repeat)
+        if after:
+            print(f"📐 {remaining / after:.0%} de CrewFactory.create\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark do scanner do quick_report
+=======================================
+
+Compara a varredura original (os.walk + Path.stat) com o motor baseado em
+os.scandir, sequencial e com pool de threads, medindo arquivos/segundo.
+
+Uso:
+    python benchmarks/bench_scan.py [diretorio] [--files N] [--repeat N]
+
+Sem diretório, gera uma árvore sintética temporária com N arquivos.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.quick_report import (  # noqa: E402
+    IGNORE_EXTENSIONS,
+    IGNORE_FOLDERS,
+    MAX_FILE_SIZE,
+    scan_directory,
+)
+
+
+def legacy_scan_directory(base_path: str) -> dict:
+    """Implementação original (os.walk) preservada apenas para comparação"""
+    stats: dict[str, Any] = {
+        "total_files": 0,
+        "total_size": 0,
+        "by_extension": defaultdict(lambda: {"count": 0, "size": 0}),
+        "by_directory": defaultdict(lambda: {"count": 0, "size": 0}),
+        "files": [],
+    }
+    base = Path(base_path)
+    for root, dirs, files in os.walk(base):
+        dirs[:] = [d for d in dirs if d not in IGNORE_FOLDERS]
+        rel_root = Path(root).relative_to(base)
+        for filename in files:
+            filepath = Path(root) / filename
+            if filepath.suffix.lower() in IGNORE_EXTENSIONS:
+                continue
+            try:
+                size = filepath.stat().st_size
+                if size > MAX_FILE_SIZE:
+                    continue
+                stats["total_files"] += 1
+                stats["total_size"] += size
+                ext = filepath.suffix or "no_extension"
+                stats["by_extension"][ext]["count"] += 1
+                stats["by_extension"][ext]["size"] += size
+                dir_name = str(rel_root) if str(rel_root) != "." else "root"
+                stats["by_directory"][dir_name]["count"] += 1
+                stats["by_directory"][dir_name]["size"] += size
+                stats["files"].append(
+                    {"path": str(filepath.relative_to(base)), "size": size, "ext": ext}
+                )
+            except Exception as e:
+                print(f"⚠️ Erro ao processar {filepath}: {e}", file=sys.stderr)
+    return stats
+
+
+def build_synthetic_tree(root: Path, num_files: int, files_per_dir: int = 50) -> None:
+    """Cria uma árvore com diretórios aninhados e extensões variadas"""
+    extensions = [".py", ".js", ".md", ".json", ".txt", ".log"]
+    for i in range(num_files):
+        d = root / f"pkg{i // (files_per_dir * 20)}" / f"mod{i // files_per_dir}"
+        if i % files_per_dir == 0:
+            d.mkdir(parents=True, exist_ok=True)
+        (d / f"file{i}{extensions[i % len(extensions)]}").write_bytes(b"x" * (i % 4096))
+
+
+def run(label: str, func, path: str, repeat: int) -> float:
+    best = float("inf")
+    total = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stats = func(path)
+        best = min(best, time.perf_counter() - start)
+        total = stats["total_files"]
+    rate = total / best if best else 0.0
+    print(f"{label:<28} {total:>9} arquivos  {best:8.3f}s  {rate:12,.0f} arquivos/s")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("path", nargs="?", help="Diretório a escanear")
+    parser.add_argument("--files", type=int, default=20000, help="Arquivos da árvore sintética")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições (usa a melhor)")
+    args = parser.parse_args()
+
+    temp_dir = None
+    path = args.path
+    if path is None:
+        temp_dir = tempfile.mkdtemp(prefix="bench_scan_")
+        print(f"🏗️ Gerando {args.files} arquivos em {temp_dir}...")
+        build_synthetic_tree(Path(temp_dir), args.files)
+        path = temp_dir
+
+    try:
+        baseline = run("os.walk (original)", legacy_scan_directory, path, args.repeat)
+        run(
+            "os.scandir (1 worker)",
+            lambda p: scan_directory(p, workers=1, hash_contents=False),
+            path,
+            args.repeat,
+        )
+        rate = run(
+            "os.scandir (pool)",
+            lambda p: scan_directory(p, hash_contents=False),
+            path,
+            args.repeat,
+        )
+        if baseline:
+            print(f"\n🚀 Speedup do pool: {rate / baseline:.2f}x")
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+⏱️ Suíte de benchmarks do quick_report
+======================================
+
+Gera árvores sintéticas (10k, 100k e 1M arquivos; layouts "wide" e "deep";
+tamanhos variados, binários, minificados e arquivos acima de MAX_FILE_SIZE) e
+mede cada estágio em um processo separado:
+
+- scan: scan_directory (listagem + hash + classificação)
+- excerpt: trechos dos arquivos de código selecionados para o relatório
+- report: build_report completo (relatório, artefato e índice de imports em disco)
+
+Para cada cenário registra tempo de parede, arquivos/segundo e pico de RSS do
+processo do estágio em um JSON. Com --baseline, compara com uma execução
+anterior e termina com código 1 se algum estágio regredir além de --threshold.
+
+Uso:
+    python benchmarks/bench_suite.py [--sizes 10k,100k] [--layouts wide,deep]
+        [--output resultados.json] [--baseline baseline.json] [--threshold 0.25]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+LAYOUTS = ("wide", "deep")
+STAGES = ("scan", "excerpt", "report")
+DEFAULT_SIZES = "10k"
+DEFAULT_THRESHOLD = 0.25
+
+# Conteúdo representativo por tipo de arquivo gerado
+_PY_TEMPLATE = (
+    '"""Módulo {i}"""\n\nimport os\nfrom pkg{dep} import mod{dep}\n\n\n'
+    "class Service{i}:\n    def run(self, value):\n        return os.path.join(str(value), 'x')\n"
+)
+_JS_TEMPLATE = "export function handler{i}(req) {{\n  return req.body;\n}}\n"
+_MINIFIED = "var a=1,b=2;function c(){return a+b}" * 64
+_BINARY = bytes(range(256)) * 4
+
+
+def parse_size(text: str) -> int:
+    """Converte "10k", "1m" ou "2500" em número de arquivos"""
+    text = text.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * multiplier)
+
+
+def _directory(i: int, layout: str, files_per_dir: int) -> Path:
+    bucket = i // files_per_dir
+    if layout == "deep":
+        # Cadeias de até 12 níveis com poucos arquivos por diretório
+        parts = [f"d{bucket % 7}", *(f"n{(bucket // 7) % 3}_{level}" for level in range(12))]
+        return Path(*parts[: 2 + bucket % 11], f"leaf{bucket}")
+    return Path(f"pkg{bucket // 100}", f"mod{bucket}")
+
+
+def build_tree(root: Path, num_files: int, layout: str = "wide", seed: int = 42) -> None:
+    """Cria a árvore sintética com mistura de código, texto, binários e arquivos grandes"""
+    rng = random.Random(seed)
+    files_per_dir = 200 if layout == "wide" else 8
+    created: set[Path] = set()
+    (root / "README.md").parent.mkdir(parents=True, exist_ok=True)
+    (root / "README.md").write_text("# Repositório sintético\n")
+    (root / "main.py").write_text("from pkg0 import mod0\n\nmod0.run()\n")
+
+    for i in range(num_files):
+        directory = root / _directory(i, layout, files_per_dir)
+        if directory not in created:
+            directory.mkdir(parents=True, exist_ok=True)
+            created.add(directory)
+
+        roll = rng.random()
+        if roll < 0.35:
+            path = directory / f"mod{i}.py"
+            path.write_text(_PY_TEMPLATE.format(i=i, dep=rng.randrange(max(1, i // 1000 + 1))))
+        elif roll < 0.60:
+            path = directory / f"handler{i}.js"
+            path.write_text(_JS_TEMPLATE.format(i=i) * rng.randint(1, 40))
+        elif roll < 0.65:
+            (directory / f"bundle{i}.min.js").write_text(_MINIFIED)
+        elif roll < 0.70:
+            (directory / f"asset{i}.png").write_bytes(_BINARY)
+        elif roll < 0.705:
+            # Acima de MAX_FILE_SIZE: fica fora dos totais, mas entra na amostragem
+            (directory / f"big{i}.js").write_bytes(b"// big\n" * 180_000)
+        else:
+            (directory / f"notes{i}.md").write_text("texto\n" * rng.randint(1, 200))
+
+
+def _peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KiB; macOS em bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _run_stage(stage: str, tree: str, workdir: str) -> dict:
+    """Executa um estágio em um processo novo (o pico de RSS é só deste estágio)"""
+    from src import quick_report
+
+    # Índice de hash vazio: mede o custo a frio, sem reaproveitar execuções anteriores
+    quick_report.HASH_INDEX_PATH = Path(workdir) / "hash_index.sqlite3"
+    devnull = open(os.devnull, "w")  # noqa: SIM115
+    stdout, sys.stdout = sys.stdout, devnull
+    try:
+        if stage == "scan":
+            start = time.perf_counter()
+            stats = quick_report.scan_directory(tree)
+            elapsed = time.perf_counter() - start
+            files = stats["total_files"] + len(stats["large_files"])
+        elif stage == "excerpt":
+            stats = quick_report.scan_directory(tree, hash_contents=False)
+            targets = quick_report.select_code_files(stats, limit=500)
+            targets += quick_report.python_files(stats)[:500]
+            start = time.perf_counter()
+            for info in targets:
+                quick_report.read_file_content(Path(tree) / info["path"], max_lines=80)
+            elapsed = time.perf_counter() - start
+            files = len(targets)
+        else:
+            output = Path(workdir) / "report.md"
+            start = time.perf_counter()
+            result = quick_report.build_report(tree, output_file=output, use_manifest=False)
+            elapsed = time.perf_counter() - start
+            files = result.stats["total_files"] + len(result.stats["large_files"])
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+
+    return {
+        "wall_time": round(elapsed, 4),
+        "files": files,
+        "files_per_sec": round(files / elapsed, 1) if elapsed else 0.0,
+        "peak_rss_mb": round(_peak_rss_bytes() / (1024 * 1024), 1),
+    }
+
+
+def measure(stage: str, tree: Path, repeat: int) -> dict:
+    """Melhor de `repeat` execuções do estágio, cada uma em processo isolado"""
+    best: dict | None = None
+    for _ in range(repeat):
+        workdir = tempfile.mkdtemp(prefix="bench_stage_")
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                result = pool.submit(_run_stage, stage, str(tree), workdir).result()
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        if best is None or result["wall_time"] < best["wall_time"]:
+            best = result
+    assert best is not None
+    return best
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Lista de regressões (tempo de parede acima de baseline * (1 + threshold))"""
+    regressions = []
+    previous = baseline.get("scenarios", {})
+    for scenario, stages in results["scenarios"].items():
+        for stage, metrics in stages.items():
+            reference = previous.get(scenario, {}).get(stage)
+            if not reference or not reference.get("wall_time"):
+                continue
+            ratio = metrics["wall_time"] / reference["wall_time"]
+            if ratio > 1 + threshold:
+                regressions.append(
+                    f"{scenario}/{stage}: {reference['wall_time']:.3f}s -> "
+                    f"{metrics['wall_time']:.3f}s (+{(ratio - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Ex.: 10k,100k,1m")
+    parser.add_argument("--layouts", default=",".join(LAYOUTS), help="wide, deep ou ambos")
+    parser.add_argument("--stages", default=",".join(STAGES), help="scan, excerpt, report")
+    parser.add_argument("--repeat", type=int, default=1, help="Repetições (usa a melhor)")
+    parser.add_argument("--output", default="benchmarks/results.json", help="JSON de saída")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparar")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Regressão tolerada no tempo de parede (0.25 = 25%%)",
+    )
+    parser.add_argument("--keep", action="store_true", help="Mantém as árvores geradas")
+    args = parser.parse_args()
+
+    layouts = [layout.strip() for layout in args.layouts.split(",")]
+    stages = [stage.strip() for stage in args.stages.split(",")]
+    results = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "scenarios": {},
+    }
+
+    root = Path(tempfile.mkdtemp(prefix="bench_suite_"))
+    try:
+        for size_text in args.sizes.split(","):
+            num_files = parse_size(size_text)
+            for layout in layouts:
+                scenario = f"{size_text.strip()}-{layout}"
+                tree = root / scenario
+                print(f"🏗️ {scenario}: gerando {num_files:,} arquivos...")
+                start = time.perf_counter()
+                build_tree(tree, num_files, layout)
+                print(f"   árvore pronta em {time.perf_counter() - start:.1f}s")
+
+                results["scenarios"][scenario] = {}
+                for stage in stages:
+                    metrics = measure(stage, tree, args.repeat)
+                    results["scenarios"][scenario][stage] = metrics
+                    print(
+                        f"   {stage:<8} {metrics['wall_time']:8.3f}s "
+                        f"{metrics['files_per_sec']:12,.0f} arquivos/s "
+                        f"{metrics['peak_rss_mb']:8.1f} MB RSS"
+                    )
+                if not args.keep:
+                    shutil.rmtree(tree, ignore_errors=True)
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+        else:
+            print(f"📁 Árvores mantidas em {root}")
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Resultados: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ Regressões acima de {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"   - {line}")
+            sys.exit(1)
+        print(f"✅ Sem regressões acima de {args.threshold:.0%} em relação a {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
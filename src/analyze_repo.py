@@ -8,8 +8,17 @@ Fluxo completo:
 2. Gera relatório base
 3. Executa análise CrewAI
 4. Organiza outputs na pasta outputs/
+
+Cada estágio e cada task da crew ficam registrados em outputs/runs/<run_id>;
+se a execução falhar, `--resume <run_id>` retoma de onde parou.
+
+Uso:
+    python src/analyze_repo.py <repo_url>
+    python src/analyze_repo.py --resume <run_id>
+    python src/analyze_repo.py <repo_url> --no-llm-cache   # ignora o cache de respostas
 """
 
+import argparse
 import logging
 import os
 import shutil
@@ -19,13 +28,46 @@ import tempfile
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.clone_cache import Checkout, CloneCache, CloneCacheError  # noqa: E402
+from src.diff_pipeline import DEFAULT_MAX_DIFF_CHARS, build_diff_context, resolve_ref  # noqa: E402
+from src.metrics import MetricsRecorder  # noqa: E402
+from src.quick_report import (  # noqa: E402
+    ReportResult,
+    ReportTimeoutError,
+    build_report,
+    default_token_budget,
+)
+from src.run_checkpoint import (  # noqa: E402
+    BASE_REPORT_FILE,
+    STAGE_BASE_REPORT,
+    STAGE_CLONE,
+    STAGE_CREW,
+    CheckpointError,
+    RunCheckpoint,
+    config_hash,
+)
+from src.sparse_clone import CLONE_FULL, clone_args, run_git, sparse_checkout  # noqa: E402
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
+# Tempo máximo do relatório base (segundos, verificado entre seções)
+REPORT_TIMEOUT = 300
+# Reaproveita mirrors em outputs/cache/mirrors em vez de clonar a cada execução
+USE_CLONE_CACHE = os.environ.get("CREW_CLONE_CACHE", "1") != "0"
+# Modo de clone (full, partial ou blobless; ver src/sparse_clone.py)
+CLONE_MODE = os.environ.get("CREW_CLONE_MODE", CLONE_FULL)
+# Arquivo .prom opcional (ex.: diretório do textfile collector do node_exporter)
+METRICS_PROMETHEUS_PATH = os.environ.get("CREW_METRICS_PROMETHEUS")
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "crew_config.yaml"
 
-def clone_repository(repo_url: str, target_dir: str, depth: int = 1) -> bool:
-    """Clone repositório do GitHub"""
+
+def clone_repository(
+    repo_url: str, target_dir: str, depth: int = 1, mode: str = CLONE_FULL
+) -> bool:
+    """Clone repositório do GitHub (mode partial/blobless usa clone parcial + sparse)"""
     try:
         logger.info(f"📥 Clonando repositório: {repo_url}")
         git_path = shutil.which("git")
@@ -33,13 +75,15 @@ def clone_repository(repo_url: str, target_dir: str, depth: int = 1) -> bool:
             logger.error("❌ Git não encontrado")
             return False
 
-        cmd = [git_path, "clone", repo_url, target_dir]
+        cmd = [git_path, "clone", *clone_args(mode), repo_url, target_dir]
         if depth > 0:
             cmd.extend(["--depth", str(depth)])
 
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)  # nosec
 
         if result.returncode == 0:
+            if mode != CLONE_FULL:
+                sparse_checkout(target_dir, mode)
             logger.info("✅ Repositório clonado com sucesso")
             return True
         else:
@@ -51,79 +95,97 @@ def clone_repository(repo_url: str, target_dir: str, depth: int = 1) -> bool:
         return False
 
 
-def get_git_diff(repo_path: str, base_ref: str, head_ref: str) -> str:
-    """Obtém o diff entre duas referências git"""
+def checkout_repository(
+    repo_url: str,
+    project_name: str,
+    depth: int = 1,
+    use_cache: bool = USE_CLONE_CACHE,
+    mode: str = CLONE_MODE,
+    ref: str | None = None,
+) -> Checkout | None:
+    """
+    Disponibiliza um checkout do repositório para análise.
+
+    Usa o cache de mirrors (fetch incremental + worktree, com histórico completo)
+    e, se ele falhar ou estiver desativado, um clone em diretório temporário.
+    Com ref (ex.: commit de uma execução retomada) o checkout fica fixo nela.
+
+    Returns:
+        Checkout (chamar release() ao final) ou None se o clone falhar
+    """
+    prefix = f"crew_analysis_{project_name}_"
+    if use_cache:
+        try:
+            return CloneCache(mode=mode).checkout(repo_url, ref=ref or "HEAD", prefix=prefix)
+        except CloneCacheError as e:
+            logger.warning(f"⚠️ Cache de clones indisponível, clonando do zero: {e}")
+
+    temp_dir = tempfile.mkdtemp(prefix=prefix)
+    # Um ref arbitrário pode não estar no clone raso
+    if not clone_repository(repo_url, temp_dir, depth=0 if ref else depth, mode=mode):
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return None
+    if ref:
+        try:
+            run_git("checkout", "--quiet", "--detach", ref, cwd=temp_dir)
+        except subprocess.CalledProcessError as e:
+            logger.error(f"❌ Ref {ref} não encontrada: {(e.stderr or '').strip()}")
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return None
+    return Checkout(Path(temp_dir))
+
+
+def get_git_diff(
+    repo_path: str, base_ref: str, head_ref: str, max_chars: int = DEFAULT_MAX_DIFF_CHARS
+) -> str:
+    """Obtém o diff entre duas referências git (priorizado por risco, até max_chars)"""
     try:
         logger.info(f"🔍 Obtendo diff entre {base_ref} e {head_ref}...")
-
-        git_path = shutil.which("git")
-        if not git_path:
-            logger.error("❌ Git não encontrado")
-            return ""
-
-        # Fetch se necessário (se clonado com depth 1, pode não ter histórico suficiente)
-        # Mas assumindo que o usuário fornece refs válidas que existem no clone
-
-        # Garante que temos as refs
-        subprocess.run([git_path, "fetch", "--all"], cwd=repo_path, capture_output=True)  # nosec
-
-        result = subprocess.run(
-            [git_path, "diff", base_ref, head_ref],
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            timeout=60,
-        )  # nosec
-
-        if result.returncode == 0:
-            diff_content = result.stdout
-            logger.info(f"✅ Diff obtido ({len(diff_content)} chars)")
-            return diff_content
-        else:
-            logger.error(f"❌ Erro ao obter diff: {result.stderr}")
+        context = build_diff_context(repo_path, base_ref, head_ref, max_chars=max_chars)
+        if not context.entries:
+            logger.info("ℹ️ Nenhuma alteração entre as referências")
             return ""
+        if context.omitted:
+            logger.info(f"✂️ {len(context.omitted)} arquivos sem diff no contexto (limite)")
+        logger.info(f"✅ Diff obtido ({len(context.text)} chars)")
+        return context.text
 
     except Exception as e:
         logger.error(f"❌ Erro ao obter diff: {e}")
         return ""
 
 
-def generate_base_report(repo_path: str, output_file: str) -> bool:
-    """Gera relatório base da codebase"""
+def generate_base_report(
+    repo_path: str,
+    output_file: str,
+    timeout: float | None = REPORT_TIMEOUT,
+    in_worker: bool = False,
+) -> ReportResult | None:
+    """Gera relatório base da codebase (em processo ou, com in_worker, em um processo filho)"""
     try:
         logger.info("📊 Gerando relatório base...")
 
-        # Usa quick report (mais rápido)
-        quick_report_path = Path(__file__).parent / "quick_report.py"
-        if not quick_report_path.exists():
-            logger.error(f"❌ Script não encontrado: {quick_report_path}")
-            return False
-
-        # Executa gerador rápido
-        result = subprocess.run(
-            [sys.executable, str(quick_report_path), repo_path, output_file],
-            capture_output=True,
-            text=True,
-            timeout=60,  # Apenas 60 segundos
-        )  # nosec
-
-        if result.returncode != 0:
-            logger.error(f"❌ Erro ao gerar relatório: {result.stderr}")
-            logger.error(f"stdout: {result.stdout}")
-            return False
-
-        # Verifica que arquivo foi criado
-        if os.path.exists(output_file):
-            size = os.path.getsize(output_file)
-            logger.info(f"✅ Relatório base gerado: {output_file} ({size:,} bytes)")
-            return True
-        else:
-            logger.error("❌ Relatório não foi gerado")
-            return False
-
+        result = build_report(
+            repo_path,
+            output_file,
+            token_budget=default_token_budget(),
+            timeout=timeout,
+            in_worker=in_worker,
+        )
+
+        size = os.path.getsize(output_file)
+        logger.info(
+            f"✅ Relatório base gerado: {output_file} ({size:,} bytes, "
+            f"{result.stats['total_files']} arquivos, {result.elapsed:.1f}s)"
+        )
+        return result
+
+    except ReportTimeoutError as e:
+        logger.error(f"❌ Tempo limite do relatório base: {e}")
+        return None
     except Exception as e:
         logger.error(f"❌ Erro: {e}")
-        return False
+        return None
 
 
 def run_crewai_analysis(
@@ -132,30 +194,57 @@ def run_crewai_analysis(
     project_name: str,
     repo_path: str | None = None,
     diff_content: str | None = None,
+    report: ReportResult | None = None,
+    metrics: MetricsRecorder | None = None,
+    checkpoint: RunCheckpoint | None = None,
+    bypass_llm_cache: bool = False,
 ) -> bool:
-    """Executa análise CrewAI"""
+    """
+    Executa análise CrewAI (usa o texto de report em memória, se informado).
+
+    Com checkpoint, cada task concluída é gravada e as já gravadas são puladas.
+    Com bypass_llm_cache, nenhuma resposta do LLM vem do cache (as novas são gravadas).
+    """
     try:
         logger.info("🚀 Iniciando análise CrewAI...")
 
         # Importa e executa crew
         sys.path.insert(0, str(Path(__file__).parent.parent))
-        from src.crew_avaliadora import CodebaseAnalysisCrewV2
+        from src.crew_avaliadora import get_crew_factory
 
-        # Lê relatório base
-        with open(base_report, encoding="utf-8") as f:
-            codebase_report = f.read()
+        # Usa o relatório em memória; lê do disco apenas se não foi informado
+        if report is not None:
+            codebase_report = report.text
+        else:
+            with open(base_report, encoding="utf-8") as f:
+                codebase_report = f.read()
 
         # Prepara output
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_file = os.path.join(output_dir, f"relatorio_final_{project_name}_{timestamp}.md")
 
         # Executa análise
-        crew = CodebaseAnalysisCrewV2(repo_path=repo_path)
-        crew.analyze_codebase(codebase_report, output_file, diff_content=diff_content)
+        metrics = metrics or MetricsRecorder(project_name)
+        factory = get_crew_factory()
+        with metrics.stage("crew.setup"):
+            # Configuração, API key, cache e LLMs dos agentes são preparados uma vez por processo
+            crew = factory.create(repo_path=repo_path, bypass_llm_cache=bypass_llm_cache)
+        try:
+            crew.analyze_codebase(
+                codebase_report,
+                output_file,
+                diff_content=diff_content,
+                metrics=metrics,
+                checkpoint=checkpoint,
+            )
+        finally:
+            factory.release(crew)
 
         if os.path.exists(output_file):
             file_size = os.path.getsize(output_file)
             logger.info(f"✅ Análise completa: {output_file} ({file_size:,} bytes)")
+            if checkpoint is not None:
+                checkpoint.complete(STAGE_CREW, report=output_file)
             return True
         else:
             logger.error("❌ Relatório final não foi gerado")
@@ -169,14 +258,46 @@ def run_crewai_analysis(
         return False
 
 
+def current_config_hash() -> str:
+    """Hash da configuração que afeta os resultados (YAML da crew, modelo e modo de clone)"""
+    return config_hash(CONFIG_PATH, os.environ.get("MODEL", ""), CLONE_MODE)
+
+
 def main():
     """Função principal"""
-    if len(sys.argv) < 2:
-        print("Uso: python analyze_repo.py <repo_url>")
-        print("Exemplo: python analyze_repo.py https://github.com/user/repo")
-        sys.exit(1)
-
-    repo_url = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Análise completa de repositório")
+    parser.add_argument("repo_url", nargs="?", help="Ex.: https://github.com/user/repo")
+    parser.add_argument(
+        "--resume", metavar="RUN_ID", help="Retoma uma execução (outputs/runs/<run_id>)"
+    )
+    parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help="Não reaproveita respostas do LLM (as novas continuam sendo gravadas no cache)",
+    )
+    args = parser.parse_args()
+    if not args.repo_url and not args.resume:
+        parser.error("informe <repo_url> ou --resume <run_id>")
+
+    cfg_hash = current_config_hash()
+    checkpoint = None
+    if args.resume:
+        try:
+            checkpoint = RunCheckpoint.load(args.resume)
+        except CheckpointError as e:
+            logger.error(f"❌ {e}")
+            sys.exit(1)
+        if checkpoint.config_hash != cfg_hash:
+            logger.error(
+                "❌ A configuração mudou desde o checkpoint; inicie uma nova análise sem --resume"
+            )
+            sys.exit(1)
+        if checkpoint.is_done(STAGE_CREW):
+            print(f"✅ Execução já concluída: {checkpoint.stage_data(STAGE_CREW)['report']}")
+            return
+        repo_url = checkpoint.repo_url
+    else:
+        repo_url = args.repo_url
 
     # Extrai nome do projeto
     project_name = repo_url.rstrip("/").split("/")[-1].replace(".git", "")
@@ -186,6 +307,8 @@ def main():
     print("=" * 70)
     print(f"📦 Projeto: {project_name}")
     print(f"🔗 URL: {repo_url}")
+    if checkpoint is not None:
+        print(f"⏯️ Retomando: {checkpoint.run_id} (commit {checkpoint.commit[:12]})")
     print("=" * 70)
     print()
 
@@ -194,28 +317,64 @@ def main():
     outputs_dir = base_dir / "outputs" / project_name
     outputs_dir.mkdir(parents=True, exist_ok=True)
 
-    temp_dir = None
+    checkout = None
+    metrics = MetricsRecorder(project_name)
     try:
-        # 1. Clone repositório
-        temp_dir = tempfile.mkdtemp(prefix=f"crew_analysis_{project_name}_")
-        if not clone_repository(repo_url, temp_dir):
-            logger.error("❌ Falha ao clonar repositório")
-            sys.exit(1)
+        # 1. Clone repositório (ou checkout a partir do cache de mirrors)
+        #    Na retomada o checkout fica fixo no commit da execução original
+        with metrics.stage("clone"):
+            ref = checkpoint.commit if checkpoint is not None else None
+            checkout = checkout_repository(repo_url, project_name, ref=ref)
+            if checkout is None:
+                logger.error("❌ Falha ao clonar repositório")
+                sys.exit(1)
+        temp_dir = str(checkout.path)
+
+        if checkpoint is None:
+            commit = resolve_ref(temp_dir, "HEAD")
+            if commit is None:
+                logger.error("❌ Não foi possível identificar o commit analisado")
+                sys.exit(1)
+            checkpoint = RunCheckpoint.start(project_name, repo_url, commit, cfg_hash)
+            checkpoint.complete(STAGE_CLONE, commit=commit)
+            print(f"💾 Checkpoint: {checkpoint.path}")
 
         print()
 
-        # 2. Gera relatório base
+        # 2. Gera relatório base (ou recupera do checkpoint)
         base_report = outputs_dir / "relatorio_codebase_inicial.md"
-        if not generate_base_report(temp_dir, str(base_report)):
-            logger.error("❌ Falha ao gerar relatório base")
-            sys.exit(1)
+        report = None
+        if checkpoint.is_done(STAGE_BASE_REPORT):
+            shutil.copyfile(checkpoint.artifact_path(BASE_REPORT_FILE), base_report)
+            logger.info("⏭️ Relatório base recuperado do checkpoint")
+        else:
+            with metrics.stage("base_report") as stage:
+                report = generate_base_report(temp_dir, str(base_report))
+                if report is None:
+                    logger.error("❌ Falha ao gerar relatório base")
+                    sys.exit(1)
+                stage.bytes_processed = report.stats["total_size"]
+            checkpoint.save_artifact(BASE_REPORT_FILE, report.text)
+            checkpoint.complete(
+                STAGE_BASE_REPORT, files=report.stats["total_files"], tokens=report.tokens
+            )
 
         print()
 
         # 3. Executa análise CrewAI
-        if not run_crewai_analysis(str(base_report), str(outputs_dir), project_name, temp_dir):
-            logger.error("❌ Falha na análise CrewAI")
-            sys.exit(1)
+        with metrics.stage("crew"):
+            if not run_crewai_analysis(
+                str(base_report),
+                str(outputs_dir),
+                project_name,
+                temp_dir,
+                report=report,
+                metrics=metrics,
+                checkpoint=checkpoint,
+                bypass_llm_cache=args.no_llm_cache,
+            ):
+                logger.error("❌ Falha na análise CrewAI")
+                sys.exit(1)
 
         print()
         print("=" * 70)
@@ -241,13 +400,29 @@ def main():
         traceback.print_exc()
         sys.exit(1)
     finally:
-        # Limpa diretório temporário
-        if temp_dir and os.path.exists(temp_dir):
-            try:
-                shutil.rmtree(temp_dir)
-                logger.info("🧹 Diretório temporário limpo")
-            except Exception as e:
-                logger.warning(f"⚠️ Erro ao limpar temp: {e}")
+        # Limpa diretório temporário (worktree ou clone) e libera o mirror
+        if checkout is not None:
+            checkout.release()
+            logger.info("🧹 Diretório temporário limpo")
+        write_metrics(metrics, outputs_dir)
+        if checkpoint is not None and not checkpoint.is_done(STAGE_CREW):
+            print(f"⏯️ Para retomar: python src/analyze_repo.py --resume {checkpoint.run_id}")
+
+
+def write_metrics(metrics: MetricsRecorder, outputs_dir: Path) -> None:
+    """Imprime a tabela de tempos e grava as métricas (JSON e, opcionalmente, Prometheus)"""
+    print()
+    print("⏱️ Tempos por estágio")
+    print(metrics.format_table())
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    try:
+        path = metrics.write_json(outputs_dir / f"metricas_{timestamp}.json")
+        logger.info(f"📈 Métricas salvas em: {path}")
+        if METRICS_PROMETHEUS_PATH:
+            metrics.write_prometheus(METRICS_PROMETHEUS_PATH)
+            logger.info(f"📈 Métricas Prometheus: {METRICS_PROMETHEUS_PATH}")
+    except OSError as e:
+        logger.warning(f"⚠️ Erro ao salvar métricas: {e}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+📚 Análise em Lote de Repositórios
+==================================
+
+Analisa uma lista de repositórios com um pipeline de três estágios, cada um com
+seu próprio limite de concorrência:
+
+1. clone: checkout (cache de mirrors) e diff opcional — I/O
+2. scan: relatório base em processo filho — CPU
+3. crew: análise CrewAI — chamadas longas ao LLM
+
+Filas limitadas entre os estágios fazem o clone e o scan dos próximos
+repositórios acontecerem enquanto os anteriores estão no LLM, sem acumular
+checkouts em disco. Ao final imprime e grava um resumo por repositório.
+
+Entrada (um repositório por linha; linhas vazias e com # são ignoradas):
+    https://github.com/user/repo
+    https://github.com/user/repo main feature
+    {"url": "https://github.com/user/repo", "base_ref": "main", "head_ref": "dev"}
+
+Uso:
+    python src/batch_analyze.py repos.txt [--clone-workers 4] [--scan-workers 2]
+        [--crew-workers 2] [--skip-crew] [--summary resumo.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.analyze_repo import (  # noqa: E402
+    REPORT_TIMEOUT,
+    checkout_repository,
+    generate_base_report,
+    get_git_diff,
+    run_crewai_analysis,
+)
+from src.clone_cache import Checkout  # noqa: E402
+from src.quick_report import ReportResult  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+OUTPUTS_DIR = Path(__file__).parent.parent / "outputs"
+BASE_REPORT_NAME = "relatorio_codebase_inicial.md"
+DEFAULT_CLONE_WORKERS = 4
+DEFAULT_SCAN_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+DEFAULT_CREW_WORKERS = 2
+
+STATUS_PENDING = "pending"
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+
+
+@dataclass
+class BatchJob:
+    """Um repositório do lote e o estado dele ao longo do pipeline"""
+
+    repo_url: str
+    base_ref: str | None = None
+    head_ref: str | None = None
+    name: str = ""
+    status: str = STATUS_PENDING
+    failed_stage: str | None = None
+    error: str | None = None
+    timings: dict[str, float] = field(default_factory=dict)
+    files: int = 0
+    tokens: int = 0
+    outputs_dir: Path | None = None
+    checkout: Checkout | None = field(default=None, repr=False)
+    report: ReportResult | None = field(default=None, repr=False)
+    diff_content: str | None = field(default=None, repr=False)
+
+    def summary(self) -> dict:
+        """Resumo serializável (status, tempos por estágio e erro)"""
+        return {
+            "repo_url": self.repo_url,
+            "name": self.name,
+            "status": self.status,
+            "failed_stage": self.failed_stage,
+            "error": self.error,
+            "timings": self.timings,
+            "total_time": round(sum(self.timings.values()), 2),
+            "files": self.files,
+            "tokens": self.tokens,
+            "outputs_dir": str(self.outputs_dir) if self.outputs_dir else None,
+        }
+
+
+def project_name(repo_url: str) -> str:
+    return repo_url.rstrip("/").split("/")[-1].replace(".git", "")
+
+
+def parse_jobs(lines) -> list[BatchJob]:
+    """
+    Lê URLs (com refs opcionais separadas por espaço) ou objetos JSON por linha.
+
+    Nomes repetidos recebem sufixo (-2, -3...) para não misturar outputs.
+    """
+    jobs = []
+    for raw in lines:
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            data = json.loads(line)
+            job = BatchJob(data["url"], data.get("base_ref"), data.get("head_ref"))
+        else:
+            parts = line.split()
+            job = BatchJob(parts[0], *parts[1:3])
+        jobs.append(job)
+
+    seen: dict[str, int] = {}
+    for job in jobs:
+        base = project_name(job.repo_url)
+        seen[base] = seen.get(base, 0) + 1
+        job.name = base if seen[base] == 1 else f"{base}-{seen[base]}"
+    return jobs
+
+
+class BatchPipeline:
+    """Pipeline clone → scan → crew com pools de threads e filas limitadas"""
+
+    def __init__(
+        self,
+        clone_workers: int = DEFAULT_CLONE_WORKERS,
+        scan_workers: int = DEFAULT_SCAN_WORKERS,
+        crew_workers: int = DEFAULT_CREW_WORKERS,
+        run_crew: bool = True,
+        outputs_root: str | Path = OUTPUTS_DIR,
+        report_timeout: float | None = REPORT_TIMEOUT,
+        scan_in_worker: bool = True,
+    ):
+        self.outputs_root = Path(outputs_root)
+        self.report_timeout = report_timeout
+        # Scan em processo filho: vários scans usam núcleos diferentes
+        self.scan_in_worker = scan_in_worker
+        stages: list[tuple[str, Callable[[BatchJob], None], int]] = [
+            ("clone", self._clone, clone_workers),
+            ("scan", self._scan, scan_workers),
+        ]
+        if run_crew:
+            stages.append(("crew", self._crew, crew_workers))
+        self.stages = stages
+        self.results: list[BatchJob] = []
+        self._lock = threading.Lock()
+
+    # Estágios -------------------------------------------------------------
+
+    def _clone(self, job: BatchJob) -> None:
+        depth = 0 if job.base_ref and job.head_ref else 1
+        job.checkout = checkout_repository(job.repo_url, job.name, depth=depth)
+        if job.checkout is None:
+            raise RuntimeError("falha ao clonar repositório")
+        if job.base_ref and job.head_ref:
+            job.diff_content = get_git_diff(str(job.checkout.path), job.base_ref, job.head_ref)
+
+    def _scan(self, job: BatchJob) -> None:
+        assert job.checkout is not None
+        job.outputs_dir = self.outputs_root / job.name
+        job.outputs_dir.mkdir(parents=True, exist_ok=True)
+        job.report = generate_base_report(
+            str(job.checkout.path),
+            str(job.outputs_dir / BASE_REPORT_NAME),
+            timeout=self.report_timeout,
+            in_worker=self.scan_in_worker,
+        )
+        if job.report is None:
+            raise RuntimeError("falha ao gerar relatório base")
+        job.files = job.report.stats["total_files"]
+        job.tokens = job.report.tokens
+
+    def _crew(self, job: BatchJob) -> None:
+        assert job.checkout is not None and job.outputs_dir is not None
+        ok = run_crewai_analysis(
+            str(job.outputs_dir / BASE_REPORT_NAME),
+            str(job.outputs_dir),
+            job.name,
+            str(job.checkout.path),
+            job.diff_content,
+            report=job.report,
+        )
+        if not ok:
+            raise RuntimeError("falha na análise CrewAI")
+
+    # Execução -------------------------------------------------------------
+
+    def _finish(self, job: BatchJob) -> None:
+        if job.checkout is not None:
+            job.checkout.release()
+            job.checkout = None
+        # Texto do relatório e diff não são mais necessários após o último estágio
+        job.report = None
+        job.diff_content = None
+        if job.status == STATUS_PENDING:
+            job.status = STATUS_OK
+        with self._lock:
+            self.results.append(job)
+        icon = "✅" if job.status == STATUS_OK else "❌"
+        logger.info(f"{icon} {job.name}: {job.status} ({sum(job.timings.values()):.1f}s)")
+
+    def _worker(
+        self,
+        stage: str,
+        func: Callable[[BatchJob], None],
+        inbox: queue.Queue,
+        outbox: queue.Queue | None,
+    ) -> None:
+        while (job := inbox.get()) is not None:
+            start = time.monotonic()
+            try:
+                func(job)
+            except Exception as e:
+                job.status = STATUS_FAILED
+                job.failed_stage = stage
+                job.error = str(e)
+                logger.error(f"❌ {job.name} falhou em {stage}: {e}")
+            job.timings[stage] = round(time.monotonic() - start, 2)
+
+            if job.status == STATUS_FAILED or outbox is None:
+                self._finish(job)
+            else:
+                outbox.put(job)
+
+    def run(self, jobs: list[BatchJob]) -> list[BatchJob]:
+        """Executa o lote e devolve os jobs na ordem de entrada"""
+        # Fila do primeiro estágio recebe tudo; as seguintes seguram um job por worker
+        inboxes: list[queue.Queue] = [queue.Queue()]
+        inboxes += [queue.Queue(maxsize=workers) for _, _, workers in self.stages[1:]]
+
+        pools = []
+        for index, (stage, func, workers) in enumerate(self.stages):
+            outbox = inboxes[index + 1] if index + 1 < len(self.stages) else None
+            threads = [
+                threading.Thread(
+                    target=self._worker,
+                    args=(stage, func, inboxes[index], outbox),
+                    name=f"{stage}-{n}",
+                    daemon=True,
+                )
+                for n in range(workers)
+            ]
+            for thread in threads:
+                thread.start()
+            pools.append(threads)
+
+        for job in jobs:
+            inboxes[0].put(job)
+
+        # Encerra estágio por estágio: quando um termina, o seguinte recebe sentinelas
+        for index, threads in enumerate(pools):
+            for _ in threads:
+                inboxes[index].put(None)
+            for thread in threads:
+                thread.join()
+
+        order = {id(job): i for i, job in enumerate(jobs)}
+        return sorted(self.results, key=lambda job: order[id(job)])
+
+
+def print_summary(jobs: list[BatchJob]) -> None:
+    stages = ("clone", "scan", "crew")
+    print()
+    print("=" * 90)
+    print(f"{'Repositório':<30} {'Status':<8} " + " ".join(f"{s:>7}" for s in stages) + "  Erro")
+    print("-" * 90)
+    for job in jobs:
+        times = " ".join(
+            f"{job.timings[s]:>6.1f}s" if s in job.timings else f"{'-':>7}" for s in stages
+        )
+        error = f"{job.failed_stage}: {job.error}" if job.error else ""
+        print(f"{job.name[:30]:<30} {job.status:<8} {times}  {error[:60]}")
+    ok = sum(job.status == STATUS_OK for job in jobs)
+    print("-" * 90)
+    print(f"✅ {ok}/{len(jobs)} concluídos")
+    print("=" * 90)
+
+
+def write_summary(jobs: list[BatchJob], path: str | Path, elapsed: float) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "elapsed": round(elapsed, 2),
+        "total": len(jobs),
+        "ok": sum(job.status == STATUS_OK for job in jobs),
+        "repos": [job.summary() for job in jobs],
+    }
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analisa vários repositórios em lote")
+    parser.add_argument("repo_list", help="Arquivo com URLs (texto ou JSONL); '-' para stdin")
+    parser.add_argument("--clone-workers", type=int, default=DEFAULT_CLONE_WORKERS)
+    parser.add_argument("--scan-workers", type=int, default=DEFAULT_SCAN_WORKERS)
+    parser.add_argument("--crew-workers", type=int, default=DEFAULT_CREW_WORKERS)
+    parser.add_argument("--skip-crew", action="store_true", help="Apenas clone e relatório base")
+    parser.add_argument("--summary", help="JSON do resumo (padrão: outputs/batch/lote_<data>.json)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(threadName)s: %(message)s")
+
+    if args.repo_list == "-":
+        jobs = parse_jobs(sys.stdin)
+    else:
+        with open(args.repo_list, encoding="utf-8") as f:
+            jobs = parse_jobs(f)
+    if not jobs:
+        print("❌ Nenhum repositório na lista")
+        sys.exit(1)
+
+    print(f"📚 Lote com {len(jobs)} repositórios")
+    start = time.monotonic()
+    pipeline = BatchPipeline(
+        clone_workers=args.clone_workers,
+        scan_workers=args.scan_workers,
+        crew_workers=args.crew_workers,
+        run_crew=not args.skip_crew,
+    )
+    try:
+        results = pipeline.run(jobs)
+    except KeyboardInterrupt:
+        print("\n⚠️ Lote interrompido pelo usuário")
+        sys.exit(130)
+
+    print_summary(results)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    summary_path = args.summary or OUTPUTS_DIR / "batch" / f"lote_{timestamp}.json"
+    print(f"💾 Resumo: {write_summary(results, summary_path, time.monotonic() - start)}")
+    if any(job.status != STATUS_OK for job in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+🗄️ Clone Cache - Cache persistente de mirrors git com worktrees
+===============================================================
+
+Cada URL de repositório tem um mirror bare em CACHE_DIR. Na primeira análise o
+mirror é criado com `git clone --mirror`; nas seguintes, apenas `git fetch`
+traz o que mudou. Cada execução recebe um checkout barato via
+`git worktree add --detach` em um diretório temporário, removido ao final.
+
+Concorrência (por repositório, com flock):
+- `<chave>.lock`: exclusivo durante fetch/clone/worktree add (alterações no mirror)
+- `<chave>.use`: compartilhado enquanto houver checkout ativo; a remoção LRU só
+  apaga mirrors cujo uso pode ser travado de forma exclusiva
+
+A remoção LRU (pelo mtime de `<chave>.use`) roda após cada checkout e mantém o
+tamanho total dos mirrors abaixo de max_bytes.
+
+Com mode partial/blobless (ver sparse_clone) o mirror é um clone parcial e cada
+worktree usa sparse checkout, buscando sob demanda apenas os blobs necessários.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import subprocess  # nosec
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import ModuleType
+from typing import IO
+
+from src.sparse_clone import CLONE_FULL, filter_spec, sparse_checkout
+
+fcntl: ModuleType | None
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(__file__).parent.parent / "outputs" / "cache" / "mirrors"
+MAX_CACHE_BYTES = 5 * 1024**3  # 5GB
+CLONE_TIMEOUT = 600
+FETCH_TIMEOUT = 300
+WORKTREE_TIMEOUT = 120
+MIRROR_SUFFIX = ".git"
+# Clones --mirror incompletos mais antigos que isso são considerados abandonados
+STAGING_MAX_AGE = 24 * 3600
+
+
+class CloneCacheError(RuntimeError):
+    """Falha ao criar, atualizar ou fazer checkout de um mirror"""
+
+
+def cache_key(repo_url: str) -> str:
+    """Chave estável por URL: nome legível + hash da URL normalizada"""
+    normalized = repo_url.strip().rstrip("/").removesuffix(".git").lower()
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", normalized.rsplit("/", 1)[-1])[:40] or "repo"
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+    return f"{name}-{digest}"
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def _lock(path: Path, mode: int, blocking: bool = True) -> IO | None:
+    """Abre e trava o arquivo de lock; None se não bloqueante e já travado"""
+    handle = open(path, "a+")  # noqa: SIM115 - mantido aberto enquanto travado
+    if fcntl is None:
+        return handle
+    try:
+        fcntl.flock(handle, mode | (0 if blocking else fcntl.LOCK_NB))
+    except BlockingIOError:
+        handle.close()
+        return None
+    return handle
+
+
+def _unlock(handle: IO | None) -> None:
+    if handle is not None:
+        handle.close()  # fechar libera o flock
+
+
+@dataclass
+class Checkout:
+    """Checkout de um repositório; release() remove o diretório de trabalho"""
+
+    path: Path
+    mirror: Path | None = None
+    _use_lock: IO | None = field(default=None, repr=False)
+
+    def release(self) -> None:
+        """Remove o worktree (ou o clone temporário) e libera o mirror"""
+        shutil.rmtree(self.path, ignore_errors=True)
+        # O registro em <mirror>/worktrees é limpo por `worktree prune` no próximo checkout
+        _unlock(self._use_lock)
+        self._use_lock = None
+
+    def __enter__(self) -> "Checkout":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+class CloneCache:
+    """Mirrors bare por URL com checkouts via worktree e remoção LRU por tamanho"""
+
+    def __init__(
+        self,
+        cache_dir: str | Path = CACHE_DIR,
+        max_bytes: int = MAX_CACHE_BYTES,
+        mode: str = CLONE_FULL,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        # Modo de clone de sparse_clone; vale na criação do mirror e em cada worktree
+        self.mode = mode
+        self.filter = filter_spec(mode)
+        self.git = shutil.which("git")
+
+    def mirror_path(self, repo_url: str) -> Path:
+        return self.cache_dir / (cache_key(repo_url) + MIRROR_SUFFIX)
+
+    @staticmethod
+    def _lock_path(mirror: Path, kind: str) -> Path:
+        """Arquivo de lock ao lado do mirror (kind: "lock" ou "use")"""
+        return mirror.with_name(mirror.name.removesuffix(MIRROR_SUFFIX) + "." + kind)
+
+    def _git(self, *args: str, timeout: float, cwd: Path | None = None) -> str:
+        if not self.git:
+            raise CloneCacheError("Git não encontrado")
+        try:
+            result = subprocess.run(  # nosec
+                [self.git, *args], cwd=cwd, capture_output=True, text=True, timeout=timeout
+            )
+        except subprocess.TimeoutExpired as e:
+            raise CloneCacheError(f"git {args[0]} excedeu {timeout}s") from e
+        if result.returncode != 0:
+            raise CloneCacheError(f"git {args[0]} falhou: {result.stderr.strip()}")
+        return result.stdout
+
+    def _update_mirror(self, repo_url: str, mirror: Path) -> None:
+        """Cria o mirror (clone atômico via diretório temporário) ou faz fetch"""
+        if mirror.exists():
+            logger.info(f"🔄 Atualizando mirror em cache: {mirror.name}")
+            self._git("-C", str(mirror), "fetch", "--prune", "origin", timeout=FETCH_TIMEOUT)
+            self._git("-C", str(mirror), "worktree", "prune", timeout=WORKTREE_TIMEOUT)
+            return
+
+        logger.info(f"📥 Criando mirror em cache: {mirror.name}")
+        staging = mirror.with_name(f"{mirror.name}.tmp-{os.getpid()}")
+        shutil.rmtree(staging, ignore_errors=True)
+        try:
+            args = ["clone", "--mirror", repo_url, str(staging)]
+            if self.filter:
+                args.insert(2, f"--filter={self.filter}")
+            self._git(*args, timeout=CLONE_TIMEOUT)
+            os.replace(staging, mirror)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def checkout(
+        self, repo_url: str, ref: str = "HEAD", prefix: str = "crew_analysis_"
+    ) -> Checkout:
+        """
+        Atualiza o mirror de repo_url e cria um worktree destacado em ref.
+
+        Args:
+            repo_url: URL (ou caminho) do repositório
+            ref: Referência a ser feita checkout (padrão: HEAD do remoto)
+            prefix: Prefixo do diretório temporário do worktree
+
+        Returns:
+            Checkout ativo (chamar release() ou usar como context manager)
+
+        Raises:
+            CloneCacheError: Se o git falhar ou não estiver disponível
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        mirror = self.mirror_path(repo_url)
+        use_path = self._lock_path(mirror, "use")
+
+        use_lock = _lock(use_path, fcntl.LOCK_SH if fcntl else 0)
+        worktree = Path(tempfile.mkdtemp(prefix=prefix))
+        try:
+            mutate_lock = _lock(self._lock_path(mirror, "lock"), fcntl.LOCK_EX if fcntl else 0)
+            try:
+                self._update_mirror(repo_url, mirror)
+                args = ["-C", str(mirror), "worktree", "add", "--detach", str(worktree), ref]
+                if self.mode != CLONE_FULL:
+                    args.insert(4, "--no-checkout")
+                self._git(*args, timeout=WORKTREE_TIMEOUT)
+            finally:
+                _unlock(mutate_lock)
+            if self.mode != CLONE_FULL:
+                # Configuração sparse fica no worktree (extensions.worktreeConfig)
+                try:
+                    sparse_checkout(str(worktree), self.mode)
+                except subprocess.SubprocessError as e:
+                    stderr = getattr(e, "stderr", "") or ""
+                    raise CloneCacheError(f"sparse checkout falhou: {stderr.strip()}") from e
+        except BaseException:
+            shutil.rmtree(worktree, ignore_errors=True)
+            _unlock(use_lock)
+            raise
+
+        # mtime do arquivo de uso = último acesso (ordem LRU)
+        os.utime(use_path)
+        logger.info(f"✅ Checkout via cache: {worktree}")
+        self.evict(keep={mirror})
+        return Checkout(worktree, mirror, use_lock)
+
+    def entries(self) -> list[tuple[float, int, Path]]:
+        """Mirrors em cache como (último uso, tamanho em bytes, caminho)"""
+        if not self.cache_dir.exists():
+            return []
+        entries = []
+        for mirror in self.cache_dir.glob("*" + MIRROR_SUFFIX):
+            if ".tmp-" in mirror.name or not mirror.is_dir():
+                continue
+            use_file = self._lock_path(mirror, "use")
+            last_used = use_file.stat().st_mtime if use_file.exists() else 0.0
+            entries.append((last_used, _dir_size(mirror), mirror))
+        return entries
+
+    def evict(self, keep: set[Path] | None = None) -> list[Path]:
+        """
+        Remove os mirrors menos usados até o total caber em max_bytes.
+
+        Mirrors com checkout ativo ou em atualização (lock ocupado) são mantidos.
+
+        Returns:
+            Mirrors removidos
+        """
+        keep = keep or set()
+        self._clear_staging()
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for _, size, mirror in entries:
+            if total <= self.max_bytes:
+                break
+            if mirror in keep:
+                continue
+            exclusive = fcntl.LOCK_EX if fcntl else 0
+            use_lock = _lock(self._lock_path(mirror, "use"), exclusive, blocking=False)
+            if use_lock is None:
+                continue
+            mutate_lock = _lock(self._lock_path(mirror, "lock"), exclusive, blocking=False)
+            try:
+                if mutate_lock is None:
+                    continue
+                shutil.rmtree(mirror, ignore_errors=True)
+                total -= size
+                removed.append(mirror)
+                logger.info(f"🧹 Mirror removido do cache (LRU): {mirror.name}")
+            finally:
+                _unlock(mutate_lock)
+                _unlock(use_lock)
+        return removed
+
+    def _clear_staging(self, max_age: float = STAGING_MAX_AGE) -> None:
+        """Remove clones temporários abandonados por processos interrompidos"""
+        cutoff = time.time() - max_age
+        for staging in self.cache_dir.glob("*.tmp-*"):
+            if staging.stat().st_mtime < cutoff:
+                shutil.rmtree(staging, ignore_errors=True)
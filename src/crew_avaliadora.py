@@ -7,22 +7,34 @@ Versão melhorada que usa configuração YAML para agentes e tasks.
 Sistema plug-and-play para análise profissional de codebase usando Gemini 2.5 Flash.
 """
 
+import contextvars
 import logging
 import os
 
 # Import custom utilities
 import sys
+import threading
+import uuid
+from collections.abc import Mapping
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 
-from crewai import Agent, Crew, Process, Task
+from crewai import LLM, Agent, Crew, Process, Task
+from crewai.llms.base_llm import BaseLLM
 from dotenv import load_dotenv
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from crewai_tools import DirectoryReadTool, FileReadTool
 
+from src.crew_factory import AgentTemplate, CrewTemplate, load_crew_template
+from src.llm_cache import ResponseCache, cache_key
+from src.metrics import MetricsRecorder
+from src.run_checkpoint import RunCheckpoint
+from src.section_router import SectionRouter
+from src.task_graph import DagScheduler
+from src.token_budget import TokenLedger, estimate_usage, summary_path
 from src.tools.custom_tools import CheckDependenciesTool, ExecuteTestsTool, GrepTool, RunLinterTool
-from utils.config_loader import load_config
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
@@ -31,6 +43,214 @@ logger = logging.getLogger(__name__)
 # Carrega variáveis de ambiente
 load_dotenv()
 
+# Cache de respostas do LLM (src/llm_cache.py); CREW_LLM_CACHE=0 desativa
+USE_LLM_CACHE = os.environ.get("CREW_LLM_CACHE", "1") != "0"
+
+# Análise em execução no contexto atual (propagado às threads das tasks pelo DagScheduler)
+_current_analysis: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "crew_analysis", default=None
+)
+
+
+class AnalysisLogFilter(logging.Filter):
+    """Deixa passar só os registros da análise dona do arquivo de log"""
+
+    def __init__(self, analysis_id: str):
+        super().__init__()
+        self.analysis_id = analysis_id
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return _current_analysis.get() == self.analysis_id
+
+
+class CachedLLM(BaseLLM):
+    """
+    LLM que consulta o ResponseCache antes de chamar o modelo.
+
+    Chamadas com tools nativas ou response_model vão direto ao modelo: a
+    resposta depende da execução das funções, não só das mensagens.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        cache: ResponseCache,
+        scope: str = "",
+        replacements: dict[str, str] | None = None,
+        inner: BaseLLM | None = None,
+    ):
+        super().__init__(model=model)
+        self.inner = inner or LLM(model=model)
+        self.cache = cache
+        self.scope = scope
+        self.replacements = replacements or {}
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        # O agente define as stop words no LLM que recebeu (este wrapper)
+        self.inner.stop = self.stop
+        if tools or available_functions or kwargs.get("response_model"):
+            return self.inner.call(messages, tools, callbacks, available_functions, **kwargs)
+
+        key = cache_key(self.model, f"{self.scope}:{self.stop}", messages, self.replacements)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        response = self.inner.call(messages, tools, callbacks, available_functions, **kwargs)
+        if isinstance(response, str) and response.strip():
+            self.cache.put(key, response, model=self.model)
+        return response
+
+    def supports_function_calling(self) -> bool:
+        return _supports_function_calling(self.inner)
+
+    def supports_stop_words(self) -> bool:
+        return bool(self.inner.supports_stop_words())
+
+    def get_context_window_size(self) -> int:
+        return int(self.inner.get_context_window_size())
+
+
+def _supports_function_calling(llm: BaseLLM) -> bool:
+    """Só o LLM do CrewAI declara suporte a tools nativas; outro BaseLLM, não"""
+    supports = getattr(llm, "supports_function_calling", None)
+    return bool(supports()) if supports is not None else False
+
+
+class MeteredLLM(BaseLLM):
+    """
+    LLM que registra os tokens de cada chamada no TokenLedger e aplica os orçamentos.
+
+    Cada agente tem o seu; como tasks do mesmo agente nunca rodam juntas, `task`
+    identifica a task em andamento. Com downgrade, o restante da task usa o
+    modelo mais barato.
+    """
+
+    def __init__(self, model: str, ledger: TokenLedger, agent: str):
+        super().__init__(model=model)
+        self.inner: BaseLLM = LLM(model=model)
+        self.ledger = ledger
+        self.agent = agent
+        self.task = ""
+        self._models: dict[str, BaseLLM] = {model: self.inner}
+
+    def start_task(self, task: str) -> None:
+        self.task = task
+        self.inner = self._models[self.model]
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        downgrade = self.ledger.check(self.task)
+        if downgrade and downgrade != self.inner.model:
+            self.inner = self._models.setdefault(downgrade, LLM(model=downgrade))
+        self.inner.stop = self.stop
+
+        before = _usage_counts(self.inner)
+        response = self.inner.call(messages, tools, callbacks, available_functions, **kwargs)
+        after = _usage_counts(self.inner)
+        if before is not None and after is not None and after != before:
+            prompt, completion = after[0] - before[0], after[1] - before[1]
+            estimated = False
+        else:
+            prompt, completion = estimate_usage(messages, response)
+            estimated = True
+        self.ledger.record(self.task, self.agent, self.inner.model, prompt, completion, estimated)
+        return response
+
+    def supports_function_calling(self) -> bool:
+        return _supports_function_calling(self.inner)
+
+    def supports_stop_words(self) -> bool:
+        return bool(self.inner.supports_stop_words())
+
+    def get_context_window_size(self) -> int:
+        return int(self.inner.get_context_window_size())
+
+
+def _usage_counts(llm: BaseLLM) -> tuple[int, int] | None:
+    """Tokens de prompt e resposta acumulados pelo LLM do CrewAI (None se não expostos)"""
+    get_summary = getattr(llm, "get_token_usage_summary", None)
+    if get_summary is None:
+        return None
+    usage = get_summary()
+    return usage.prompt_tokens, usage.completion_tokens
+
+
+@dataclass
+class AgentLLM:
+    """LLM entregue ao agente (com cache, se ativo) e o medidor de tokens atrás dele"""
+
+    llm: BaseLLM
+    metered: MeteredLLM
+
+    def bind(self, ledger: TokenLedger, repo_path: str | None) -> None:
+        """Prepara para uma nova crew: registro de tokens e caminho do checkout dela"""
+        self.metered.ledger = ledger
+        self.metered.start_task("")
+        if isinstance(self.llm, CachedLLM):
+            self.llm.replacements = {repo_path: "<repo>"} if repo_path else {}
+
+
+def build_agent_llm(
+    agent_template: AgentTemplate, ledger: TokenLedger, response_cache: ResponseCache | None
+) -> AgentLLM:
+    """LLM do agente: contabiliza tokens e, com o cache ativo, reaproveita respostas"""
+    metered = MeteredLLM(os.environ["MODEL"], ledger, agent_template.key)
+    if response_cache is None:
+        return AgentLLM(metered, metered)
+    # A configuração do agente entra na chave: mudar o prompt de um agente invalida só ele.
+    # Respostas do cache não gastam tokens: o medidor fica atrás do cache
+    cached = CachedLLM(
+        os.environ["MODEL"], response_cache, agent_template.config_hash, inner=metered
+    )
+    return AgentLLM(cached, metered)
+
+
+def build_agent_tools(
+    agents: Mapping[str, AgentTemplate], repo_path: str | None
+) -> dict[str, list]:
+    """
+    Tools de cada agente. Sem repo_path só as de leitura de arquivos existem, sem
+    diretório fixo; as de leitura são compartilhadas entre os agentes.
+    """
+    if repo_path:
+        file_tools: list = [
+            FileReadTool(root_dir=repo_path),
+            DirectoryReadTool(directory=repo_path),
+            GrepTool(repo_path=repo_path),
+        ]
+    else:
+        file_tools = [FileReadTool(), DirectoryReadTool()]
+
+    tools: dict[str, list] = {}
+    for key, agent_template in agents.items():
+        agent_tools = list(file_tools) if "file_search" in agent_template.tools else []
+        if repo_path:
+            if "run_linter" in agent_template.tools:
+                agent_tools.append(RunLinterTool(repo_path=repo_path))
+            if "check_dependencies" in agent_template.tools:
+                agent_tools.append(CheckDependenciesTool(repo_path=repo_path))
+            if "execute_tests" in agent_template.tools:
+                agent_tools.append(ExecuteTestsTool(repo_path=repo_path))
+        tools[key] = agent_tools
+    return tools
+
+
+def configure_api_key(gemini_api_key: str | None = None) -> str:
+    """Valida a API key do Gemini e exporta as variáveis usadas pelo CrewAI"""
+    api_key = gemini_api_key or os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError(
+            "❌ GEMINI_API_KEY não encontrada! Configure no .env ou passe como parâmetro"
+        )
+
+    api_key = api_key.strip()
+    logger.info(f"✅ GEMINI_API_KEY carregada: {api_key[:10]}...")
+
+    # Configura environment variables para CrewAI
+    os.environ["GEMINI_API_KEY"] = api_key
+    if "MODEL" not in os.environ:
+        os.environ["MODEL"] = "gemini/gemini-2.5-flash"
+    return api_key
+
 
 class CodebaseAnalysisCrewV2:
     """
@@ -45,6 +265,14 @@ class CodebaseAnalysisCrewV2:
         gemini_api_key: str | None = None,
         config_path: str | None = None,
         repo_path: str | None = None,
+        use_llm_cache: bool = USE_LLM_CACHE,
+        bypass_llm_cache: bool = False,
+        max_concurrent_tasks: int | None = None,
+        template: CrewTemplate | None = None,
+        response_cache: ResponseCache | None = None,
+        api_key_configured: bool = False,
+        agent_tools: dict[str, list] | None = None,
+        agent_llms: dict[str, AgentLLM] | None = None,
     ):
         """
         Inicializa a crew com configuração YAML e Gemini 2.5 Flash
@@ -53,124 +281,106 @@ class CodebaseAnalysisCrewV2:
             gemini_api_key: API key do Gemini (se None, usa GEMINI_API_KEY do .env)
             config_path: Caminho para crew_config.yaml (se None, usa config/crew_config.yaml)
             repo_path: Caminho para o repositório clonado (necessário para ferramentas de análise dinâmica)
+            use_llm_cache: Reaproveita respostas do LLM de análises anteriores
+            bypass_llm_cache: Ignora respostas armazenadas, mas grava as novas
+            max_concurrent_tasks: Tasks em paralelo (se None, usa operational_settings)
+            template: Configuração já validada (se None, usa o template em cache de config_path)
+            response_cache: Cache de respostas compartilhado (se None, abre um próprio)
+            api_key_configured: gemini_api_key já validada e exportada (CrewFactory)
+            agent_tools: Tools por agente já criadas (se None, criadas para repo_path)
+            agent_llms: LLMs por agente reaproveitados de outra crew (os ausentes são criados)
         """
-        # Carrega API key
-        self.gemini_api_key = gemini_api_key or os.getenv("GEMINI_API_KEY")
-        if not self.gemini_api_key:
-            raise ValueError(
-                "❌ GEMINI_API_KEY não encontrada! Configure no .env ou passe como parâmetro"
-            )
-
-        self.gemini_api_key = self.gemini_api_key.strip()
-        logger.info(f"✅ GEMINI_API_KEY carregada: {self.gemini_api_key[:10]}...")
-
-        # Configura environment variables para CrewAI
-        os.environ["GEMINI_API_KEY"] = self.gemini_api_key
-        if "MODEL" not in os.environ:
-            os.environ["MODEL"] = "gemini/gemini-2.5-flash"
+        if api_key_configured and gemini_api_key:
+            self.gemini_api_key = gemini_api_key
+        else:
+            self.gemini_api_key = configure_api_key(gemini_api_key)
 
-        # Define caminho padrão da configuração relativo ao projeto
-        if config_path is None:
-            config_path = str(Path(__file__).parent.parent / "config" / "crew_config.yaml")
+        # Configuração lida e validada uma vez por processo (src/crew_factory.py)
+        if template is None:
+            try:
+                template = load_crew_template(config_path)
+            except Exception as e:
+                logger.error(f"❌ Erro ao carregar configuração: {e}")
+                raise
+        self.template = template
+        logger.info(f"✅ Configuração carregada: {template.name}")
 
         self.repo_path = repo_path
+        self.bypass_llm_cache = bypass_llm_cache
+        if response_cache is None and use_llm_cache:
+            response_cache = ResponseCache(bypass=bypass_llm_cache)
+        self.response_cache = response_cache
 
-        # Carrega configuração YAML
-        try:
-            self.config = load_config(str(config_path))
-            logger.info(f"✅ Configuração carregada: {self.config.get_crew_name()}")
-        except Exception as e:
-            logger.error(f"❌ Erro ao carregar configuração: {e}")
-            raise
+        # Tokens por task/agente e orçamentos (token_budgets no YAML)
+        self.token_ledger = TokenLedger(template.budget)
+        self.agent_llms: dict[str, AgentLLM] = dict(agent_llms or {})
+        self.metered_llms: dict[str, MeteredLLM] = {}
 
         # Cria agentes e tasks a partir da configuração
-        # Initialize tools
-        self.grep_tool: GrepTool | None = None
-
-        if self.repo_path:
-            self.file_read_tool = FileReadTool(root_dir=self.repo_path)
-            self.directory_read_tool = DirectoryReadTool(directory=self.repo_path)
-            self.grep_tool = GrepTool(repo_path=self.repo_path)
-        else:
-            self.file_read_tool = FileReadTool()
-            self.directory_read_tool = DirectoryReadTool()
-            self.grep_tool = None
+        if agent_tools is None:
+            agent_tools = build_agent_tools(template.agents, repo_path)
+        self.agent_tools = agent_tools
 
+        self.dependencies = template.dependencies
+        self.task_agents = template.task_agents
         self.agents = self._create_agents_from_config()
         self.tasks = self._create_tasks_from_config()
 
+        if max_concurrent_tasks is None or template.sequential:
+            max_concurrent_tasks = template.max_concurrent_tasks
+        self.max_concurrent_tasks = max_concurrent_tasks
+
     def _create_agents_from_config(self) -> dict[str, Agent]:
-        """🎭 Cria agentes a partir da configuração YAML"""
+        """🎭 Cria agentes a partir dos modelos da configuração YAML"""
         agents = {}
 
-        agents_config = self.config.get_all_agents()
-        logger.info(f"📋 Criando {len(agents_config)} agentes...")
+        logger.info(f"📋 Criando {len(self.template.agents)} agentes...")
 
-        for agent_key, agent_data in agents_config.items():
+        for agent_key, agent_template in self.template.agents.items():
             try:
-                tools: list = []
-                if "tools" in agent_data:
-                    if "file_search" in agent_data["tools"]:
-                        tools.append(self.file_read_tool)
-                        tools.append(self.directory_read_tool)
-                        if self.grep_tool:
-                            tools.append(self.grep_tool)
-                    if "run_linter" in agent_data["tools"] and self.repo_path:
-                        tools.append(RunLinterTool(repo_path=self.repo_path))
-                    if "check_dependencies" in agent_data["tools"] and self.repo_path:
-                        tools.append(CheckDependenciesTool(repo_path=self.repo_path))
-                    if "execute_tests" in agent_data["tools"] and self.repo_path:
-                        tools.append(ExecuteTestsTool(repo_path=self.repo_path))
-
-                llm = None
-                if "llm" in agent_data:
-                    # This is a simplified example. In a real scenario, you would
-                    # initialize a new LLM instance based on the config.
-                    # For now, we'll just log it.
-                    logger.info(
-                        f"Agent {agent_data['name']} uses a custom model: {agent_data['llm'].get('model')}"
-                    )
-
                 agent = Agent(
-                    role=f"{agent_data.get('emoji', '')} {agent_data['role']}",
-                    goal=agent_data["goal"],
-                    backstory=agent_data["backstory"],
+                    role=agent_template.role,
+                    goal=agent_template.goal,
+                    backstory=agent_template.backstory,
                     verbose=True,
-                    max_iter=agent_data.get("max_iterations", 3),
-                    allow_delegation=agent_data.get("delegation", False),
-                    tools=tools,
-                    llm=llm,  # Assign the custom LLM
+                    max_iter=agent_template.max_iter,
+                    allow_delegation=agent_template.allow_delegation,
+                    tools=list(self.agent_tools.get(agent_key, [])),
+                    llm=self._agent_llm(agent_template),
                 )
                 agents[agent_key] = agent
-                logger.info(f"✅ Agente criado: {agent_data['name']}")
+                logger.info(f"✅ Agente criado: {agent_template.name}")
             except Exception as e:
                 logger.error(f"❌ Erro ao criar agente {agent_key}: {e}")
                 raise
 
         return agents
 
+    def _agent_llm(self, agent_template: AgentTemplate) -> BaseLLM:
+        """LLM do agente (reaproveitado de agent_llms, se recebido)"""
+        agent_llm = self.agent_llms.get(agent_template.key)
+        if agent_llm is None:
+            agent_llm = build_agent_llm(agent_template, self.token_ledger, self.response_cache)
+        agent_llm.bind(self.token_ledger, self.repo_path)
+        self.agent_llms[agent_template.key] = agent_llm
+        self.metered_llms[agent_template.key] = agent_llm.metered
+        return agent_llm.llm
+
     def _create_tasks_from_config(self) -> dict[str, Task]:
-        """📝 Cria tasks a partir da configuração YAML"""
+        """📝 Cria tasks a partir dos modelos da configuração YAML"""
         tasks = {}
 
-        tasks_config = self.config.get_all_tasks()
-        logger.info(f"📋 Criando {len(tasks_config)} tasks...")
+        logger.info(f"📋 Criando {len(self.template.tasks)} tasks...")
 
-        for task_key, task_data in tasks_config.items():
+        for task_key, task_template in self.template.tasks.items():
             try:
-                # Encontra o agente correspondente
-                agent_key = task_data.get("agent")
-                if agent_key not in self.agents:
-                    logger.warning(f"⚠️ Agente '{agent_key}' não encontrado para task '{task_key}'")
-                    continue
-
                 task = Task(
-                    description=task_data["description"],
-                    expected_output=task_data["expected_output"],
-                    agent=self.agents[agent_key],
+                    description=task_template.description,
+                    expected_output=task_template.expected_output,
+                    agent=self.agents[task_template.agent],
                 )
                 tasks[task_key] = task
-                logger.info(f"✅ Task criada: {task_data['name']}")
+                logger.info(f"✅ Task criada: {task_template.name}")
             except Exception as e:
                 logger.error(f"❌ Erro ao criar task {task_key}: {e}")
                 raise
@@ -182,6 +392,8 @@ class CodebaseAnalysisCrewV2:
         codebase_report: str,
         output_file: str | None = None,
         diff_content: str | None = None,
+        metrics: MetricsRecorder | None = None,
+        checkpoint: RunCheckpoint | None = None,
     ) -> str:
         """
         🔍 Executa análise completa da codebase
@@ -190,6 +402,9 @@ class CodebaseAnalysisCrewV2:
             codebase_report: Relatório inicial da codebase gerado por gerar_relatorio.py
             output_file: Arquivo para salvar o relatório final
             diff_content: Conteúdo do git diff para análise incremental (opcional)
+            metrics: Recebe tempos de validação, de cada task e do salvamento (opcional)
+            checkpoint: Grava a saída de cada task; tasks já gravadas não são executadas
+                de novo e suas saídas entram como contexto das dependentes (opcional)
 
         Returns:
             Relatório final ultra-profissional
@@ -200,22 +415,27 @@ class CodebaseAnalysisCrewV2:
         # Security Check
         from src.security.guardrails import InputGuard
 
-        guard = InputGuard()
+        if metrics is None:
+            metrics = MetricsRecorder("crew")
 
-        # Validate codebase report content (prevent injection via file content)
-        # Allow up to 500k chars for codebase report and disable code pattern checks (since it contains code)
-        is_valid, error = guard.validate_prompt(
-            codebase_report, max_length=500000, check_code_patterns=False
-        )
-        if not is_valid:
-            logger.error(f"⛔ Security Violation: {error}")
-            raise ValueError(f"Security Violation: {error}")
+        guard = InputGuard()
 
-        if diff_content:
-            is_valid, error = guard.validate_prompt(diff_content)
+        guarded_bytes = len(codebase_report) + len(diff_content or "")
+        with metrics.stage("crew.guard", bytes_processed=guarded_bytes):
+            # Validate codebase report content (prevent injection via file content)
+            # Allow up to 500k chars for codebase report and disable code pattern checks (since it contains code)
+            is_valid, error = guard.validate_prompt(
+                codebase_report, max_length=500000, check_code_patterns=False
+            )
             if not is_valid:
-                logger.error(f"⛔ Security Violation in Diff: {error}")
-                raise ValueError(f"Security Violation in Diff: {error}")
+                logger.error(f"⛔ Security Violation: {error}")
+                raise ValueError(f"Security Violation: {error}")
+
+            if diff_content:
+                is_valid, error = guard.validate_prompt(diff_content)
+                if not is_valid:
+                    logger.error(f"⛔ Security Violation in Diff: {error}")
+                    raise ValueError(f"Security Violation in Diff: {error}")
 
         # Prepara inputs para as tasks
         inputs = {
@@ -226,62 +446,80 @@ class CodebaseAnalysisCrewV2:
             else "Nenhuma alteração incremental fornecida (análise completa do estado atual).",
         }
 
-        # Cria crew
-        crew = Crew(
-            agents=list(self.agents.values()),
-            tasks=list(self.tasks.values()),
-            process=Process.sequential,
-            verbose=True,
+        cache_stats_before = self.response_cache.stats() if self.response_cache else {}
+
+        # Orçamento por execução: o registro de tokens recomeça a cada análise
+        self.token_ledger = TokenLedger(self.token_ledger.budget)
+        for llm in self.metered_llms.values():
+            llm.ledger = self.token_ledger
+
+        # Retomada: tasks com saída no checkpoint não rodam; as saídas seguem como contexto
+        done = checkpoint.task_outputs() if checkpoint else {}
+        if done:
+            logger.info(f"⏭️ {len(done)} tasks recuperadas do checkpoint: {', '.join(done)}")
+
+        scheduler = DagScheduler(
+            self.dependencies, self.max_concurrent_tasks, resources=self.task_agents
         )
 
+        # Cada task recebe só as seções do relatório que declara em `sections`
+        router = SectionRouter(codebase_report)
+        routed_chars: dict[str, int] = {}
+
+        def run_task(key: str, context: dict[str, str]) -> str:
+            task_template = self.template.tasks[key]
+            report = router.route(task_template.sections)
+            if task_template.uses_report:
+                routed_chars[key] = len(report)
+                sections = ", ".join(task_template.sections or ["completo"])
+                logger.info(
+                    f"📑 Task {key}: {len(report):,} de {len(codebase_report):,} chars "
+                    f"do relatório ({sections})"
+                )
+            task_inputs = {**inputs, "codebase_report": report}
+            return self._run_task(key, context, task_inputs, metrics, checkpoint)
+
         # Setup logging to file
         log_dir = Path(__file__).parent.parent / "outputs" / "logs"
         log_dir.mkdir(parents=True, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_file = log_dir / f"crew_execution_{timestamp}.log"
+        analysis_id = uuid.uuid4().hex[:8]
+        log_file = log_dir / f"crew_execution_{timestamp}_{analysis_id}.log"
 
-        # File handler
+        # File handler no logger do módulo, compartilhado por análises concorrentes
+        # (batch, fila): o filtro mantém no arquivo só as linhas desta análise
         file_handler = logging.FileHandler(log_file, encoding="utf-8")
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+        file_handler.addFilter(AnalysisLogFilter(analysis_id))
+        analysis_token = _current_analysis.set(analysis_id)
         logger.addHandler(file_handler)
 
         try:
             logger.info(f"📝 Log sendo salvo em: {log_file}")
             logger.info(f"📊 Input codebase report size: {len(codebase_report)} chars")
-            logger.info(f"👥 Agentes na crew: {len(crew.agents)}")
-            logger.info(f"📋 Tasks na crew: {len(crew.tasks)}")
+            logger.info(f"👥 Agentes na crew: {len(self.agents)}")
+            logger.info(f"📋 Tasks na crew: {len(self.tasks)}")
 
-            # Log das tasks configuradas
-            for i, task in enumerate(crew.tasks, 1):
-                logger.info(f"  Task {i}: {task.description[:100]}...")
+            # Log das tasks configuradas e suas dependências
+            for i, (key, task) in enumerate(self.tasks.items(), 1):
+                deps = ", ".join(self.dependencies[key]) or "nenhuma"
+                logger.info(f"  Task {i}: {key} (depende de: {deps}) {task.description[:80]}...")
 
-            logger.info("🎬 Executando crew.kickoff()...")
+            logger.info(f"🎬 Executando tasks (até {self.max_concurrent_tasks} em paralelo)...")
+            outputs = scheduler.run(run_task, done=done)
+            logger.info("✅ Todas as tasks finalizadas!")
 
-            # Executa análise
-            result = crew.kickoff(inputs=inputs)
-
-            logger.info("✅ crew.kickoff() finalizado!")
-            logger.info(f"📦 Tipo do resultado: {type(result)}")
-            logger.info(f"📦 Atributos do resultado: {dir(result)}")
-
-            # Extrai texto do resultado (CrewOutput)
-            if hasattr(result, "raw"):
-                result_text = str(result.raw)
-                logger.info(f"✅ Extraído result.raw ({len(result_text)} chars)")
-            elif hasattr(result, "output"):
-                result_text = str(result.output)
-                logger.info(f"✅ Extraído result.output ({len(result_text)} chars)")
-            else:
-                result_text = str(result)
-                logger.info(f"✅ Usando str(result) ({len(result_text)} chars)")
+            # O relatório final é a saída da task final do grafo (síntese)
+            result_text = outputs[self.template.final_task]
 
             logger.info(f"📄 Primeiros 500 chars do resultado:\n{result_text[:500]}")
 
             # Salva resultado
             if output_file:
                 logger.info(f"💾 Salvando relatório em: {output_file}")
-                self._save_report(result_text, output_file)
+                with metrics.stage("crew.save_report", bytes_processed=len(result_text)):
+                    self._save_report(result_text, output_file)
 
             logger.info("✅ Análise completa finalizada!")
             return result_text
@@ -293,9 +531,73 @@ class CodebaseAnalysisCrewV2:
             logger.error(f"❌ Traceback:\n{traceback.format_exc()}")
             raise
         finally:
+            self._record_token_usage(metrics, output_file)
+            if routed_chars:
+                metrics.set_counter("report.chars_full", len(codebase_report) * len(routed_chars))
+                metrics.set_counter("report.chars_routed", sum(routed_chars.values()))
+            if self.response_cache is not None:
+                # O cache pode ser compartilhado entre crews (CrewFactory): só esta análise
+                stats = {
+                    name: value - cache_stats_before.get(name, 0)
+                    for name, value in self.response_cache.stats().items()
+                }
+                logger.info(
+                    f"🗄️ Cache de respostas do LLM: {stats['hits']} hits, "
+                    f"{stats['misses']} misses, {stats['stores']} gravadas"
+                )
+                for name, value in stats.items():
+                    metrics.set_counter(f"llm_cache.{name}", value)
             # Remove file handler
             logger.removeHandler(file_handler)
             file_handler.close()
+            _current_analysis.reset(analysis_token)
+
+    def _run_task(
+        self,
+        key: str,
+        context: dict[str, str],
+        inputs: dict[str, str],
+        metrics: MetricsRecorder,
+        checkpoint: RunCheckpoint | None,
+    ) -> str:
+        """Executa uma task isolada (crew de uma task) com as saídas das dependências"""
+        task = self.tasks[key]
+        agent = self.agents[self.task_agents[key]]
+        task_inputs = {**inputs, "upstream_context": self._upstream_context(context)}
+        self.metered_llms[self.task_agents[key]].start_task(key)
+        with metrics.stage(f"crew.task.{key}") as stage:
+            crew = Crew(agents=[agent], tasks=[task], process=Process.sequential, verbose=True)
+            result = crew.kickoff(inputs=task_inputs)
+            output = str(getattr(result, "raw", result))
+            stage.bytes_processed = len(output)
+        logger.info(f"✅ Task {key}: {len(output)} chars")
+        if checkpoint is not None:
+            checkpoint.save_task_output(key, output)
+        return output
+
+    def _record_token_usage(self, metrics: MetricsRecorder, output_file: str | None) -> None:
+        """Loga o uso de tokens, grava os contadores e o resumo ao lado do relatório"""
+        ledger = self.token_ledger
+        if not ledger.total.calls:
+            return
+        logger.info(f"🪙 Uso de tokens por task:\n{ledger.format_table()}")
+        metrics.set_counter("tokens.prompt", ledger.total.prompt_tokens)
+        metrics.set_counter("tokens.completion", ledger.total.completion_tokens)
+        metrics.set_counter("tokens.cost_usd", round(ledger.total.cost_usd, 6))
+        if output_file:
+            path = ledger.write_json(summary_path(output_file))
+            logger.info(f"🪙 Resumo de tokens salvo em: {path}")
+
+    def _upstream_context(self, context: dict[str, str]) -> str:
+        """Saídas das tasks das quais a task depende, na ordem de depends_on"""
+        if not context:
+            return ""
+        parts = ["RESULTADOS DAS TASKS ANTERIORES:"]
+        for key, output in context.items():
+            task_template = self.template.tasks.get(key)
+            name = task_template.name if task_template else key
+            parts.append(f"### {name}\n{output}")
+        return "\n\n".join(parts)
 
     def _save_report(self, result_text: str, output_file: str):
         """💾 Salva relatório final diretamente (sem template)"""
@@ -339,6 +641,101 @@ class CodebaseAnalysisCrewV2:
             raise
 
 
+class CrewFactory:
+    """
+    🏭 Cria uma crew por análise a partir do template em cache (src/crew_factory.py).
+
+    API key, configuração validada e conexões do cache de respostas do LLM são
+    preparadas uma vez e compartilhadas. O que não depende do repositório também
+    é reaproveitado: as tools sem repo_path e os LLMs de cada agente, que guardam
+    estado da análise (tokens, task em andamento) e por isso ficam com uma crew
+    por vez, até release(). Por análise são criados os Agent e Task do CrewAI e
+    as tools ligadas ao repositório.
+    """
+
+    def __init__(
+        self,
+        config_path: str | None = None,
+        gemini_api_key: str | None = None,
+        use_llm_cache: bool = USE_LLM_CACHE,
+    ):
+        self.config_path = config_path
+        self.gemini_api_key = configure_api_key(gemini_api_key)
+        self.use_llm_cache = use_llm_cache
+        self.template = load_crew_template(config_path)
+        self._caches: dict[bool, ResponseCache] = {}
+        self._unbound_tools: tuple[CrewTemplate, dict[str, list]] | None = None
+        # (agente, hash da configuração, bypass) -> LLMs livres
+        self._llm_pool: dict[tuple[str, str, bool], list[AgentLLM]] = {}
+        self._lock = threading.Lock()
+
+    def response_cache(self, bypass: bool = False) -> ResponseCache | None:
+        """Cache de respostas compartilhado (um por modo de bypass)"""
+        if not self.use_llm_cache:
+            return None
+        with self._lock:
+            if bypass not in self._caches:
+                self._caches[bypass] = ResponseCache(bypass=bypass)
+            return self._caches[bypass]
+
+    def create(
+        self,
+        repo_path: str | None = None,
+        bypass_llm_cache: bool = False,
+        max_concurrent_tasks: int | None = None,
+    ) -> CodebaseAnalysisCrewV2:
+        """Crew ligada a repo_path (relê o YAML só se ele mudou); devolver com release()"""
+        template = self.template = load_crew_template(self.config_path)
+        agent_llms = {}
+        with self._lock:
+            for key, agent_template in template.agents.items():
+                free = self._llm_pool.get((key, agent_template.config_hash, bypass_llm_cache))
+                if free:
+                    agent_llms[key] = free.pop()
+        return CodebaseAnalysisCrewV2(
+            gemini_api_key=self.gemini_api_key,
+            repo_path=repo_path,
+            use_llm_cache=self.use_llm_cache,
+            bypass_llm_cache=bypass_llm_cache,
+            max_concurrent_tasks=max_concurrent_tasks,
+            template=template,
+            response_cache=self.response_cache(bypass_llm_cache),
+            api_key_configured=True,
+            agent_tools=self._tools_without_repo(template) if repo_path is None else None,
+            agent_llms=agent_llms,
+        )
+
+    def release(self, crew: CodebaseAnalysisCrewV2) -> None:
+        """Devolve os LLMs de uma crew que terminou (a crew não deve mais ser usada)"""
+        with self._lock:
+            for key, agent_llm in crew.agent_llms.items():
+                agent_template = crew.template.agents.get(key)
+                if agent_template is None:
+                    continue
+                pool_key = (key, agent_template.config_hash, crew.bypass_llm_cache)
+                self._llm_pool.setdefault(pool_key, []).append(agent_llm)
+        crew.agent_llms = {}
+
+    def _tools_without_repo(self, template: CrewTemplate) -> dict[str, list]:
+        """Tools das crews sem repositório, criadas uma vez por template"""
+        with self._lock:
+            if self._unbound_tools is None or self._unbound_tools[0] is not template:
+                self._unbound_tools = (template, build_agent_tools(template.agents, None))
+            return self._unbound_tools[1]
+
+
+_factories: dict[str | None, CrewFactory] = {}
+_factories_lock = threading.Lock()
+
+
+def get_crew_factory(config_path: str | None = None) -> CrewFactory:
+    """CrewFactory do processo para config_path (criada na primeira chamada)"""
+    with _factories_lock:
+        if config_path not in _factories:
+            _factories[config_path] = CrewFactory(config_path)
+        return _factories[config_path]
+
+
 def main():
     """🎯 Função principal de execução"""
     import sys
@@ -355,7 +752,7 @@ def main():
     # Inicializa crew
     try:
         crew = CodebaseAnalysisCrewV2()
-        print(f"✅ Crew '{crew.config.get_crew_name()}' inicializada!")
+        print(f"✅ Crew '{crew.template.name}' inicializada!")
         print(f"👥 Agentes: {len(crew.agents)}")
         print(f"📝 Tasks: {len(crew.tasks)}")
         print()
@@ -0,0 +1,199 @@
+"""
+🏭 Crew Factory - Configuração da crew lida e validada uma vez por processo
+==========================================================================
+
+load_crew_template lê o crew_config.yaml, valida (agentes das tasks, grafo de
+dependências, sections, token_budgets) e guarda o resultado como modelos
+imutáveis de agentes e tasks. O template fica em cache por processo e só é
+relido quando o arquivo muda (mtime/tamanho), então análises em lote e sessões
+do Streamlit não repetem esse trabalho.
+
+Os objetos do CrewAI (Agent, Task, tools) continuam sendo criados por análise
+em src/crew_avaliadora.py: guardam estado da execução e as tools ficam presas
+ao caminho do repositório, então não podem ser compartilhados entre análises
+concorrentes. Este módulo não depende do CrewAI.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+from src.section_router import validate_tags
+from src.task_graph import DEFAULT_MAX_CONCURRENT_TASKS, sink_task, task_dependencies
+from src.token_budget import TokenBudget
+from utils.config_loader import load_config
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "crew_config.yaml"
+UPSTREAM_PLACEHOLDER = "{upstream_context}"
+REPORT_PLACEHOLDER = "{codebase_report}"
+
+
+@dataclass(frozen=True)
+class AgentTemplate:
+    """Parâmetros de um agente, prontos para instanciar o Agent do CrewAI"""
+
+    key: str
+    name: str
+    role: str
+    goal: str
+    backstory: str
+    max_iter: int
+    allow_delegation: bool
+    tools: tuple[str, ...]
+    # Hash da configuração do agente (escopo das chaves do cache de respostas)
+    config_hash: str
+
+
+@dataclass(frozen=True)
+class TaskTemplate:
+    """Parâmetros de uma task, com a descrição final (inclui o contexto das dependências)"""
+
+    key: str
+    name: str
+    agent: str
+    description: str
+    expected_output: str
+    depends_on: tuple[str, ...]
+    sections: tuple[str, ...] | None
+
+    @property
+    def uses_report(self) -> bool:
+        return REPORT_PLACEHOLDER in self.description
+
+
+@dataclass(frozen=True)
+class CrewTemplate:
+    """Configuração validada da crew (agentes e tasks na ordem do YAML)"""
+
+    name: str
+    config_path: str
+    agents: MappingProxyType
+    tasks: MappingProxyType
+    budget: TokenBudget
+    max_concurrent_tasks: int
+    # Única task sem dependentes; sua saída é o relatório final
+    final_task: str
+    # process_type "sequential": uma task por vez, mesmo com max_concurrent_tasks explícito
+    sequential: bool = False
+
+    @property
+    def dependencies(self) -> dict[str, list[str]]:
+        return {key: list(task.depends_on) for key, task in self.tasks.items()}
+
+    @property
+    def task_agents(self) -> dict[str, str]:
+        return {key: task.agent for key, task in self.tasks.items()}
+
+
+def _agent_template(key: str, data: dict[str, Any]) -> AgentTemplate:
+    if "llm" in data:
+        logger.info(f"Agent {data['name']} uses a custom model: {data['llm'].get('model')}")
+    return AgentTemplate(
+        key=key,
+        name=data["name"],
+        role=f"{data.get('emoji', '')} {data['role']}",
+        goal=data["goal"],
+        backstory=data["backstory"],
+        max_iter=data.get("max_iterations", 3),
+        allow_delegation=data.get("delegation", False),
+        tools=tuple(data.get("tools") or ()),
+        config_hash=hashlib.sha256(
+            json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:16],
+    )
+
+
+def build_crew_template(config_path: str | Path = CONFIG_PATH) -> CrewTemplate:
+    """
+    Lê e valida o crew_config.yaml (sem cache).
+
+    Raises:
+        ValueError: Configuração inválida (campo ausente, dependência, task final, sections,
+            orçamento)
+    """
+    config = load_config(str(config_path))
+    try:
+        agents = {key: _agent_template(key, data) for key, data in config.get_all_agents().items()}
+    except KeyError as e:
+        raise ValueError(f"Agente sem o campo obrigatório {e}") from e
+
+    tasks_config = config.get_all_tasks()
+    created = {}
+    for key, data in tasks_config.items():
+        if data.get("agent") not in agents:
+            logger.warning(f"⚠️ Agente '{data.get('agent')}' não encontrado para task '{key}'")
+            continue
+        created[key] = data
+    dependencies = task_dependencies(created)
+    final_task = sink_task(dependencies)
+
+    tasks = {}
+    for key, data in created.items():
+        sections = data.get("sections")
+        if sections is not None:
+            validate_tags(sections)
+        # Saídas das dependências entram no fim da descrição
+        description = data["description"]
+        if dependencies[key]:
+            description += f"\n\n{UPSTREAM_PLACEHOLDER}"
+        try:
+            tasks[key] = TaskTemplate(
+                key=key,
+                name=data["name"],
+                agent=data["agent"],
+                description=description,
+                expected_output=data["expected_output"],
+                depends_on=tuple(dependencies[key]),
+                sections=tuple(sections) if sections is not None else None,
+            )
+        except KeyError as e:
+            raise ValueError(f"Task '{key}' sem o campo obrigatório {e}") from e
+
+    settings = config.get_operational_settings()
+    sequential = settings.get("process_type") == "sequential"
+    max_concurrent_tasks = settings.get("max_concurrent_tasks", DEFAULT_MAX_CONCURRENT_TASKS)
+
+    return CrewTemplate(
+        name=config.get_crew_name(),
+        config_path=str(config_path),
+        agents=MappingProxyType(agents),
+        tasks=MappingProxyType(tasks),
+        budget=TokenBudget.from_config(config.get_token_budgets()),
+        max_concurrent_tasks=1 if sequential else max_concurrent_tasks,
+        final_task=final_task,
+        sequential=sequential,
+    )
+
+
+_templates: dict[str, tuple[tuple[int, int], CrewTemplate]] = {}
+_templates_lock = threading.Lock()
+
+
+def load_crew_template(config_path: str | Path | None = None) -> CrewTemplate:
+    """Template da crew em cache por processo (relido se o arquivo mudar)"""
+    path = Path(config_path or CONFIG_PATH).resolve()
+    stat = path.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _templates_lock:
+        cached = _templates.get(str(path))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        template = build_crew_template(path)
+        _templates[str(path)] = (version, template)
+        logger.info(
+            f"🏭 Template da crew carregado: {template.name} "
+            f"({len(template.agents)} agentes, {len(template.tasks)} tasks)"
+        )
+        return template
+
+
+def clear_template_cache() -> None:
+    with _templates_lock:
+        _templates.clear()
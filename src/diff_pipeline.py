@@ -0,0 +1,367 @@
+"""
+🔀 Diff Pipeline - Diff incremental por arquivo, priorizado e com tamanho limitado
+=================================================================================
+
+Em vez de capturar `git diff base head` inteiro em uma string:
+
+1. Resolve as refs localmente e só faz fetch das que estiverem faltando
+2. Passada barata com `--numstat` e `--name-status` (sem conteúdo)
+3. Ignora caminhos vendorizados, gerados, minificados e binários
+4. Ordena os arquivos por risco (tamanho da mudança, hotspots de histórico,
+   caminhos sensíveis) e lê o diff de um arquivo por vez, truncando cada um
+5. Monta um contexto limitado a max_chars com resumo de todos os arquivos e os
+   diffs dos mais arriscados
+"""
+
+import logging
+import math
+import os
+import re
+import shutil
+import subprocess  # nosec
+from collections import Counter
+from dataclasses import dataclass, field
+
+from src.quick_report import CODE_EXTENSIONS, IGNORE_EXTENSIONS, IGNORE_FOLDERS
+from src.sparse_clone import run_git
+
+logger = logging.getLogger(__name__)
+
+# Abaixo do limite padrão de InputGuard.validate_prompt (100k)
+DEFAULT_MAX_DIFF_CHARS = 90_000
+# Limite do diff de um único arquivo
+MAX_FILE_DIFF_CHARS = 12_000
+# Arquivos cujo diff é lido (os demais aparecem só no resumo)
+MAX_DIFF_FILES = 100
+# Linhas do resumo de arquivos alterados
+MAX_SUMMARY_LINES = 200
+# Commits considerados para hotspots de histórico
+HOTSPOT_COMMITS = 500
+READ_CHUNK_SIZE = 8192
+TRAILER_RESERVE = 100
+# Linhas "... e mais N arquivos" e "## Diffs" no fim do cabeçalho
+SUMMARY_RESERVE = 50
+
+VENDOR_FOLDERS = {"vendor", "vendors", "third_party", "thirdparty", "external", "bower_components"}
+LOCK_FILES = {
+    "package-lock.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "poetry.lock",
+    "uv.lock",
+    "Pipfile.lock",
+    "Cargo.lock",
+    "go.sum",
+    "composer.lock",
+    "Gemfile.lock",
+}
+_GENERATED_NAME = re.compile(
+    r"([.-]min\.[a-z]+|\.bundle\.js|_pb2(_grpc)?\.pyi?|\.pb\.go|\.generated\.[a-z]+|\.map)$",
+    re.IGNORECASE,
+)
+# Caminhos cuja alteração merece mais atenção na revisão
+_SENSITIVE_PATH = re.compile(
+    r"auth|security|crypt|secret|token|password|permission|payment|billing|migration"
+    r"|config|settings|docker|\.github/workflows|requirements|pyproject|setup\.py",
+    re.IGNORECASE,
+)
+STATUS_WEIGHT = {"A": 1.0, "M": 1.0, "R": 0.6, "C": 0.6, "D": 0.3, "T": 0.5}
+
+
+@dataclass
+class DiffEntry:
+    """Arquivo alterado entre duas refs"""
+
+    path: str
+    status: str
+    old_path: str | None = None
+    added: int = 0
+    deleted: int = 0
+    binary: bool = False
+    skip_reason: str | None = None
+    score: float = 0.0
+    text: str = ""
+    truncated: bool = False
+
+    @property
+    def churn(self) -> int:
+        return self.added + self.deleted
+
+
+@dataclass
+class DiffContext:
+    """Resultado do pipeline: texto limitado e metadados de todos os arquivos"""
+
+    base: str
+    head: str
+    text: str
+    entries: list[DiffEntry] = field(default_factory=list)
+    included: list[str] = field(default_factory=list)
+
+    @property
+    def omitted(self) -> list[str]:
+        """Arquivos relevantes cujo diff não coube no contexto"""
+        included = set(self.included)
+        return [e.path for e in self.entries if not e.skip_reason and e.path not in included]
+
+
+def resolve_ref(repo_path: str, ref: str) -> str | None:
+    """SHA do commit de ref (também tenta origin/<ref>), sem acessar a rede"""
+    for candidate in (ref, f"origin/{ref}"):
+        try:
+            return run_git(
+                "rev-parse", "--verify", "--quiet", f"{candidate}^{{commit}}", cwd=repo_path
+            ).strip()
+        except subprocess.CalledProcessError:
+            continue
+    return None
+
+
+def ensure_refs(repo_path: str, *refs: str) -> list[str]:
+    """
+    Resolve as refs, buscando no remoto apenas as que não existem localmente.
+
+    Returns:
+        SHAs na mesma ordem de refs
+
+    Raises:
+        ValueError: Se alguma ref não existir nem após o fetch
+    """
+    resolved = []
+    for ref in refs:
+        sha = resolve_ref(repo_path, ref)
+        if sha is None:
+            logger.info(f"📡 Ref ausente localmente, buscando: {ref}")
+            try:
+                run_git("fetch", "--quiet", "origin", ref, cwd=repo_path)
+                sha = resolve_ref(repo_path, "FETCH_HEAD")
+            except subprocess.SubprocessError as e:
+                logger.warning(f"⚠️ Fetch de {ref} falhou: {e}")
+        if sha is None:
+            raise ValueError(f"Referência git não encontrada: {ref}")
+        resolved.append(sha)
+    return resolved
+
+
+def _split_z(output: str) -> list[str]:
+    return output.split("\0")[:-1] if output else []
+
+
+def diff_entries(repo_path: str, base: str, head: str) -> list[DiffEntry]:
+    """Passada sem conteúdo: --name-status (status/renomeações) + --numstat (linhas)"""
+    entries: dict[str, DiffEntry] = {}
+    tokens = _split_z(run_git("diff", "--name-status", "-z", "-M", base, head, cwd=repo_path))
+    i = 0
+    while i < len(tokens):
+        status = tokens[i][0]
+        if status in "RC":
+            entry = DiffEntry(tokens[i + 2], status, old_path=tokens[i + 1])
+            i += 3
+        else:
+            entry = DiffEntry(tokens[i + 1], status)
+            i += 2
+        entries[entry.path] = entry
+
+    tokens = _split_z(run_git("diff", "--numstat", "-z", "-M", base, head, cwd=repo_path))
+    i = 0
+    while i < len(tokens):
+        added, deleted, path = tokens[i].split("\t", 2)
+        if path:
+            i += 1
+        else:
+            # Renomeação: "a\td\t\0antigo\0novo\0"
+            path = tokens[i + 2]
+            i += 3
+        found = entries.get(path)
+        if found is None:
+            continue
+        if added == "-":
+            found.binary = True
+        else:
+            found.added, found.deleted = int(added), int(deleted)
+    return list(entries.values())
+
+
+def skip_reason(entry: DiffEntry) -> str | None:
+    """Motivo para deixar o arquivo fora do contexto (None se relevante)"""
+    parts = entry.path.split("/")
+    name = parts[-1]
+    if entry.binary:
+        return "binário"
+    if any(part in IGNORE_FOLDERS for part in parts[:-1]):
+        return "ignorado"
+    if any(part.lower() in VENDOR_FOLDERS for part in parts[:-1]):
+        return "vendorizado"
+    if name in LOCK_FILES:
+        return "lockfile"
+    if os.path.splitext(name)[1].lower() in IGNORE_EXTENSIONS:
+        return "ignorado"
+    if _GENERATED_NAME.search(name):
+        return "gerado"
+    return None
+
+
+def change_hotspots(repo_path: str, rev: str, max_commits: int = HOTSPOT_COMMITS) -> Counter:
+    """Frequência com que cada arquivo mudou nos últimos commits (vazio em clones rasos)"""
+    try:
+        output = run_git(
+            "log",
+            "-z",
+            "--format=",
+            "--name-only",
+            f"--max-count={max_commits}",
+            rev,
+            cwd=repo_path,
+        )
+    except subprocess.SubprocessError:
+        return Counter()
+    return Counter(name for name in (t.strip("\n") for t in output.split("\0")) if name)
+
+
+def risk_score(entry: DiffEntry, hotspots: Counter | dict | None = None) -> float:
+    """Pontuação de risco: volume da mudança, tipo, hotspots e caminhos sensíveis"""
+    score = math.log1p(entry.churn) * STATUS_WEIGHT.get(entry.status, 1.0)
+    if os.path.splitext(entry.path)[1].lower() in CODE_EXTENSIONS:
+        score *= 1.5
+    if hotspots:
+        score += math.log1p(hotspots.get(entry.path, 0))
+    if _SENSITIVE_PATH.search(entry.path):
+        score += 2.0
+    return round(score, 3)
+
+
+def read_file_diff(
+    repo_path: str, base: str, head: str, entry: DiffEntry, max_chars: int = MAX_FILE_DIFF_CHARS
+) -> tuple[str, bool]:
+    """
+    Lê em streaming o diff de um arquivo, parando em max_chars.
+
+    Returns:
+        (texto, truncado)
+    """
+    git_path = shutil.which("git")
+    if not git_path:
+        raise FileNotFoundError("git não encontrado")
+    paths = [entry.path] if entry.old_path is None else [entry.old_path, entry.path]
+    cmd = [git_path, "diff", "-M", base, head, "--", *(f":(literal){p}" for p in paths)]
+    chunks: list[str] = []
+    size = 0
+    truncated = False
+    with subprocess.Popen(  # nosec
+        cmd,
+        cwd=repo_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    ) as proc:
+        assert proc.stdout is not None
+        while chunk := proc.stdout.read(READ_CHUNK_SIZE):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= max_chars:
+                truncated = True
+                proc.kill()
+                break
+    text = "".join(chunks)
+    if truncated:
+        text = text[: text.rfind("\n", 0, max_chars) + 1]
+        text += _truncation_note(entry, max_chars)
+    return text, truncated
+
+
+def _truncation_note(entry: DiffEntry, max_chars: int) -> str:
+    return f"... [diff de {entry.path} truncado em {max_chars:,} caracteres]\n"
+
+
+def _summary_line(entry: DiffEntry) -> str:
+    name = entry.path if entry.old_path is None else f"{entry.old_path} → {entry.path}"
+    change = "binário" if entry.binary else f"+{entry.added} -{entry.deleted}"
+    note = f" ({entry.skip_reason})" if entry.skip_reason else ""
+    return f"{entry.status} {name} {change}{note}\n"
+
+
+def build_diff_context(
+    repo_path: str,
+    base_ref: str,
+    head_ref: str,
+    max_chars: int = DEFAULT_MAX_DIFF_CHARS,
+    hotspots: Counter | dict | None = None,
+) -> DiffContext:
+    """
+    Executa o pipeline completo e devolve o contexto de diff limitado.
+
+    Args:
+        repo_path: Checkout git
+        base_ref: Referência base (branch, tag ou SHA)
+        head_ref: Referência alvo
+        max_chars: Tamanho máximo do texto gerado
+        hotspots: Peso por caminho (padrão: frequência de mudanças no histórico de head)
+
+    Raises:
+        ValueError: Se alguma referência não existir
+    """
+    base, head = ensure_refs(repo_path, base_ref, head_ref)
+    entries = diff_entries(repo_path, base, head)
+    if hotspots is None:
+        hotspots = change_hotspots(repo_path, head)
+
+    for entry in entries:
+        entry.skip_reason = skip_reason(entry)
+        entry.score = 0.0 if entry.skip_reason else risk_score(entry, hotspots)
+    entries.sort(key=lambda e: (e.skip_reason is not None, -e.score, e.path))
+
+    relevant = [e for e in entries if not e.skip_reason]
+    added = sum(e.added for e in entries)
+    deleted = sum(e.deleted for e in entries)
+    header = [
+        f"# Diff {base_ref}..{head_ref}\n",
+        f"{len(entries)} arquivos alterados (+{added} -{deleted}), "
+        f"{len(relevant)} relevantes, {len(entries) - len(relevant)} ignorados\n\n",
+        "## Arquivos alterados (por risco)\n",
+    ]
+    # Resumo limitado ao orçamento, deixando espaço para o fim do cabeçalho e o trailer
+    budget = max_chars - sum(map(len, header)) - SUMMARY_RESERVE - TRAILER_RESERVE
+    listed = 0
+    for entry in entries[:MAX_SUMMARY_LINES]:
+        line = _summary_line(entry)
+        if len(line) > budget:
+            break
+        header.append(line)
+        budget -= len(line)
+        listed += 1
+    if len(entries) > listed:
+        header.append(f"... e mais {len(entries) - listed} arquivos\n")
+    header.append("\n## Diffs\n")
+
+    parts = header
+    size = sum(map(len, parts))
+    included = []
+    for entry in relevant[:MAX_DIFF_FILES]:
+        # Reserva espaço para a linha final de arquivos omitidos
+        remaining = max_chars - size - TRAILER_RESERVE
+        if remaining < 200:
+            break
+        # O aviso de truncamento vem depois do corte: desconta o tamanho dele
+        budget_bound = remaining < MAX_FILE_DIFF_CHARS
+        limit = min(MAX_FILE_DIFF_CHARS, remaining)
+        limit -= len(_truncation_note(entry, limit))
+        entry.text, entry.truncated = read_file_diff(repo_path, base, head, entry, limit)
+        if len(entry.text) > remaining:
+            continue
+        parts.append(entry.text)
+        size += len(entry.text)
+        included.append(entry.path)
+        if entry.truncated and budget_bound:
+            # Cortado pelo orçamento total (não pelo limite por arquivo): os demais ficam de fora
+            break
+
+    omitted = len(relevant) - len(included)
+    if omitted:
+        parts.append(f"\n... {omitted} arquivos relevantes sem diff (limite de contexto)\n")
+    text = "".join(parts)
+    logger.info(
+        f"✅ Diff: {len(included)}/{len(relevant)} arquivos relevantes, {len(text):,} caracteres"
+    )
+    return DiffContext(base, head, text, entries, included)
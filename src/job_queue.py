@@ -0,0 +1,291 @@
+"""
+📬 Job Queue - Fila durável de análises em SQLite
+=================================================
+
+Cada pedido de análise é um job que avança por estágios (clone → report →
+crew). Workers de cada estágio pegam jobs com um lease de tempo limitado,
+renovado por heartbeat; se o worker morrer, o lease expira e outro worker
+retoma o job. Falhas são re-tentadas com espera crescente até max_attempts e
+depois vão para a dead-letter (status "dead").
+
+O estado produzido por cada estágio (caminho do checkout, relatório base...)
+fica gravado no job, então um estágio pode rodar em outro processo.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+QUEUE_PATH = Path(__file__).parent.parent / "outputs" / "queue" / "jobs.sqlite3"
+LEASE_SECONDS = 300.0
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 30.0
+
+STATUS_QUEUED = "queued"
+STATUS_LEASED = "leased"
+STATUS_DONE = "done"
+STATUS_DEAD = "dead"
+
+
+@dataclass
+class Job:
+    """Linha da fila com payload (pedido) e state (resultados dos estágios)"""
+
+    id: int
+    stage: str
+    status: str
+    payload: dict[str, Any]
+    state: dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+    max_attempts: int = MAX_ATTEMPTS
+    lease_owner: str | None = None
+    lease_expires: float | None = None
+    error: str | None = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "stage": self.stage,
+            "status": self.status,
+            "payload": self.payload,
+            "state": self.state,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+_COLUMNS = (
+    "id, stage, status, payload, state, attempts, max_attempts, "
+    "lease_owner, lease_expires, error, created_at, updated_at"
+)
+
+
+def _row_to_job(row: tuple) -> Job:
+    return Job(
+        id=row[0],
+        stage=row[1],
+        status=row[2],
+        payload=json.loads(row[3]),
+        state=json.loads(row[4]),
+        attempts=row[5],
+        max_attempts=row[6],
+        lease_owner=row[7],
+        lease_expires=row[8],
+        error=row[9],
+        created_at=row[10],
+        updated_at=row[11],
+    )
+
+
+class JobQueue:
+    """
+    Fila SQLite segura entre threads e processos.
+
+    O lease usa BEGIN IMMEDIATE: apenas uma conexão por vez seleciona e marca o
+    próximo job, então dois workers nunca recebem o mesmo job.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = QUEUE_PATH,
+        lease_seconds: float = LEASE_SECONDS,
+        max_attempts: int = MAX_ATTEMPTS,
+        retry_delay: float = RETRY_DELAY,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), check_same_thread=False, timeout=30, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                stage TEXT NOT NULL,
+                status TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT '{}',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                lease_owner TEXT,
+                lease_expires REAL,
+                available_at REAL NOT NULL,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (stage, status, available_at)"
+        )
+
+    def _write(self, sql: str, params: tuple) -> int:
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            return cursor.rowcount
+
+    def enqueue(self, payload: dict[str, Any], stage: str) -> int:
+        """Adiciona um job no estágio inicial e devolve o ID"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (stage, status, payload, max_attempts, available_at, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (stage, STATUS_QUEUED, json.dumps(payload), self.max_attempts, now, now, now),
+            )
+            assert cursor.lastrowid is not None
+            return cursor.lastrowid
+
+    def lease(self, stage: str, owner: str) -> Job | None:
+        """
+        Reserva o próximo job pronto do estágio (ou com lease expirado).
+
+        Jobs cujo lease expirou já com todas as tentativas usadas vão para a
+        dead-letter em vez de serem entregues de novo.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, updated_at = ? "
+                    "WHERE stage = ? AND status = ? AND lease_expires < ? "
+                    "AND attempts >= max_attempts",
+                    (STATUS_DEAD, "lease expirado", now, stage, STATUS_LEASED, now),
+                )
+                row = self._conn.execute(
+                    f"SELECT {_COLUMNS} FROM jobs WHERE stage = ? AND ("
+                    "(status = ? AND available_at <= ?) OR (status = ? AND lease_expires < ?)"
+                    ") ORDER BY available_at, id LIMIT 1",
+                    (stage, STATUS_QUEUED, now, STATUS_LEASED, now),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                expires = now + self.lease_seconds
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, lease_owner = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (STATUS_LEASED, owner, expires, now, row[0]),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        job = _row_to_job(row)
+        job.status, job.lease_owner, job.lease_expires = STATUS_LEASED, owner, expires
+        job.attempts += 1
+        return job
+
+    def heartbeat(self, job_id: int, owner: str) -> bool:
+        """Renova o lease; False se o job não pertence mais a owner"""
+        now = time.time()
+        return bool(
+            self._write(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = ?",
+                (now + self.lease_seconds, now, job_id, owner, STATUS_LEASED),
+            )
+        )
+
+    def complete(
+        self, job_id: int, owner: str, state: dict[str, Any], next_stage: str | None
+    ) -> bool:
+        """
+        Conclui o estágio atual: avança para next_stage (tentativas zeradas) ou
+        marca o job como concluído. False se o lease foi perdido.
+        """
+        now = time.time()
+        status = STATUS_QUEUED if next_stage else STATUS_DONE
+        return bool(
+            self._write(
+                "UPDATE jobs SET stage = COALESCE(?, stage), status = ?, state = ?, "
+                "attempts = 0, lease_owner = NULL, lease_expires = NULL, error = NULL, "
+                "available_at = ?, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = ?",
+                (next_stage, status, json.dumps(state), now, now, job_id, owner, STATUS_LEASED),
+            )
+        )
+
+    def fail(self, job_id: int, owner: str, error: str) -> str | None:
+        """
+        Registra uma falha: re-enfileira com espera crescente ou envia para a dead-letter.
+
+        Returns:
+            Novo status ("queued" ou "dead"), ou None se o lease foi perdido
+        """
+        job = self.get(job_id)
+        if job is None or job.lease_owner != owner or job.status != STATUS_LEASED:
+            return None
+        now = time.time()
+        if job.attempts >= job.max_attempts:
+            status, available_at = STATUS_DEAD, now
+        else:
+            status = STATUS_QUEUED
+            available_at = now + self.retry_delay * 2 ** (job.attempts - 1)
+        updated = self._write(
+            "UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, lease_expires = NULL, "
+            "available_at = ?, updated_at = ? WHERE id = ? AND lease_owner = ? AND status = ?",
+            (status, error, available_at, now, job_id, owner, STATUS_LEASED),
+        )
+        return status if updated else None
+
+    def retry_dead(self, job_id: int) -> bool:
+        """Devolve um job da dead-letter à fila, no mesmo estágio"""
+        now = time.time()
+        return bool(
+            self._write(
+                "UPDATE jobs SET status = ?, attempts = 0, error = NULL, available_at = ?, "
+                "updated_at = ? WHERE id = ? AND status = ?",
+                (STATUS_QUEUED, now, now, job_id, STATUS_DEAD),
+            )
+        )
+
+    def get(self, job_id: int) -> Job | None:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return _row_to_job(row) if row else None
+
+    def jobs(self, status: str | None = None, limit: int = 100) -> list[Job]:
+        """Jobs mais recentes (opcionalmente filtrados por status)"""
+        sql = f"SELECT {_COLUMNS} FROM jobs"
+        params: tuple = ()
+        if status:
+            sql += " WHERE status = ?"
+            params = (status,)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY id DESC LIMIT ?", (*params, limit))
+            return [_row_to_job(row) for row in rows.fetchall()]
+
+    def pending(self) -> int:
+        """Jobs ainda não concluídos nem mortos"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (STATUS_QUEUED, STATUS_LEASED)
+            ).fetchone()
+        return int(row[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
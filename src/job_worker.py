@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+👷 Job Worker - Pool de workers da fila de análises
+===================================================
+
+Executa os jobs de src/job_queue.py em três estágios, cada um com seu próprio
+número de workers:
+
+1. clone: clone próprio do repositório e diff opcional
+2. report: relatório base (em processo filho)
+3. crew: análise CrewAI; remove o checkout ao final
+
+Uso:
+    python src/job_worker.py enqueue <repo_url> [--base-ref main --head-ref dev]
+    python src/job_worker.py worker [--clone-workers 2] [--report-workers 2] [--crew-workers 1]
+        [--drain]
+    python src/job_worker.py status [<job_id>]
+    python src/job_worker.py retry <job_id>
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.analyze_repo import (  # noqa: E402
+    checkout_repository,
+    generate_base_report,
+    get_git_diff,
+    run_crewai_analysis,
+)
+from src.clone_cache import Checkout  # noqa: E402
+from src.job_queue import STATUS_DEAD, Job, JobQueue  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+OUTPUTS_DIR = Path(__file__).parent.parent / "outputs"
+STAGE_CLONE = "clone"
+STAGE_REPORT = "report"
+STAGE_CREW = "crew"
+STAGES = (STAGE_CLONE, STAGE_REPORT, STAGE_CREW)
+DEFAULT_WORKERS = {STAGE_CLONE: 2, STAGE_REPORT: 2, STAGE_CREW: 1}
+POLL_INTERVAL = 2.0
+
+
+def enqueue_analysis(
+    queue: JobQueue,
+    repo_url: str,
+    base_ref: str | None = None,
+    head_ref: str | None = None,
+) -> int:
+    """Enfileira uma análise completa e devolve o ID do job"""
+    name = repo_url.rstrip("/").split("/")[-1].replace(".git", "")
+    payload = {"repo_url": repo_url, "name": name, "base_ref": base_ref, "head_ref": head_ref}
+    return queue.enqueue(payload, STAGE_CLONE)
+
+
+def _job_dir(job: Job, outputs_root: Path) -> Path:
+    return outputs_root / str(job.payload["name"]) / f"job_{job.id}"
+
+
+def run_clone(job: Job, outputs_root: Path) -> dict[str, Any]:
+    payload = job.payload
+    has_refs = bool(payload.get("base_ref") and payload.get("head_ref"))
+    # O checkout sobrevive a este estágio (é removido no estágio crew ou na dead-letter),
+    # então não usa o cache de mirrors: o lock de uso do mirror não passaria entre estágios
+    # e o LRU poderia remover o mirror de um worktree ainda em uso
+    checkout = checkout_repository(
+        payload["repo_url"], payload["name"], depth=0 if has_refs else 1, use_cache=False
+    )
+    if checkout is None:
+        raise RuntimeError("falha ao clonar repositório")
+    state = {"repo_path": str(checkout.path)}
+    if has_refs:
+        try:
+            diff = get_git_diff(str(checkout.path), payload["base_ref"], payload["head_ref"])
+            if diff:
+                diff_path = _job_dir(job, outputs_root) / "diff.patch"
+                diff_path.parent.mkdir(parents=True, exist_ok=True)
+                diff_path.write_text(diff, encoding="utf-8")
+                state["diff_path"] = str(diff_path)
+        except BaseException:
+            # O estado não é gravado em caso de falha: ninguém mais liberaria o checkout
+            checkout.release()
+            raise
+    return state
+
+
+def run_report(job: Job, outputs_root: Path) -> dict[str, Any]:
+    output_dir = _job_dir(job, outputs_root)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    base_report = output_dir / "relatorio_codebase_inicial.md"
+    report = generate_base_report(job.state["repo_path"], str(base_report), in_worker=True)
+    if report is None:
+        raise RuntimeError("falha ao gerar relatório base")
+    return {
+        **job.state,
+        "base_report": str(base_report),
+        "files": report.stats["total_files"],
+        "tokens": report.tokens,
+    }
+
+
+def run_crew(job: Job, outputs_root: Path) -> dict[str, Any]:
+    output_dir = _job_dir(job, outputs_root)
+    diff_path = job.state.get("diff_path")
+    diff = Path(diff_path).read_text(encoding="utf-8") if diff_path else None
+    ok = run_crewai_analysis(
+        job.state["base_report"],
+        str(output_dir),
+        job.payload["name"],
+        job.state["repo_path"],
+        diff,
+    )
+    if not ok:
+        raise RuntimeError("falha na análise CrewAI")
+    finals = sorted(output_dir.glob("relatorio_final_*.md"), key=lambda p: p.stat().st_mtime)
+    release_checkout(job)
+    return {**job.state, "final_report": str(finals[-1]) if finals else None}
+
+
+def release_checkout(job: Job) -> None:
+    """Libera o checkout criado em run_clone (clone próprio, sem mirror)"""
+    repo_path = job.state.get("repo_path")
+    if repo_path:
+        Checkout(Path(repo_path)).release()
+
+
+STAGE_RUNNERS: dict[str, Callable[[Job, Path], dict[str, Any]]] = {
+    STAGE_CLONE: run_clone,
+    STAGE_REPORT: run_report,
+    STAGE_CREW: run_crew,
+}
+
+
+def next_stage(stage: str) -> str | None:
+    index = STAGES.index(stage)
+    return STAGES[index + 1] if index + 1 < len(STAGES) else None
+
+
+class WorkerPool:
+    """Threads por estágio que consomem a fila com lease e heartbeat"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        workers: dict[str, int] | None = None,
+        outputs_root: str | Path = OUTPUTS_DIR,
+        poll_interval: float = POLL_INTERVAL,
+        runners: dict[str, Callable[[Job, Path], dict[str, Any]]] | None = None,
+    ):
+        self.queue = queue
+        self.workers = {**DEFAULT_WORKERS, **(workers or {})}
+        self.outputs_root = Path(outputs_root)
+        self.poll_interval = poll_interval
+        self.runners = runners or STAGE_RUNNERS
+        self.stop_event = threading.Event()
+        self.owner_prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def _heartbeat(self, job: Job, owner: str, done: threading.Event) -> None:
+        interval = max(self.queue.lease_seconds / 3, 0.05)
+        while not done.wait(interval):
+            if not self.queue.heartbeat(job.id, owner):
+                logger.warning(f"⚠️ Job {job.id}: lease perdido durante {job.stage}")
+                return
+
+    def run_one(self, stage: str, owner: str) -> bool:
+        """Processa um job do estágio; False se não havia job pronto"""
+        job = self.queue.lease(stage, owner)
+        if job is None:
+            return False
+
+        logger.info(f"▶️ Job {job.id}: {stage} (tentativa {job.attempts}/{job.max_attempts})")
+        done = threading.Event()
+        beat = threading.Thread(target=self._heartbeat, args=(job, owner, done), daemon=True)
+        beat.start()
+        start = time.monotonic()
+        try:
+            state = self.runners[stage](job, self.outputs_root)
+        except Exception as e:
+            status = self.queue.fail(job.id, owner, f"{stage}: {e}")
+            logger.error(f"❌ Job {job.id}: {stage} falhou ({e}); status: {status}")
+            if status == STATUS_DEAD:
+                release_checkout(job)
+            return True
+        finally:
+            done.set()
+            beat.join()
+
+        timings = {**job.state.get("timings", {}), stage: round(time.monotonic() - start, 2)}
+        following = next_stage(stage)
+        if not self.queue.complete(job.id, owner, {**state, "timings": timings}, following):
+            logger.warning(f"⚠️ Job {job.id}: resultado de {stage} descartado (lease perdido)")
+        else:
+            logger.info(f"✅ Job {job.id}: {stage} concluído -> {following or 'done'}")
+        return True
+
+    def _loop(self, stage: str, index: int, drain: bool) -> None:
+        owner = f"{self.owner_prefix}:{stage}-{index}:{uuid.uuid4().hex[:8]}"
+        while not self.stop_event.is_set():
+            if self.run_one(stage, owner):
+                continue
+            if drain and self.queue.pending() == 0:
+                return
+            self.stop_event.wait(self.poll_interval)
+
+    def run(self, drain: bool = False) -> None:
+        """
+        Inicia os workers de todos os estágios e bloqueia até stop() (ou, com
+        drain, até não restarem jobs pendentes).
+        """
+        threads = [
+            threading.Thread(
+                target=self._loop, args=(stage, i, drain), name=f"{stage}-{i}", daemon=True
+            )
+            for stage in STAGES
+            for i in range(self.workers.get(stage, 0))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+
+def _print_job(job: Job) -> None:
+    print(json.dumps(job.to_dict(), indent=2, ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fila durável de análises de repositórios")
+    parser.add_argument("--queue", default=None, help="Caminho do banco SQLite da fila")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = sub.add_parser("enqueue", help="Enfileira uma análise e imprime o ID do job")
+    enqueue.add_argument("repo_url")
+    enqueue.add_argument("--base-ref")
+    enqueue.add_argument("--head-ref")
+
+    worker = sub.add_parser("worker", help="Executa o pool de workers")
+    for stage in STAGES:
+        worker.add_argument(f"--{stage}-workers", type=int, default=DEFAULT_WORKERS[stage])
+    worker.add_argument("--drain", action="store_true", help="Encerra quando a fila esvaziar")
+
+    status = sub.add_parser("status", help="Mostra um job ou os mais recentes")
+    status.add_argument("job_id", nargs="?", type=int)
+    status.add_argument("--status", dest="filter_status", help="queued, leased, done ou dead")
+
+    retry = sub.add_parser("retry", help="Devolve um job da dead-letter à fila")
+    retry.add_argument("job_id", type=int)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(threadName)s: %(message)s")
+    queue = JobQueue(args.queue) if args.queue else JobQueue()
+
+    if args.command == "enqueue":
+        print(enqueue_analysis(queue, args.repo_url, args.base_ref, args.head_ref))
+    elif args.command == "worker":
+        workers = {stage: getattr(args, f"{stage}_workers") for stage in STAGES}
+        pool = WorkerPool(queue, workers)
+        signal.signal(signal.SIGTERM, lambda *_: pool.stop())
+        print(f"👷 Workers: {workers} (Ctrl+C para encerrar)")
+        try:
+            pool.run(drain=args.drain)
+        except KeyboardInterrupt:
+            pool.stop()
+            print("\n⚠️ Workers encerrados; jobs em andamento serão retomados após o lease")
+    elif args.command == "status":
+        if args.job_id is not None:
+            job = queue.get(args.job_id)
+            if job is None:
+                print(f"❌ Job {args.job_id} não encontrado")
+                sys.exit(1)
+            _print_job(job)
+        else:
+            for job in queue.jobs(args.filter_status):
+                error = f"  {job.error}" if job.error else ""
+                print(
+                    f"{job.id:>6}  {job.status:<7} {job.stage:<7} {job.payload['repo_url']}{error}"
+                )
+    elif args.command == "retry":
+        if not queue.retry_dead(args.job_id):
+            print(f"❌ Job {args.job_id} não está na dead-letter")
+            sys.exit(1)
+        print(f"🔁 Job {args.job_id} re-enfileirado")
+
+
+if __name__ == "__main__":
+    main()
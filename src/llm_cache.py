@@ -0,0 +1,198 @@
+"""
+🗄️ LLM Cache - Cache de respostas do LLM endereçado por conteúdo
+================================================================
+
+Guarda em SQLite as respostas do LLM das tasks da crew. A chave é o hash do
+modelo, da configuração do agente e das mensagens enviadas (prompt renderizado
+da task, que já inclui as saídas das tasks anteriores). Reanalisar um
+repositório inalterado não paga de novo nenhuma chamada; se só parte das
+entradas mudar, apenas as tasks cujos prompts mudaram vão ao LLM.
+
+Trechos voláteis do prompt (data de geração do relatório base, caminho do
+checkout temporário) são normalizados antes do hash.
+
+Remoção: entradas mais antigas que o TTL e, acima do tamanho máximo, as menos
+usadas recentemente (LRU).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = Path(__file__).parent.parent / "outputs" / "cache" / "llm_responses.sqlite3"
+MAX_CACHE_BYTES = int(os.environ.get("CREW_LLM_CACHE_MAX_MB", "512")) * 1024 * 1024
+TTL_SECONDS = float(os.environ.get("CREW_LLM_CACHE_TTL_DAYS", "7")) * 24 * 3600
+KEY_VERSION = "1"
+
+# Linhas que mudam a cada geração do relatório base sem mudar o conteúdo analisado
+VOLATILE_PATTERNS = (re.compile(r"\*\*Gerado em:\*\*[^\n]*"),)
+
+
+def normalize_text(text: str, replacements: dict[str, str] | None = None) -> str:
+    """Remove trechos voláteis e substitui caminhos locais por marcadores estáveis"""
+    for old, new in (replacements or {}).items():
+        if old:
+            text = text.replace(old, new)
+    for pattern in VOLATILE_PATTERNS:
+        text = pattern.sub("", text)
+    return text
+
+
+def cache_key(
+    model: str,
+    scope: str,
+    messages: Any,
+    replacements: dict[str, str] | None = None,
+) -> str:
+    """
+    Chave de uma chamada ao LLM.
+
+    Args:
+        model: Nome do modelo
+        scope: Identificação do agente (hash da sua configuração, stop words...)
+        messages: Mensagens da chamada (str ou lista de dicts role/content)
+        replacements: Substituições aplicadas ao texto antes do hash
+    """
+    canonical = json.dumps(messages, sort_keys=True, ensure_ascii=False, default=str)
+    digest = hashlib.sha256()
+    for part in (KEY_VERSION, model, scope, normalize_text(canonical, replacements)):
+        digest.update(part.encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """
+    Respostas do LLM por chave de conteúdo, com TTL e remoção LRU por tamanho.
+
+    Com bypass, consultas sempre erram mas as respostas novas são gravadas
+    (útil para forçar uma análise nova e atualizar o cache). Seguro entre threads.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = CACHE_PATH,
+        max_bytes: int = MAX_CACHE_BYTES,
+        ttl: float = TTL_SECONDS,
+        bypass: bool = False,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed_at)")
+        self._conn.commit()
+        self.evict()
+
+    def get(self, key: str) -> str | None:
+        """Resposta armazenada (None se ausente, expirada ou em bypass)"""
+        if self.bypass:
+            with self._lock:
+                self.misses += 1
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ?, hit_count = hit_count + 1 WHERE key = ?",
+                (now, key),
+            )
+            self._conn.commit()
+            self.hits += 1
+            return str(row[0])
+
+    def put(self, key: str, response: str, model: str = "") -> None:
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, response, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now),
+            )
+            self._conn.commit()
+            self.stores += 1
+        self.evict()
+
+    def evict(self) -> int:
+        """Remove entradas expiradas e, acima de max_bytes, as menos usadas; devolve o total"""
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+            excess = int(total[0]) - self.max_bytes
+            if excess > 0:
+                freed = 0
+                victims = []
+                for key, size in self._conn.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed_at"
+                ):
+                    victims.append((key,))
+                    freed += size
+                    if freed >= excess:
+                        break
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+                removed += len(victims)
+            self._conn.commit()
+            self.evictions += removed
+        if removed:
+            logger.info(f"🧹 Cache de respostas: {removed} entradas removidas")
+        return removed
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return int(row[0])
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "ResponseCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,185 @@
+"""
+⏱️ Metrics - Instrumentação por estágio do pipeline de análise
+==============================================================
+
+Registra, para cada estágio (clone, relatório base, validação, cada task da
+crew, salvamento...), tempo de parede, tempo de CPU, pico de RSS e bytes
+processados. Ao final da execução as métricas vão para um JSON em
+outputs/<projeto>/ e, opcionalmente, para um arquivo no formato texto do
+Prometheus (ex.: diretório do textfile collector do node_exporter).
+
+CPU inclui o processo e os filhos já finalizados (git, worker do relatório).
+O pico de RSS é o máximo do processo até o fim do estágio (ru_maxrss), então
+só cresce quando o estágio eleva o pico.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from types import ModuleType
+
+resource: ModuleType | None
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+METRICS_VERSION = 1
+PROMETHEUS_PREFIX = "crew_stage"
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+
+def cpu_seconds() -> float:
+    """CPU (usuário + sistema) do processo e dos filhos finalizados"""
+    if resource is None:
+        return time.process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return float(own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime)
+
+
+def peak_rss_bytes() -> int:
+    """Pico de memória residente do processo (0 se indisponível)"""
+    if resource is None:
+        return 0
+    peak = int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    # Linux reporta em KiB; macOS em bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class StageMetrics:
+    """Medições de um estágio"""
+
+    name: str
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    peak_rss: int = 0
+    bytes_processed: int = 0
+    status: str = STATUS_OK
+    started_at: float = 0.0
+
+
+class MetricsRecorder:
+    """Coleta métricas de estágios de uma execução (seguro entre threads)"""
+
+    def __init__(self, project: str):
+        self.project = project
+        self.started_at = time.time()
+        self.stages: list[StageMetrics] = []
+        self.counters: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, metrics: StageMetrics) -> StageMetrics:
+        with self._lock:
+            self.stages.append(metrics)
+        return metrics
+
+    def set_counter(self, name: str, value: float) -> None:
+        """Contador da execução (ex.: hits do cache de respostas do LLM)"""
+        with self._lock:
+            self.counters[name] = value
+
+    @contextmanager
+    def stage(self, name: str, bytes_processed: int = 0) -> Iterator[StageMetrics]:
+        """
+        Mede o bloco como um estágio. O objeto entregue pode ter
+        bytes_processed ajustado dentro do bloco; exceções marcam status "error".
+        """
+        metrics = StageMetrics(name, bytes_processed=bytes_processed, started_at=time.time())
+        wall_start = time.perf_counter()
+        cpu_start = cpu_seconds()
+        try:
+            yield metrics
+        except BaseException:
+            metrics.status = STATUS_ERROR
+            raise
+        finally:
+            metrics.wall_time = round(time.perf_counter() - wall_start, 4)
+            metrics.cpu_time = round(cpu_seconds() - cpu_start, 4)
+            metrics.peak_rss = peak_rss_bytes()
+            self.add(metrics)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": METRICS_VERSION,
+            "project": self.project,
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(timespec="seconds"),
+            "total_wall_time": round(time.time() - self.started_at, 4),
+            "stages": [asdict(stage) for stage in self.stages],
+            "counters": dict(self.counters),
+        }
+
+    def write_json(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2, ensure_ascii=False), encoding="utf-8")
+        return path
+
+    def to_prometheus(self) -> str:
+        """Métricas no formato texto de exposição do Prometheus (gauges por estágio)"""
+        series = [
+            ("wall_seconds", "Tempo de parede do estágio", lambda s: s.wall_time),
+            ("cpu_seconds", "Tempo de CPU do processo durante o estágio", lambda s: s.cpu_time),
+            ("peak_rss_bytes", "Pico de RSS do processo ao fim do estágio", lambda s: s.peak_rss),
+            ("bytes_processed", "Bytes processados pelo estágio", lambda s: s.bytes_processed),
+            ("success", "1 se o estágio terminou sem erro", lambda s: int(s.status == STATUS_OK)),
+        ]
+        project = _label(self.project)
+        lines = []
+        for suffix, help_text, value in series:
+            metric = f"{PROMETHEUS_PREFIX}_{suffix}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            for stage in self.stages:
+                labels = f'project="{project}",stage="{_label(stage.name)}"'
+                lines.append(f"{metric}{{{labels}}} {value(stage)}")
+        if self.counters:
+            metric = "crew_run_counter"
+            lines.append(f"# HELP {metric} Contadores da execução")
+            lines.append(f"# TYPE {metric} gauge")
+            for name, count in self.counters.items():
+                labels = f'project="{project}",name="{_label(name)}"'
+                lines.append(f"{metric}{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str | Path) -> Path:
+        """Grava de forma atômica (o textfile collector pode ler a qualquer momento)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(self.to_prometheus(), encoding="utf-8")
+        os.replace(tmp_path, path)
+        return path
+
+    def format_table(self) -> str:
+        """Tabela de tempos para o terminal"""
+        lines = [
+            f"{'Estágio':<32} {'Parede':>9} {'CPU':>9} {'Pico RSS':>10} {'Bytes':>12}  Status",
+            "-" * 84,
+        ]
+        for s in self.stages:
+            lines.append(
+                f"{s.name[:32]:<32} {s.wall_time:>8.2f}s {s.cpu_time:>8.2f}s "
+                f"{s.peak_rss / (1024 * 1024):>8.1f}MB {s.bytes_processed:>12,}  {s.status}"
+            )
+        lines.append("-" * 84)
+        lines.append(f"{'Total':<32} {time.time() - self.started_at:>8.2f}s")
+        for name, count in self.counters.items():
+            lines.append(f"{name:<32} {count:>9g}")
+        return "\n".join(lines)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
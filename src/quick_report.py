@@ -4,12 +4,71 @@ Quick Codebase Report Generator - Sem chamadas API
 Gera relatório estrutural rápido para input da CrewAI
 """
 
+import argparse
+import heapq
+import io
+import json
+import multiprocessing
 import os
+import queue
 import sys
-from collections import defaultdict
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
-from typing import Any
+from typing import TextIO, cast
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.scanner.artifact import (  # noqa: E402
+    FORMAT_JSONL,
+    FORMAT_MSGPACK,
+    artifact_path_for,
+    write_scan_artifact,
+)
+from src.scanner.classify import (  # noqa: E402
+    KIND_BINARY,
+    KIND_GENERATED,
+    KIND_MINIFIED,
+    KIND_SOURCE,
+    classify_file,
+    count_kinds,
+)
+from src.scanner.excerpt import read_excerpt  # noqa: E402
+from src.scanner.hash_index import HashIndex, group_duplicates, hash_files  # noqa: E402
+from src.scanner.import_graph import (  # noqa: E402
+    INDEX_VARIANT,
+    ImportGraph,
+    index_files,
+    module_name,
+)
+from src.scanner.manifest import MANIFEST_FILENAME, ScanManifest  # noqa: E402
+from src.scanner.packer import (  # noqa: E402
+    PRIORITY_CODE_EXCERPT,
+    PRIORITY_DOC_LIST,
+    PRIORITY_DUPLICATES,
+    PRIORITY_ENTRY_POINT,
+    PRIORITY_FILE_LIST,
+    PRIORITY_IMPORT_GRAPH,
+    PRIORITY_LARGE_FILE,
+    PRIORITY_LICENSE,
+    PRIORITY_MANIFEST,
+    PRIORITY_PYTHON_SUMMARY,
+    PRIORITY_README,
+    PRIORITY_TEST_LIST,
+    ReportBlock,
+    estimate_tokens,
+    file_priority,
+    pack_blocks,
+)
+from src.scanner.python_summary import (  # noqa: E402
+    SUMMARY_VARIANT,
+    is_error_summary,
+    summarize_files,
+)
+from src.scanner.walker import scan_tree  # noqa: E402
 
 # Configurações
 IGNORE_FOLDERS = {
@@ -29,56 +88,45 @@ IGNORE_EXTENSIONS = {".log", ".lock", ".pyc", ".pyo", ".tmp", ".cache", ".DS_Sto
 MAX_FILE_SIZE = 1024 * 1024  # 1MB
 
 
-def scan_directory(base_path: str) -> dict:
-    """Escaneia diretório e coleta estatísticas"""
-    stats: dict[str, Any] = {
-        "total_files": 0,
-        "total_size": 0,
-        "by_extension": defaultdict(lambda: {"count": 0, "size": 0}),
-        "by_directory": defaultdict(lambda: {"count": 0, "size": 0}),
-        "files": [],
-    }
-
-    base = Path(base_path)
-
-    for root, dirs, files in os.walk(base):
-        # Remove ignored dirs
-        dirs[:] = [d for d in dirs if d not in IGNORE_FOLDERS]
-
-        rel_root = Path(root).relative_to(base)
-
-        for filename in files:
-            filepath = Path(root) / filename
-
-            # Skip ignored extensions
-            if filepath.suffix.lower() in IGNORE_EXTENSIONS:
-                continue
-
-            try:
-                size = filepath.stat().st_size
-
-                # Skip large files
-                if size > MAX_FILE_SIZE:
-                    continue
-
-                stats["total_files"] += 1
-                stats["total_size"] += size
-
-                ext = filepath.suffix or "no_extension"
-                stats["by_extension"][ext]["count"] += 1
-                stats["by_extension"][ext]["size"] += size
-
-                dir_name = str(rel_root) if str(rel_root) != "." else "root"
-                stats["by_directory"][dir_name]["count"] += 1
-                stats["by_directory"][dir_name]["size"] += size
-
-                stats["files"].append(
-                    {"path": str(filepath.relative_to(base)), "size": size, "ext": ext}
-                )
-
-            except Exception as e:
-                print(f"⚠️ Erro ao processar {filepath}: {e}", file=sys.stderr)
-
+def scan_directory(
+    base_path: str,
+    workers: int | None = None,
+    manifest_path: str | None = None,
+    hash_contents: bool = True,
+) -> dict:
+    """
+    Escaneia diretório e coleta estatísticas (os.scandir + pool de threads)
+
+    Cada arquivo incluído recebe um hash blake2b de conteúdo ("hash"). Com
+    manifest_path, reaproveita o manifesto da execução anterior: apenas arquivos
+    com tamanho/mtime/inode alterados são re-hasheados e os agregados são
+    ajustados pelo delta.
+    """
+    if manifest_path is None:
+        stats = scan_tree(
+            base_path, IGNORE_FOLDERS, IGNORE_EXTENSIONS, MAX_FILE_SIZE, workers=workers
+        )
+        if hash_contents:
+            hash_files(base_path, stats["files"], workers=workers)
+        return stats
+
+    manifest = ScanManifest.load(manifest_path)
+    listing = scan_tree(
+        base_path,
+        IGNORE_FOLDERS,
+        IGNORE_EXTENSIONS,
+        MAX_FILE_SIZE,
+        workers=workers,
+        aggregate=False,
+    )
+    delta = manifest.refresh(base_path, listing["files"], workers=workers)
+    manifest.save()
+    stats = manifest.to_stats()
+    stats["large_files"] = listing["large_files"]
+    print(
+        f"♻️ Manifesto: {delta['unchanged']} reaproveitados, {delta['modified']} alterados, "
+        f"{delta['added']} novos, {delta['removed']} removidos"
+    )
     return stats
 
 
@@ -91,151 +139,840 @@ def format_size(bytes_size):
     return f"{bytes_size:.2f} TB"
 
 
-def read_file_content(filepath: Path, max_lines: int = 100) -> str:
-    """Lê conteúdo de arquivo com limite de linhas"""
+def read_file_content(filepath: Path, max_lines: int = 100, tail_lines: int = 0) -> str:
+    """Lê conteúdo de arquivo com limite de linhas (e amostra do final, se tail_lines > 0)"""
     try:
-        with open(filepath, encoding="utf-8", errors="ignore") as f:
-            lines = f.readlines()[:max_lines]
-            content = "".join(lines)
-            if len(lines) >= max_lines:
-                content += f"\n... (truncado após {max_lines} linhas)\n"
-            return content
+        return read_excerpt(filepath, max_lines=max_lines, tail_lines=tail_lines)
     except Exception as e:
         return f"[Erro ao ler arquivo: {e}]"
 
 
-def generate_report(base_path: str, output_file: str):
-    """Gera relatório markdown"""
+README_NAMES = ["README.md", "README.txt", "README", "readme.md"]
+ENTRY_POINTS = [
+    "main.py",
+    "app.py",
+    "__main__.py",
+    "index.py",
+    "run.py",
+    "setup.py",
+    "pyproject.toml",
+    "package.json",
+]
+# Manifestos de dependências e licenças lidos da raiz do repositório
+DEPENDENCY_MANIFESTS = [
+    "pyproject.toml",
+    "requirements.txt",
+    "setup.cfg",
+    "Pipfile",
+    "environment.yml",
+    "package.json",
+    "go.mod",
+    "Cargo.toml",
+    "Gemfile",
+    "pom.xml",
+    "build.gradle",
+    "composer.json",
+]
+LICENSE_NAMES = ["LICENSE", "LICENSE.md", "LICENSE.txt", "COPYING", "COPYING.md", "NOTICE"]
+DOC_EXTENSIONS = {".md", ".rst", ".adoc"}
+TEST_DIR_NAMES = {"test", "tests", "__tests__", "spec", "specs"}
+CODE_EXTENSIONS = {".py", ".js", ".ts", ".java", ".go", ".rs", ".cpp", ".c", ".rb"}
+# Arquivos Python entram resumidos via AST; as demais linguagens recebem trechos brutos
+RAW_EXCERPT_EXTENSIONS = CODE_EXTENSIONS - {".py"}
+SUMMARY_BATCH_SIZE = 256
+REPORT_BUFFER_SIZE = 64 * 1024
+HASH_INDEX_PATH = Path(__file__).parent.parent / "outputs" / "cache" / "hash_index.sqlite3"
+EXCERPT_VARIANT = "excerpt:v1"
+IMPORT_INDEX_SUFFIX = ".imports.json"
+# Itens listados em cada tabela da seção de arquitetura
+GRAPH_TOP_N = 10
+# Candidatos a trecho bruto quando há orçamento de tokens (o packer filtra)
+PACKED_CODE_CANDIDATES = 50
+
+# Tolerância extra antes de encerrar à força o processo de build_report(in_worker=True)
+WORKER_GRACE_SECONDS = 5.0
+
+# Trecho do relatório: texto fixo (sempre incluído) ou bloco opcional para o packer
+Chunk = str | ReportBlock
+
+
+class ReportTimeoutError(TimeoutError):
+    """Geração do relatório excedeu o tempo limite"""
+
+
+@dataclass
+class ReportContext:
+    """Estado compartilhado pelas seções do relatório"""
+
+    base_path: str
+    stats: dict
+    hash_index: HashIndex | None = None
+    token_budget: int | None = None
+    # time.monotonic() limite para a geração (timeout cooperativo)
+    deadline: float | None = None
+    # hash de conteúdo -> primeiro caminho cujo trecho entrou no relatório
+    excerpted: dict[str, str] = field(default_factory=dict)
+    _hashes: dict[str, str] | None = None
+    # Montado pela seção de arquitetura; persistido ao lado do relatório
+    import_graph: ImportGraph | None = None
+
+    @property
+    def base(self) -> Path:
+        return Path(self.base_path)
+
+    def check_deadline(self) -> None:
+        """Interrompe a geração se o prazo do relatório tiver passado"""
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise ReportTimeoutError(f"Relatório de {self.base_path} excedeu o tempo limite")
+
+    def file_hash(self, rel_path: str) -> str | None:
+        if self._hashes is None:
+            self._hashes = {f["path"]: f["hash"] for f in self.stats["files"] if f.get("hash")}
+        return self._hashes.get(rel_path)
+
+    def file_kind(self, info: dict) -> str:
+        """Classificação do arquivo; arquivos não hasheados (ex.: grandes) são examinados aqui"""
+        if "kind" not in info:
+            info["kind"] = classify_file(self.base / info["path"], info["path"])
+        return str(info["kind"])
+
+    def excerpt(self, rel_path: str, max_lines: int, tail_lines: int = 0) -> str:
+        """Trecho do arquivo; conteúdo repetido vira referência ao primeiro trecho pelo hash"""
+        filepath = self.base / rel_path
+        digest = self.file_hash(rel_path)
+        if digest is None:
+            return read_file_content(filepath, max_lines=max_lines, tail_lines=tail_lines)
+
+        first = self.excerpted.setdefault(digest, rel_path)
+        if first != rel_path:
+            return f"[Conteúdo idêntico a `{first}` — blake2b:{digest[:12]}]"
+        if self.hash_index is None:
+            return read_file_content(filepath, max_lines=max_lines, tail_lines=tail_lines)
+
+        try:
+            return self.hash_index.get_or_compute(
+                digest,
+                f"{EXCERPT_VARIANT}:{max_lines}:{tail_lines}",
+                lambda: read_excerpt(filepath, max_lines=max_lines, tail_lines=tail_lines),
+            )
+        except Exception as e:
+            return f"[Erro ao ler arquivo: {e}]"
+
+    def python_summaries(self, files: list[dict]) -> dict[str, str]:
+        """Resumos AST dos arquivos; conteúdo repetido ou já indexado não é reprocessado"""
+        summaries: dict[str, str] = {}
+        pending: list[dict] = []
+        for info in files:
+            path, digest = info["path"], info.get("hash")
+            if digest:
+                first = self.excerpted.setdefault(digest, path)
+                if first != path:
+                    summaries[path] = f"# Conteúdo idêntico a `{first}` — blake2b:{digest[:12]}"
+                    continue
+                if self.hash_index is not None:
+                    cached = self.hash_index.get(digest, SUMMARY_VARIANT)
+                    if cached is not None:
+                        summaries[path] = cached
+                        continue
+            pending.append(info)
+
+        computed = summarize_files([self.base / info["path"] for info in pending])
+        for info, summary in zip(pending, computed, strict=True):
+            summaries[info["path"]] = summary
+            digest = info.get("hash")
+            if digest and self.hash_index is not None and not is_error_summary(summary):
+                self.hash_index.put(digest, SUMMARY_VARIANT, summary)
+        return summaries
+
+    def build_import_graph(self, files: list[dict]) -> ImportGraph:
+        """Grafo de imports e símbolos; índices por arquivo são reaproveitados pelo hash"""
+        results: list[dict | None] = [None] * len(files)
+        pending: list[int] = []
+        jobs: list[tuple[str, str, bool]] = []
+        for i, info in enumerate(files):
+            module, is_package = module_name(info["path"])
+            digest = info.get("hash")
+            if digest and self.hash_index is not None:
+                cached = self.hash_index.get(digest, f"{INDEX_VARIANT}:{module}:{is_package:d}")
+                if cached is not None:
+                    results[i] = json.loads(cached)
+                    continue
+            pending.append(i)
+            jobs.append((str(self.base / info["path"]), module, is_package))
+
+        for i, job, result in zip(pending, jobs, index_files(jobs), strict=True):
+            results[i] = result
+            digest = files[i].get("hash")
+            if result is not None and digest and self.hash_index is not None:
+                variant = f"{INDEX_VARIANT}:{job[1]}:{job[2]:d}"
+                self.hash_index.put(digest, variant, json.dumps(result, separators=(",", ":")))
+
+        self.import_graph = ImportGraph.build(files, results)
+        return self.import_graph
+
+
+def is_source(info: dict) -> bool:
+    """Arquivo classificado como fonte (sem classificação conta como fonte)"""
+    return bool(info.get("kind", KIND_SOURCE) == KIND_SOURCE)
+
+
+def select_code_files(stats: dict, limit: int = 10) -> list[dict]:
+    """Maiores arquivos-fonte de código não-Python (sem ordenar a lista completa)"""
+    code_files = (f for f in stats["files"] if f["ext"] in RAW_EXCERPT_EXTENSIONS and is_source(f))
+    return heapq.nlargest(limit, code_files, key=itemgetter("size"))
+
+
+def python_files(stats: dict) -> list[dict]:
+    return [f for f in stats["files"] if f["ext"] == ".py" and is_source(f)]
+
+
+def _header_section(ctx: ReportContext) -> Iterator[Chunk]:
+    stats = ctx.stats
+    yield "# 📊 Relatório Técnico da Codebase\n"
+    yield f"**Gerado em:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+    yield f"**Diretório analisado:** `{ctx.base_path}`\n"
+    yield f"**Total de arquivos:** {stats['total_files']}\n"
+    yield f"**Tamanho total:** {format_size(stats['total_size'])}\n"
+    kinds = count_kinds(stats["files"])
+    skipped = [
+        f"{kinds[kind]} {label}"
+        for kind, label in (
+            (KIND_BINARY, "binários"),
+            (KIND_GENERATED, "gerados"),
+            (KIND_MINIFIED, "minificados"),
+        )
+        if kinds.get(kind)
+    ]
+    if skipped:
+        yield f"**Sem trechos no relatório:** {', '.join(skipped)}\n"
+    yield "\n"
+
+
+def _extension_section(ctx: ReportContext) -> Iterator[Chunk]:
+    yield "## 📈 Distribuição por Extensão\n\n"
+    sorted_exts = heapq.nlargest(20, ctx.stats["by_extension"].items(), key=lambda x: x[1]["count"])
+    for ext, data in sorted_exts:
+        yield f"- **{ext}**: {data['count']} arquivos ({format_size(data['size'])})\n"
+
+
+def _directory_section(ctx: ReportContext) -> Iterator[Chunk]:
+    yield "\n## 📁 Estrutura de Diretórios\n\n"
+    sorted_dirs = heapq.nlargest(30, ctx.stats["by_directory"].items(), key=lambda x: x[1]["count"])
+    for dir_name, data in sorted_dirs:
+        yield f"- `{dir_name}`: {data['count']} arquivos ({format_size(data['size'])})\n"
+
+
+def _readme_section(ctx: ReportContext) -> Iterator[Chunk]:
+    yield "\n## 📖 README / Descrição do Projeto\n\n"
+    for readme_name in README_NAMES:
+        if (ctx.base / readme_name).exists():
+            yield ReportBlock(
+                f"readme:{readme_name}",
+                f"### Conteúdo de {readme_name}\n\n"
+                f"```\n{ctx.excerpt(readme_name, max_lines=200)}\n```\n\n",
+                PRIORITY_README,
+            )
+            return
+    yield "*Nenhum README encontrado*\n\n"
+
+
+def _license_section(ctx: ReportContext) -> Iterator[Chunk]:
+    found = [name for name in LICENSE_NAMES if (ctx.base / name).is_file()]
+    if not found:
+        yield "\n## 📜 Licenças\n\n*Nenhum arquivo de licença na raiz*\n\n"
+        return
+    yield "\n## 📜 Licenças\n\n"
+    for name in found:
+        yield ReportBlock(
+            f"license:{name}",
+            f"### {name}\n\n```\n{ctx.excerpt(name, max_lines=30)}\n```\n\n",
+            PRIORITY_LICENSE,
+        )
+
+
+def _dependency_manifest_section(ctx: ReportContext) -> Iterator[Chunk]:
+    found = [name for name in DEPENDENCY_MANIFESTS if (ctx.base / name).is_file()]
+    if not found:
+        return
+    yield "\n## 🧾 Manifestos de Dependências\n\n"
+    for name in found:
+        yield ReportBlock(
+            f"manifest:{name}",
+            f"### {name}\n\n```\n{ctx.excerpt(name, max_lines=80)}\n```\n\n",
+            PRIORITY_MANIFEST,
+        )
+
+
+def is_test_path(path: str) -> bool:
+    """Arquivo de teste pelo caminho (diretório tests/, test_*.py, *.test.js, *_spec.rb...)"""
+    parts = Path(path).parts
+    name = parts[-1].lower()
+    stem = name.split(".")[0]
+    return (
+        any(part.lower() in TEST_DIR_NAMES for part in parts[:-1])
+        or stem.startswith("test_")
+        or stem.endswith(("_test", "_spec"))
+        or ".test." in name
+        or ".spec." in name
+    )
+
 
-    print(f"📊 Escaneando: {base_path}")
-    stats = scan_directory(base_path)
-    base = Path(base_path)
-
-    # Gera relatório
-    report = []
-    report.append("# 📊 Relatório Técnico da Codebase\n")
-    report.append(f"**Gerado em:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-    report.append(f"**Diretório analisado:** `{base_path}`\n")
-    report.append(f"**Total de arquivos:** {stats['total_files']}\n")
-    report.append(f"**Tamanho total:** {format_size(stats['total_size'])}\n\n")
-
-    # Estatísticas por extensão
-    report.append("## 📈 Distribuição por Extensão\n\n")
-    sorted_exts = sorted(stats["by_extension"].items(), key=lambda x: x[1]["count"], reverse=True)
-
-    for ext, data in sorted_exts[:20]:  # Top 20
-        report.append(f"- **{ext}**: {data['count']} arquivos ({format_size(data['size'])})\n")
-
-    report.append("\n## 📁 Estrutura de Diretórios\n\n")
-    sorted_dirs = sorted(stats["by_directory"].items(), key=lambda x: x[1]["count"], reverse=True)
-
-    for dir_name, data in sorted_dirs[:30]:  # Top 30
-        report.append(f"- `{dir_name}`: {data['count']} arquivos ({format_size(data['size'])})\n")
-
-    # NOVO: Lê e inclui conteúdo do README se existir
-    report.append("\n## 📖 README / Descrição do Projeto\n\n")
-    readme_found = False
-    for readme_name in ["README.md", "README.txt", "README", "readme.md"]:
-        readme_path = base / readme_name
-        if readme_path.exists():
-            report.append(f"### Conteúdo de {readme_name}\n\n")
-            content = read_file_content(readme_path, max_lines=200)
-            report.append(f"```\n{content}\n```\n\n")
-            readme_found = True
-            break
-
-    if not readme_found:
-        report.append("*Nenhum README encontrado*\n\n")
-
-    # NOVO: Lê arquivos principais de código
-    report.append("\n## 💻 Código Principal\n\n")
-
-    # Procura por arquivos de entrada comuns
-    entry_points = [
-        "main.py",
-        "app.py",
-        "__main__.py",
-        "index.py",
-        "run.py",
-        "setup.py",
-        "pyproject.toml",
-        "package.json",
+def _tests_section(ctx: ReportContext) -> Iterator[Chunk]:
+    tests = [
+        f for f in ctx.stats["files"] if f["ext"] in CODE_EXTENSIONS and is_test_path(f["path"])
     ]
-    found_entry = False
-
-    for entry in entry_points:
-        entry_path = base / entry
-        if entry_path.exists():
-            report.append(f"### {entry}\n\n")
-            content = read_file_content(entry_path, max_lines=100)  # Aumentado para 100
-            report.append(f"```\n{content}\n```\n\n")
-            found_entry = True
-            break
-
-    if not found_entry:
-        report.append("*Nenhum arquivo de entrada principal identificado*\n\n")
-
-    # MELHORADO: Lista TODOS os arquivos Python/JS principais com snippets MAIORES
-    report.append("\n## 📄 Arquivos de Código Detalhados\n\n")
-    report.append(
-        "*Esta seção contém amostras dos principais arquivos de código para análise detalhada.*\n\n"
+    yield "\n## 🧪 Testes\n\n"
+    if not tests:
+        yield "*Nenhum arquivo de teste identificado*\n\n"
+        return
+    total = sum(f["size"] for f in tests)
+    yield f"*{len(tests)} arquivos de teste ({format_size(total)}).*\n\n"
+    lines = [
+        f"- `{f['path']}` ({format_size(f['size'])})\n"
+        for f in heapq.nsmallest(50, tests, key=itemgetter("path"))
+    ]
+    yield ReportBlock("tests", "".join(lines), PRIORITY_TEST_LIST)
+
+
+def _documentation_section(ctx: ReportContext) -> Iterator[Chunk]:
+    readmes = set(README_NAMES)
+    docs = [
+        f for f in ctx.stats["files"] if f["ext"] in DOC_EXTENSIONS and f["path"] not in readmes
+    ]
+    if not docs:
+        return
+    yield "\n## 📚 Documentação\n\n"
+    lines = [
+        f"- `{f['path']}` ({format_size(f['size'])})\n"
+        for f in heapq.nsmallest(50, docs, key=itemgetter("path"))
+    ]
+    yield ReportBlock("docs", "".join(lines), PRIORITY_DOC_LIST)
+
+
+def _import_graph_section(ctx: ReportContext) -> Iterator[Chunk]:
+    files = python_files(ctx.stats)
+    if not files:
+        return
+    graph = ctx.build_import_graph(files)
+    edges = sum(len(targets) for targets in graph.edges.values())
+    cycles = graph.cycles()
+    yield "\n## 🕸️ Arquitetura Python (Grafo de Imports)\n\n"
+    yield (
+        f"*{len(graph.modules)} módulos, {edges} dependências internas, "
+        f"{len(cycles)} ciclos de import.*\n\n"
     )
 
-    code_files = [
-        f
-        for f in stats["files"]
-        if f["ext"] in [".py", ".js", ".ts", ".java", ".go", ".rs", ".cpp", ".c", ".rb"]
+    lines = ["### Módulos mais importados (fan-in)\n\n"]
+    lines += [
+        f"- `{module}` — {count} importadores\n"
+        for module, count in graph.fan_in().most_common(GRAPH_TOP_N)
+        if count
     ]
-    sorted_code = sorted(code_files, key=lambda x: x["size"], reverse=True)[
-        :10
-    ]  # Aumentado para 10 arquivos
-
-    for file_info in sorted_code:
-        filepath = base / file_info["path"]
-        if filepath.exists() and "test" not in file_info["path"].lower():  # Pula arquivos de teste
-            report.append(f"### {file_info['path']} ({format_size(file_info['size'])})\n\n")
-            content = read_file_content(filepath, max_lines=80)  # Aumentado para 80 linhas
-            report.append(f"```python\n{content}\n```\n\n")
-
-    # Lista todos arquivos (mais resumido)
-    report.append("\n## 📂 Lista Completa de Arquivos\n\n")
-    sorted_files = sorted(stats["files"], key=lambda x: x["size"], reverse=True)
-
-    for file in sorted_files[:50]:  # Top 50
-        report.append(f"- `{file['path']}` ({format_size(file['size'])})\n")
-
-    report.append("\n---\n")
-    report.append("*Relatório gerado automaticamente para análise CrewAI*\n")
-    report.append("\n**IMPORTANTE:** Este relatório contém código real do projeto. ")
-    report.append(
-        "A análise deve ser baseada EXCLUSIVAMENTE no código e documentação fornecidos acima.\n"
+    lines.append("\n### Módulos com mais dependências internas (fan-out)\n\n")
+    lines += [
+        f"- `{module}` — {count} dependências\n"
+        for module, count in graph.fan_out().most_common(GRAPH_TOP_N)
+        if count
+    ]
+    if cycles:
+        lines.append("\n### ⚠️ Ciclos de import\n\n")
+        lines += [f"- {' ↔ '.join(f'`{m}`' for m in cycle)}\n" for cycle in cycles[:GRAPH_TOP_N]]
+
+    lines.append("\n### Camadas (0 = sem dependências internas)\n\n")
+    for depth, layer in enumerate(graph.layers()):
+        shown = ", ".join(f"`{m}`" for m in layer[:8])
+        extra = f" e mais {len(layer) - 8}" if len(layer) > 8 else ""
+        lines.append(f"- **Camada {depth}** ({len(layer)} módulos): {shown}{extra}\n")
+
+    referenced = graph.most_referenced(GRAPH_TOP_N)
+    if referenced:
+        lines.append("\n### Símbolos mais referenciados\n\n")
+        for symbol, users in referenced:
+            definition = graph.definitions[symbol]
+            lines.append(
+                f"- `{symbol}` ({definition['kind']}, `{definition['path']}:{definition['line']}`)"
+                f" — usado por {users} módulos\n"
+            )
+
+    external = Counter(
+        package
+        for packages in graph.external.values()
+        for package in packages
+        if package not in sys.stdlib_module_names
+    )
+    if external:
+        lines.append("\n### Dependências externas mais usadas\n\n")
+        lines += [
+            f"- `{package}` — {count} módulos\n"
+            for package, count in external.most_common(GRAPH_TOP_N)
+        ]
+    yield ReportBlock("import_graph", "".join(lines) + "\n", PRIORITY_IMPORT_GRAPH)
+
+
+def _entry_point_section(ctx: ReportContext) -> Iterator[Chunk]:
+    yield "\n## 💻 Código Principal\n\n"
+    for entry in ENTRY_POINTS:
+        if (ctx.base / entry).exists():
+            yield ReportBlock(
+                f"entry:{entry}",
+                f"### {entry}\n\n```\n{ctx.excerpt(entry, max_lines=100)}\n```\n\n",
+                PRIORITY_ENTRY_POINT,
+            )
+            return
+    yield "*Nenhum arquivo de entrada principal identificado*\n\n"
+
+
+def _python_structure_section(ctx: ReportContext) -> Iterator[Chunk]:
+    files = python_files(ctx.stats)
+    if not files:
+        return
+    yield "\n## 🧬 Estrutura do Código Python\n\n"
+    yield (
+        "*Resumo estrutural (AST) de todos os arquivos Python: assinaturas, decorators, "
+        "primeira linha das docstrings e número de chamadas por função.*\n\n"
     )
+    # Em lotes, para que o pool de processos trabalhe enquanto o relatório é escrito
+    for start in range(0, len(files), SUMMARY_BATCH_SIZE):
+        ctx.check_deadline()
+        batch = files[start : start + SUMMARY_BATCH_SIZE]
+        summaries = ctx.python_summaries(batch)
+        for file_info in batch:
+            path, size = file_info["path"], file_info["size"]
+            summary = summaries[path] or "# (sem definições)"
+            yield ReportBlock(
+                f"python:{path}",
+                f"### {path} ({format_size(size)})\n\n```python\n{summary}\n```\n\n",
+                file_priority(path, size, PRIORITY_PYTHON_SUMMARY),
+            )
+
+
+def _code_files_section(ctx: ReportContext) -> Iterator[Chunk]:
+    yield "\n## 📄 Arquivos de Código Detalhados\n\n"
+    yield "*Esta seção contém amostras dos principais arquivos de código para análise detalhada.*\n\n"
+    # Com orçamento de tokens, o packer escolhe entre mais candidatos
+    limit = 10 if ctx.token_budget is None else PACKED_CODE_CANDIDATES
+    for file_info in select_code_files(ctx.stats, limit=limit):
+        path, size = file_info["path"], file_info["size"]
+        if (ctx.base / path).exists() and "test" not in path.lower():  # Pula arquivos de teste
+            yield ReportBlock(
+                f"code:{path}",
+                f"### {path} ({format_size(size)})\n\n"
+                f"```\n{ctx.excerpt(path, max_lines=80)}\n```\n\n",
+                file_priority(path, size, PRIORITY_CODE_EXCERPT),
+            )
+
+
+def _large_files_section(ctx: ReportContext) -> Iterator[Chunk]:
+    large_code = [
+        f
+        for f in ctx.stats.get("large_files", [])
+        if f["ext"] in CODE_EXTENSIONS and ctx.file_kind(f) == KIND_SOURCE
+    ]
+    if not large_code:
+        return
+    yield "\n## 📦 Arquivos Grandes (amostragem início/fim)\n\n"
+    for file_info in heapq.nlargest(5, large_code, key=itemgetter("size")):
+        path = file_info["path"]
+        content = ctx.excerpt(path, max_lines=40, tail_lines=20)
+        yield ReportBlock(
+            f"large:{path}",
+            f"### {path} ({format_size(file_info['size'])})\n\n```\n{content}\n```\n\n",
+            PRIORITY_LARGE_FILE,
+        )
+
+
+def _duplicates_section(ctx: ReportContext) -> Iterator[Chunk]:
+    duplicates = group_duplicates(ctx.stats["files"])
+    if not duplicates:
+        return
+    yield "\n## ♻️ Conteúdo Duplicado\n\n"
+    yield "*Arquivos com conteúdo idêntico (mesmo hash blake2b), resumidos uma única vez.*\n\n"
+    # Grupos que mais desperdiçam espaço primeiro
+    groups = heapq.nlargest(20, duplicates.items(), key=lambda x: x[1][0]["size"] * (len(x[1]) - 1))
+    lines = []
+    for digest, items in groups:
+        paths = ", ".join(f"`{f['path']}`" for f in items[:5])
+        extra = f" e mais {len(items) - 5}" if len(items) > 5 else ""
+        lines.append(
+            f"- `blake2b:{digest[:12]}` — {len(items)} cópias de "
+            f"{format_size(items[0]['size'])}: {paths}{extra}\n"
+        )
+    yield ReportBlock("duplicates", "".join(lines), PRIORITY_DUPLICATES)
+
+
+def _file_list_section(ctx: ReportContext) -> Iterator[Chunk]:
+    yield "\n## 📂 Lista Completa de Arquivos\n\n"
+    lines = [
+        f"- `{file['path']}` ({format_size(file['size'])})\n"
+        for file in heapq.nlargest(50, ctx.stats["files"], key=itemgetter("size"))
+    ]
+    yield ReportBlock("file_list", "".join(lines), PRIORITY_FILE_LIST)
+
+
+def _footer_section(ctx: ReportContext) -> Iterator[Chunk]:
+    yield "\n---\n"
+    yield "*Relatório gerado automaticamente para análise CrewAI*\n"
+    yield "\n**IMPORTANTE:** Este relatório contém código real do projeto. "
+    yield "A análise deve ser baseada EXCLUSIVAMENTE no código e documentação fornecidos acima.\n"
+
+
+# Pipeline de seções, na ordem em que aparecem no relatório
+REPORT_SECTIONS = [
+    _header_section,
+    _extension_section,
+    _directory_section,
+    _readme_section,
+    _documentation_section,
+    _entry_point_section,
+    _dependency_manifest_section,
+    _license_section,
+    _import_graph_section,
+    _python_structure_section,
+    _code_files_section,
+    _large_files_section,
+    _duplicates_section,
+    _tests_section,
+    _file_list_section,
+    _footer_section,
+]
+
+
+def iter_report(ctx: ReportContext) -> Iterator[Iterator[Chunk]]:
+    """Gera as seções do relatório; cada seção é um gerador de trechos markdown"""
+    for section in REPORT_SECTIONS:
+        ctx.check_deadline()
+        yield section(ctx)
+
+
+def _chunk_text(chunk: Chunk) -> str:
+    return chunk.text if isinstance(chunk, ReportBlock) else chunk
+
+
+def write_report(
+    sections: Iterable[Iterable[Chunk]], sink: TextIO, token_budget: int | None = None
+) -> int:
+    """
+    Escreve as seções no destino; retorna a estimativa de tokens escritos
+
+    Sem orçamento, cada seção é escrita assim que gerada. Com token_budget, os
+    ReportBlock são coletados e o packer escolhe quais cabem no orçamento
+    (texto fixo, como títulos e estatísticas, é sempre incluído).
+    """
+    selected: set[str] | None = None
+    if token_budget is not None:
+        sections = [list(section) for section in sections]
+        fixed = sum(estimate_tokens(c) for s in sections for c in s if isinstance(c, str))
+        blocks = [c for s in sections for c in s if isinstance(c, ReportBlock)]
+        selected = pack_blocks(blocks, token_budget - fixed)
+        print(
+            f"🎒 Packer: {len(selected)}/{len(blocks)} blocos no orçamento de {token_budget:,} tokens"
+        )
+
+    tokens = 0
+    flush = getattr(sink, "flush", None)
+    for section in sections:
+        for chunk in section:
+            if (
+                selected is not None
+                and isinstance(chunk, ReportBlock)
+                and chunk.key not in selected
+            ):
+                continue
+            text = _chunk_text(chunk)
+            sink.write(text)
+            tokens += estimate_tokens(text)
+        # Cada seção concluída já fica disponível no destino
+        if flush:
+            flush()
+    return tokens
+
+
+def _render(
+    base_path: str,
+    sink: TextIO,
+    manifest_path: str | None = None,
+    use_hash_index: bool = True,
+    token_budget: int | None = None,
+    deadline: float | None = None,
+) -> tuple["ReportContext", int]:
+    """Escaneia e escreve o relatório no destino; retorna (contexto, tokens estimados)"""
+    print(f"📊 Escaneando: {base_path}")
+    stats = scan_directory(base_path, manifest_path=manifest_path)
 
-    # Salva relatório
-    content = "".join(report)
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write(content)
+    hash_index = HashIndex(HASH_INDEX_PATH) if use_hash_index else None
+    try:
+        ctx = ReportContext(
+            base_path, stats, hash_index, token_budget=token_budget, deadline=deadline
+        )
+        tokens = write_report(iter_report(ctx), sink, token_budget)
+    finally:
+        if hash_index is not None:
+            print(f"#️⃣ Índice de hash: {hash_index.hits} reaproveitados, {hash_index.misses} novos")
+            hash_index.close()
+    return ctx, tokens
+
+
+def _manifest_path_for(output_file: str | os.PathLike | None, use_manifest: bool) -> str | None:
+    if not use_manifest or output_file is None:
+        return None
+    return str(Path(output_file).resolve().parent / MANIFEST_FILENAME)
+
+
+def generate_report(
+    base_path: str,
+    output_file: str | TextIO,
+    use_manifest: bool = True,
+    use_hash_index: bool = True,
+    token_budget: int | None = None,
+    artifact_format: str | None = FORMAT_JSONL,
+) -> int:
+    """
+    Gera relatório markdown em streaming
+
+    Args:
+        base_path: Diretório a ser analisado
+        output_file: Caminho do relatório ou qualquer objeto com write()
+        use_manifest: Salva/reaproveita o manifesto de varredura ao lado do relatório
+        use_hash_index: Reaproveita trechos já calculados (por hash) em HASH_INDEX_PATH
+        token_budget: Limite de tokens do relatório (None inclui todo o conteúdo)
+        artifact_format: Formato do artefato estruturado gravado ao lado do relatório
+            ("jsonl", "msgpack" ou None para não gravar)
+
+    Returns:
+        Estimativa de tokens do relatório gerado
+    """
+    if isinstance(output_file, (str, os.PathLike)):
+        manifest_path = _manifest_path_for(output_file, use_manifest)
+        with open(output_file, "w", encoding="utf-8", buffering=REPORT_BUFFER_SIZE) as f:
+            ctx, tokens = _render(base_path, f, manifest_path, use_hash_index, token_budget)
+        _write_artifact(ctx.stats, output_file, base_path, artifact_format, tokens)
+        _write_import_index(ctx, output_file)
+    else:
+        ctx, tokens = _render(base_path, output_file, None, use_hash_index, token_budget)
 
     print(f"✅ Relatório gerado: {output_file}")
+    _print_summary(ctx.stats, tokens)
+    return tokens
+
+
+def _write_artifact(
+    stats: dict, output_file: str | os.PathLike, base_path: str, fmt: str | None, tokens: int
+) -> str | None:
+    """Grava o artefato de varredura ao lado do relatório; retorna o caminho (ou None)"""
+    if fmt is None:
+        return None
+    path = write_scan_artifact(
+        stats, artifact_path_for(Path(output_file), fmt), base_path, fmt, report_tokens=tokens
+    )
+    print(f"🧾 Artefato estruturado: {path}")
+    return str(path)
+
+
+def import_index_path_for(report_path: str | os.PathLike) -> Path:
+    """Caminho do índice de imports ao lado do relatório (relatorio.md -> relatorio.imports.json)"""
+    report_path = Path(report_path)
+    return report_path.with_name(report_path.stem + IMPORT_INDEX_SUFFIX)
+
+
+def _write_import_index(ctx: ReportContext, output_file: str | os.PathLike) -> str | None:
+    """Persiste o grafo de imports montado durante o relatório (None se não houver Python)"""
+    if ctx.import_graph is None:
+        return None
+    path = import_index_path_for(output_file)
+    ctx.import_graph.save(path)
+    print(f"🕸️ Índice de imports: {path}")
+    return str(path)
+
+
+def _print_summary(stats: dict, tokens: int) -> None:
     print(f"📊 Total processado: {stats['total_files']} arquivos")
     print(
-        f"📄 Conteúdo incluído: README + {len(sorted_code)} arquivos de código com ~80 linhas cada"
+        f"📄 Conteúdo incluído: README + {len(python_files(stats))} arquivos Python resumidos + "
+        f"{len(select_code_files(stats))} arquivos de código com ~80 linhas cada"
+    )
+    print(f"🔢 Tokens estimados: {tokens:,}")
+
+
+@dataclass
+class ReportResult:
+    """Relatório base renderizado, com as estatísticas da varredura em memória"""
+
+    repo_path: str
+    text: str
+    stats: dict
+    tokens: int
+    elapsed: float
+    output_file: str | None = None
+    artifact_path: str | None = None
+    import_index_path: str | None = None
+
+
+def _plain_stats(stats: dict) -> dict:
+    """Converte os defaultdicts da varredura em dicts simples (serializáveis com pickle)"""
+    plain = dict(stats)
+    for key in ("by_extension", "by_directory"):
+        plain[key] = {k: dict(v) for k, v in stats[key].items()}
+    return plain
+
+
+def build_report(
+    repo_path: str,
+    output_file: str | os.PathLike | None = None,
+    token_budget: int | None = None,
+    use_manifest: bool = True,
+    use_hash_index: bool = True,
+    timeout: float | None = None,
+    in_worker: bool = False,
+    artifact_format: str | None = FORMAT_JSONL,
+) -> ReportResult:
+    """
+    Gera o relatório base em memória (API usada por analyze_repo e streamlit_app)
+
+    Args:
+        repo_path: Diretório a ser analisado
+        output_file: Se informado, também grava o relatório nesse caminho
+        token_budget: Limite de tokens do relatório (None inclui todo o conteúdo)
+        use_manifest: Salva/reaproveita o manifesto de varredura ao lado de output_file
+        use_hash_index: Reaproveita trechos já calculados (por hash) em HASH_INDEX_PATH
+        timeout: Segundos até interromper a geração (verificado entre seções)
+        in_worker: Executa em um processo separado, encerrado se exceder o timeout
+        artifact_format: Formato do artefato estruturado gravado ao lado de output_file
+            ("jsonl", "msgpack" ou None para não gravar)
+
+    Returns:
+        ReportResult com texto, estatísticas e tokens estimados
+
+    Raises:
+        ReportTimeoutError: Se a geração exceder o timeout
+    """
+    if in_worker:
+        return _build_in_worker(
+            repo_path,
+            timeout,
+            output_file=output_file,
+            token_budget=token_budget,
+            use_manifest=use_manifest,
+            use_hash_index=use_hash_index,
+            artifact_format=artifact_format,
+        )
+
+    start = time.monotonic()
+    deadline = None if timeout is None else start + timeout
+    buffer = io.StringIO()
+    ctx, tokens = _render(
+        repo_path,
+        buffer,
+        _manifest_path_for(output_file, use_manifest),
+        use_hash_index,
+        token_budget,
+        deadline,
+    )
+    text = buffer.getvalue()
+    stats = ctx.stats
+    artifact_path = import_index_path = None
+    if output_file is not None:
+        Path(output_file).write_text(text, encoding="utf-8")
+        artifact_path = _write_artifact(stats, output_file, repo_path, artifact_format, tokens)
+        import_index_path = _write_import_index(ctx, output_file)
+        output_file = str(output_file)
+
+    _print_summary(stats, tokens)
+    return ReportResult(
+        repo_path,
+        text,
+        _plain_stats(stats),
+        tokens,
+        time.monotonic() - start,
+        output_file,
+        artifact_path,
+        import_index_path,
     )
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("Uso: python quick_report.py <diretorio>")
-        sys.exit(1)
+def _worker_main(result_queue, repo_path: str, timeout: float | None, kwargs: dict) -> None:
+    try:
+        result_queue.put((True, build_report(repo_path, timeout=timeout, **kwargs)))
+    except Exception as e:
+        result_queue.put((False, e))
+
+
+def _build_in_worker(repo_path: str, timeout: float | None, **kwargs) -> ReportResult:
+    """Roda build_report em um processo filho; o timeout cooperativo vale dentro dele"""
+    context = multiprocessing.get_context("spawn")
+    result_queue = context.Queue()
+    process = context.Process(
+        target=_worker_main, args=(result_queue, repo_path, timeout, kwargs), daemon=True
+    )
+    process.start()
+
+    # Tolerância para o processo subir e finalizar antes de ser encerrado à força
+    deadline = None if timeout is None else time.monotonic() + timeout + WORKER_GRACE_SECONDS
+    try:
+        while True:
+            try:
+                ok, payload = result_queue.get(timeout=0.2)
+                break
+            except queue.Empty:
+                if not process.is_alive():
+                    raise RuntimeError(
+                        f"Processo do relatório terminou sem resultado (código {process.exitcode})"
+                    ) from None
+                if deadline is not None and time.monotonic() > deadline:
+                    raise ReportTimeoutError(
+                        f"Relatório de {repo_path} excedeu {timeout}s"
+                    ) from None
+    finally:
+        if process.is_alive():
+            process.join(timeout=1)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+    if not ok:
+        raise payload
+    return cast(ReportResult, payload)
+
+
+def default_token_budget() -> int | None:
+    """Orçamento de tokens de crew_config.llm_config.report_token_budget (None se ausente)"""
+    try:
+        from utils.config_loader import load_config
+
+        budget = load_config().get_llm_config().get("report_token_budget")
+    except Exception:
+        return None
+    return int(budget) if budget else None
+
 
-    base_path = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else "relatorio_codebase.md"
+def main():
+    parser = argparse.ArgumentParser(description="Gera relatório rápido de uma codebase")
+    parser.add_argument("base_path", help="Diretório a ser analisado")
+    parser.add_argument("output_file", nargs="?", default="relatorio_codebase.md")
+    parser.add_argument(
+        "--token-budget",
+        type=int,
+        default=None,
+        help="Limite de tokens do relatório (padrão: llm_config.report_token_budget; 0 desativa)",
+    )
+    parser.add_argument(
+        "--artifact-format",
+        choices=[FORMAT_JSONL, FORMAT_MSGPACK, "none"],
+        default=FORMAT_JSONL,
+        help="Artefato estruturado gravado ao lado do relatório",
+    )
+    args = parser.parse_args()
 
-    if not os.path.exists(base_path):
-        print(f"❌ Diretório não encontrado: {base_path}")
+    if not os.path.exists(args.base_path):
+        print(f"❌ Diretório não encontrado: {args.base_path}")
         sys.exit(1)
 
-    generate_report(base_path, output_file)
+    budget = default_token_budget() if args.token_budget is None else args.token_budget
+    generate_report(
+        args.base_path,
+        args.output_file,
+        token_budget=budget or None,
+        artifact_format=None if args.artifact_format == "none" else args.artifact_format,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,183 @@
+"""
+💾 Run Checkpoint - Execuções retomáveis da análise
+===================================================
+
+Cada execução ganha um diretório outputs/runs/<run_id>, com run_id formado por
+projeto, commit analisado e hash da configuração. Ao concluir um estágio
+(clone, relatório base, cada task da crew, relatório final) o resultado é
+gravado ali. Com `analyze_repo.py --resume <run_id>` os estágios concluídos são
+pulados e as saídas das tasks já pagas seguem como contexto das que dependem delas.
+
+Estrutura:
+    outputs/runs/<run_id>/
+        manifest.json                   # repo, commit, config e estágios concluídos
+        relatorio_codebase_inicial.md   # relatório base
+        tasks/<task>.md                 # saída de cada task da crew
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+RUNS_DIR = Path(__file__).parent.parent / "outputs" / "runs"
+MANIFEST_FILE = "manifest.json"
+BASE_REPORT_FILE = "relatorio_codebase_inicial.md"
+CHECKPOINT_VERSION = 1
+
+STAGE_CLONE = "clone"
+STAGE_BASE_REPORT = "base_report"
+STAGE_CREW = "crew"
+TASK_STAGE_PREFIX = "crew.task."
+
+
+class CheckpointError(RuntimeError):
+    """Execução inexistente ou incompatível com a configuração atual"""
+
+
+def config_hash(config_path: str | Path, *extra: str) -> str:
+    """Hash do YAML da crew e de parâmetros extras (modelo, modo de clone...)"""
+    digest = hashlib.sha256(Path(config_path).read_bytes())
+    for value in extra:
+        digest.update(b"\0" + value.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def make_run_id(project: str, commit: str, cfg_hash: str) -> str:
+    return f"{project}-{commit[:12]}-{cfg_hash[:8]}"
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+class RunCheckpoint:
+    """
+    Manifesto e artefatos de uma execução (gravados a cada estágio concluído).
+
+    Seguro entre threads: tasks paralelas da crew gravam suas saídas no mesmo manifesto.
+    """
+
+    def __init__(self, path: Path, manifest: dict[str, Any]):
+        self.path = path
+        self.manifest = manifest
+        self._lock = threading.Lock()
+
+    @classmethod
+    def start(
+        cls,
+        project: str,
+        repo_url: str,
+        commit: str,
+        cfg_hash: str,
+        runs_dir: str | Path = RUNS_DIR,
+    ) -> "RunCheckpoint":
+        """Inicia uma execução do zero (descarta checkpoints anteriores com o mesmo ID)"""
+        run_id = make_run_id(project, commit, cfg_hash)
+        path = Path(runs_dir) / run_id
+        shutil.rmtree(path, ignore_errors=True)
+        manifest = {
+            "version": CHECKPOINT_VERSION,
+            "run_id": run_id,
+            "project": project,
+            "repo_url": repo_url,
+            "commit": commit,
+            "config_hash": cfg_hash,
+            "created_at": time.time(),
+            "stages": {},
+        }
+        checkpoint = cls(path, manifest)
+        checkpoint._save()
+        return checkpoint
+
+    @classmethod
+    def load(cls, run_id: str, runs_dir: str | Path = RUNS_DIR) -> "RunCheckpoint":
+        """
+        Abre uma execução existente para retomada.
+
+        Raises:
+            CheckpointError: Se o run_id não existir ou o manifesto for inválido
+        """
+        path = Path(runs_dir) / run_id
+        try:
+            manifest = json.loads((path / MANIFEST_FILE).read_text(encoding="utf-8"))
+        except FileNotFoundError as e:
+            raise CheckpointError(f"execução '{run_id}' não encontrada em {runs_dir}") from e
+        except json.JSONDecodeError as e:
+            raise CheckpointError(f"manifesto inválido em {path}: {e}") from e
+        if manifest.get("version") != CHECKPOINT_VERSION:
+            raise CheckpointError(f"versão de checkpoint incompatível em {path}")
+        return cls(path, manifest)
+
+    @property
+    def run_id(self) -> str:
+        return str(self.manifest["run_id"])
+
+    @property
+    def repo_url(self) -> str:
+        return str(self.manifest["repo_url"])
+
+    @property
+    def commit(self) -> str:
+        return str(self.manifest["commit"])
+
+    @property
+    def config_hash(self) -> str:
+        return str(self.manifest["config_hash"])
+
+    def _save(self) -> None:
+        self.manifest["updated_at"] = time.time()
+        _write_atomic(
+            self.path / MANIFEST_FILE, json.dumps(self.manifest, indent=2, ensure_ascii=False)
+        )
+
+    def is_done(self, stage: str) -> bool:
+        with self._lock:
+            return stage in self.manifest["stages"]
+
+    def stage_data(self, stage: str) -> dict[str, Any]:
+        with self._lock:
+            return dict(self.manifest["stages"].get(stage, {}))
+
+    def complete(self, stage: str, **data: Any) -> None:
+        """Marca o estágio como concluído (com dados opcionais) e grava o manifesto"""
+        with self._lock:
+            self.manifest["stages"][stage] = {**data, "finished_at": time.time()}
+            self._save()
+
+    def artifact_path(self, name: str) -> Path:
+        return self.path / name
+
+    def save_artifact(self, name: str, text: str) -> Path:
+        path = self.artifact_path(name)
+        _write_atomic(path, text)
+        return path
+
+    def read_artifact(self, name: str) -> str:
+        return self.artifact_path(name).read_text(encoding="utf-8")
+
+    def save_task_output(self, task_key: str, text: str) -> None:
+        """Grava a saída de uma task da crew e a marca como concluída"""
+        name = f"tasks/{task_key}.md"
+        self.save_artifact(name, text)
+        self.complete(f"{TASK_STAGE_PREFIX}{task_key}", artifact=name, chars=len(text))
+
+    def task_outputs(self) -> dict[str, str]:
+        """Saídas das tasks concluídas, na ordem em que terminaram"""
+        with self._lock:
+            stages = list(self.manifest["stages"].items())
+        return {
+            stage.removeprefix(TASK_STAGE_PREFIX): self.read_artifact(data["artifact"])
+            for stage, data in stages
+            if stage.startswith(TASK_STAGE_PREFIX)
+        }
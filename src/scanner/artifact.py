@@ -0,0 +1,183 @@
+"""
+🧾 Artifact - Saída estruturada da varredura
+============================================
+
+Grava as estatísticas da varredura em um artefato legível por máquina, ao lado
+do relatório markdown, para que a crew, a interface Streamlit e ferramentas em
+lote carreguem os dados diretamente em vez de re-escanear ou re-interpretar o
+markdown.
+
+Formatos:
+- JSON Lines (padrão): uma linha de resumo seguida de uma linha por arquivo
+- msgpack colunar (opcional, requer `msgpack`): colunas por campo, mais
+  compacto e rápido de carregar em repositórios grandes
+"""
+
+import json
+import logging
+import os
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependência opcional
+    msgpack = None
+
+from src.scanner.classify import count_kinds
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_VERSION = 1
+FORMAT_JSONL = "jsonl"
+FORMAT_MSGPACK = "msgpack"
+ARTIFACT_SUFFIXES = {FORMAT_JSONL: ".scan.jsonl", FORMAT_MSGPACK: ".scan.msgpack"}
+
+# Campos por arquivo (mtime/inode são locais à máquina e ficam só no manifesto)
+FILE_FIELDS = ("path", "size", "ext", "kind", "hash")
+
+
+def artifact_path_for(report_path: str | Path, fmt: str = FORMAT_JSONL) -> Path:
+    """Caminho do artefato ao lado do relatório (relatorio.md -> relatorio.scan.jsonl)"""
+    report_path = Path(report_path)
+    return report_path.with_name(report_path.stem + ARTIFACT_SUFFIXES[fmt])
+
+
+def build_summary(stats: dict, repo_path: str, **extra: Any) -> dict[str, Any]:
+    """Registro de resumo: totais, agregados e contagem por classificação"""
+    return {
+        "version": ARTIFACT_VERSION,
+        "repo_path": repo_path,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "total_files": stats["total_files"],
+        "total_size": stats["total_size"],
+        "by_extension": {k: dict(v) for k, v in stats["by_extension"].items()},
+        "by_directory": {k: dict(v) for k, v in stats["by_directory"].items()},
+        "kinds": count_kinds(stats["files"]),
+        **extra,
+    }
+
+
+def _file_record(info: dict) -> dict[str, Any]:
+    return {field: info.get(field) for field in FILE_FIELDS}
+
+
+def _write_jsonl(path: Path, summary: dict, stats: dict) -> None:
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(dumps({"type": "summary", **summary}) + "\n")
+        for record_type, key in (("file", "files"), ("large_file", "large_files")):
+            f.writelines(
+                dumps({"type": record_type, **_file_record(info)}) + "\n"
+                for info in stats.get(key, [])
+            )
+
+
+def _columns(files: list[dict]) -> dict[str, list]:
+    return {field: [info.get(field) for info in files] for field in FILE_FIELDS}
+
+
+def _write_msgpack(path: Path, summary: dict, stats: dict) -> None:
+    data = {
+        "summary": summary,
+        "files": _columns(stats["files"]),
+        "large_files": _columns(stats.get("large_files", [])),
+    }
+    with open(path, "wb") as f:
+        msgpack.pack(data, f, use_bin_type=True)
+
+
+def write_scan_artifact(
+    stats: dict, path: str | Path, repo_path: str, fmt: str = FORMAT_JSONL, **extra: Any
+) -> Path:
+    """
+    Grava o artefato de varredura de forma atômica.
+
+    Args:
+        stats: Estatísticas de quick_report.scan_directory
+        path: Caminho do artefato
+        repo_path: Diretório escaneado (registrado no resumo)
+        fmt: "jsonl" ou "msgpack" (cai para jsonl se msgpack não estiver instalado)
+        **extra: Campos adicionais do resumo (ex.: tokens do relatório)
+
+    Returns:
+        Caminho efetivamente gravado
+    """
+    path = Path(path)
+    if fmt == FORMAT_MSGPACK and msgpack is None:
+        logger.warning("⚠️ msgpack não instalado, gravando artefato em JSON Lines")
+        fmt = FORMAT_JSONL
+        stem = path.name.removesuffix(ARTIFACT_SUFFIXES[FORMAT_MSGPACK])
+        path = path.with_name(stem + ARTIFACT_SUFFIXES[FORMAT_JSONL])
+
+    summary = build_summary(stats, repo_path, **extra)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    if fmt == FORMAT_MSGPACK:
+        _write_msgpack(tmp_path, summary, stats)
+    else:
+        _write_jsonl(tmp_path, summary, stats)
+    os.replace(tmp_path, path)
+    return path
+
+
+def iter_artifact_records(path: str | Path) -> Iterator[dict[str, Any]]:
+    """Percorre os registros de um artefato JSON Lines sem carregá-lo inteiro"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _rows(columns: dict[str, list]) -> list[dict[str, Any]]:
+    names = list(columns)
+    return [dict(zip(names, values, strict=True)) for values in zip(*columns.values(), strict=True)]
+
+
+def load_scan_artifact(path: str | Path) -> dict[str, Any]:
+    """
+    Carrega um artefato de varredura (JSON Lines ou msgpack, pela extensão).
+
+    Returns:
+        Estatísticas no formato de scan_directory (dicts simples), com o
+        registro de resumo em "summary"
+
+    Raises:
+        ValueError: Se a versão do artefato não for suportada
+    """
+    path = Path(path)
+    summary: dict[str, Any] = {}
+    files: list[dict[str, Any]] = []
+    large_files: list[dict[str, Any]] = []
+    if path.name.endswith(ARTIFACT_SUFFIXES[FORMAT_MSGPACK]):
+        if msgpack is None:
+            raise RuntimeError("msgpack não instalado; não é possível ler " + str(path))
+        with open(path, "rb") as f:
+            data = msgpack.unpack(f, raw=False)
+        summary = data["summary"]
+        files = _rows(data["files"])
+        large_files = _rows(data["large_files"])
+    else:
+        for record in iter_artifact_records(path):
+            record_type = record.pop("type")
+            if record_type == "summary":
+                summary = record
+            elif record_type == "file":
+                files.append(record)
+            elif record_type == "large_file":
+                large_files.append(record)
+
+    if summary.get("version") != ARTIFACT_VERSION:
+        raise ValueError(f"Versão de artefato não suportada: {summary.get('version')}")
+
+    return {
+        "summary": summary,
+        "total_files": summary["total_files"],
+        "total_size": summary["total_size"],
+        "by_extension": summary["by_extension"],
+        "by_directory": summary["by_directory"],
+        "files": files,
+        "large_files": large_files,
+    }
@@ -0,0 +1,112 @@
+"""
+✂️ Excerpt - Leitura limitada de trechos de arquivos
+====================================================
+
+Lê apenas o necessário para montar os trechos do relatório: as primeiras N
+linhas por iteração preguiçosa e, opcionalmente, as últimas linhas buscando a
+partir do fim do arquivo (via mmap em arquivos grandes), sem decodificar o
+arquivo inteiro.
+"""
+
+import mmap
+import os
+from pathlib import Path
+from typing import BinaryIO
+
+MAX_LINE_BYTES = 4096
+MAX_TAIL_BYTES = 64 * 1024
+MMAP_THRESHOLD = 4 * 1024 * 1024
+
+
+def _decode(lines: list[bytes] | bytes) -> str:
+    data = b"".join(lines) if isinstance(lines, list) else lines
+    return data.decode("utf-8", errors="ignore")
+
+
+def _read_head(f: BinaryIO, max_lines: int, max_line_bytes: int) -> tuple[list[bytes], int, bool]:
+    """Lê até max_lines linhas; retorna (linhas, offset final, há_mais_conteúdo)"""
+    lines: list[bytes] = []
+    for _ in range(max_lines):
+        line = f.readline(max_line_bytes)
+        if not line:
+            return lines, f.tell(), False
+        lines.append(line)
+        # Linha maior que o limite (ex.: bundle minificado): encerra o trecho aqui
+        if len(line) >= max_line_bytes and not line.endswith(b"\n"):
+            end = f.tell()
+            lines[-1] = line + b" [...]\n"
+            return lines, end, True
+    end = f.tell()
+    return lines, end, f.read(1) != b""
+
+
+def _tail_start(buf, lo: int, hi: int, max_lines: int) -> int:
+    """Offset (em buf) onde começam as últimas max_lines linhas dentro de [lo, hi)"""
+    search_end = hi - 1 if hi > lo and buf[hi - 1 : hi] == b"\n" else hi
+    start = lo
+    for _ in range(max_lines):
+        idx = buf.rfind(b"\n", lo, search_end)
+        if idx < 0:
+            return lo
+        start = idx + 1
+        search_end = idx
+    return start
+
+
+def _read_tail(
+    f: BinaryIO, size: int, min_offset: int, max_lines: int, max_bytes: int
+) -> tuple[bytes, int]:
+    """Lê as últimas max_lines linhas sem passar por min_offset; retorna (dados, offset)"""
+    lower = max(min_offset, size - max_bytes)
+    if lower >= size:
+        return b"", size
+
+    if size >= MMAP_THRESHOLD:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = _tail_start(mm, lower, size, max_lines)
+            return mm[start:size], start
+
+    f.seek(lower)
+    block = f.read(size - lower)
+    start = _tail_start(block, 0, len(block), max_lines)
+    return block[start:], lower + start
+
+
+def read_excerpt(
+    filepath: str | Path,
+    max_lines: int = 100,
+    tail_lines: int = 0,
+    max_line_bytes: int = MAX_LINE_BYTES,
+    max_tail_bytes: int = MAX_TAIL_BYTES,
+) -> str:
+    """
+    Trecho do arquivo: primeiras max_lines linhas e, opcionalmente, as últimas tail_lines
+
+    Args:
+        filepath: Arquivo a ser lido
+        max_lines: Linhas do início do arquivo
+        tail_lines: Linhas do final do arquivo (0 desativa a amostragem do final)
+        max_line_bytes: Tamanho máximo de uma linha antes de encerrar o trecho inicial
+        max_tail_bytes: Bytes máximos lidos a partir do fim do arquivo
+
+    Returns:
+        Texto do trecho com marcadores de truncamento
+    """
+    with open(filepath, "rb") as f:
+        head, head_end, truncated = _read_head(f, max_lines, max_line_bytes)
+        content = _decode(head)
+        if not truncated:
+            return content
+
+        if tail_lines > 0:
+            size = os.fstat(f.fileno()).st_size
+            tail, tail_offset = _read_tail(f, size, head_end, tail_lines, max_tail_bytes)
+            if tail:
+                omitted = tail_offset - head_end
+                if not content.endswith("\n"):
+                    content += "\n"
+                if omitted > 0:
+                    content += f"\n... ({omitted:,} bytes omitidos) ...\n\n"
+                return content + _decode(tail)
+
+        return content + f"\n... (truncado após {len(head)} linhas)\n"
@@ -0,0 +1,78 @@
+"""
+🌿 Git Files - Listagem de arquivos via git ls-files
+====================================================
+
+Em um checkout git, uma única chamada `git ls-files -z` lista os arquivos
+versionados (e os não versionados que não são ignorados), já respeitando
+.gitignore, .git/info/exclude e o excludes global. A saída separada por NUL é
+lida em streaming, sem visitar diretórios ignorados como node_modules ou dist.
+"""
+
+import logging
+import os
+import shutil
+import subprocess  # nosec
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 64 * 1024
+LS_FILES_TIMEOUT = 120
+
+
+def is_git_checkout(base_path: str) -> bool:
+    """Verdadeiro se o diretório é a raiz de um checkout (.git pode ser pasta ou arquivo)"""
+    return os.path.exists(os.path.join(base_path, ".git"))
+
+
+def iter_git_files(base_path: str):
+    """
+    Gera os caminhos relativos listados por `git ls-files -z`, em streaming.
+
+    Levanta OSError/subprocess.SubprocessError se o git falhar.
+    """
+    git_path = shutil.which("git")
+    if not git_path:
+        raise FileNotFoundError("git não encontrado")
+
+    cmd = [
+        git_path,
+        "-C",
+        base_path,
+        "ls-files",
+        "-z",
+        "--cached",
+        "--others",
+        "--exclude-standard",
+    ]
+    with subprocess.Popen(  # nosec
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    ) as proc:
+        assert proc.stdout is not None
+        pending = b""
+        while chunk := proc.stdout.read(READ_CHUNK_SIZE):
+            *names, pending = (pending + chunk).split(b"\0")
+            for name in names:
+                yield os.fsdecode(name)
+        stderr = proc.stderr.read() if proc.stderr else b""
+        if proc.wait(timeout=LS_FILES_TIMEOUT) != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+
+
+def list_git_files(base_path: str) -> list[str] | None:
+    """
+    Arquivos do checkout em base_path (separados por os.sep), sem duplicatas.
+
+    Returns:
+        Caminhos relativos, ou None se não for um checkout git ou o git falhar
+    """
+    if not is_git_checkout(base_path):
+        return None
+    try:
+        paths = dict.fromkeys(iter_git_files(base_path))
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"⚠️ git ls-files indisponível, usando varredura com .gitignore: {e}")
+        return None
+
+    if os.sep != "/":
+        return [p.replace("/", os.sep) for p in paths]
+    return list(paths)
@@ -0,0 +1,143 @@
+"""
+🙈 Gitignore - Regras de .gitignore compiladas
+==============================================
+
+Converte os padrões de arquivos .gitignore em expressões regulares compiladas
+(uma por regra, mais uma alternância com todas elas para descartar rápido os
+caminhos que não casam com nenhuma). Usado pelo walker quando a árvore não é
+um checkout git e a listagem via `git ls-files` não está disponível.
+"""
+
+import logging
+import re
+from collections.abc import Iterable
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+GITIGNORE_FILENAME = ".gitignore"
+
+
+def _translate(pattern: str) -> str:
+    """Traduz o corpo de um padrão gitignore (já sem '!', '/' inicial e final) para regex"""
+    parts: list[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i) and (i == 0 or pattern[i - 1] == "/"):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i) and i + 2 == n and (i == 0 or pattern[i - 1] == "/"):
+            parts.append(".*")
+            i += 2
+        elif c == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif c == "?":
+            parts.append("[^/]")
+            i += 1
+        elif c == "[":
+            end = pattern.find("]", i + 2 if pattern[i + 1 : i + 2] in ("!", "^") else i + 1)
+            if end == -1:
+                parts.append(re.escape(c))
+                i += 1
+                continue
+            body = pattern[i + 1 : end]
+            if body[:1] in ("!", "^"):
+                body = "^" + body[1:]
+            parts.append(f"[{body}]")
+            i = end + 1
+        elif c == "\\" and i + 1 < n:
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(c))
+            i += 1
+    return "".join(parts)
+
+
+def _strip_trailing_spaces(line: str) -> str:
+    stripped = line.rstrip(" ")
+    # Espaço final escapado ("\ ") faz parte do padrão
+    if stripped.endswith("\\") and len(stripped) < len(line):
+        stripped += " "
+    return stripped
+
+
+class GitignoreRules:
+    """Regras de um único arquivo .gitignore, relativas ao diretório onde ele está"""
+
+    def __init__(self, patterns: Iterable[str]):
+        # (regex, negada, apenas diretórios) na ordem do arquivo
+        self.rules: list[tuple[re.Pattern[str], bool, bool]] = []
+        for raw in patterns:
+            line = _strip_trailing_spaces(raw.rstrip("\n\r"))
+            if not line or line.startswith("#"):
+                continue
+
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            elif line.startswith("\\#") or line.startswith("\\!"):
+                line = line[1:]
+
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+
+            # Com "/" no meio ou no início, o padrão é ancorado no diretório do .gitignore
+            anchored = "/" in line
+            body = _translate(line.lstrip("/"))
+            regex = f"^{body}$" if anchored else f"^(?:.*/)?{body}$"
+            try:
+                self.rules.append((re.compile(regex), negate, dir_only))
+            except re.error as e:
+                logger.warning(f"⚠️ Padrão .gitignore inválido ignorado '{raw.strip()}': {e}")
+
+        self._any = (
+            re.compile("|".join(f"(?:{rule.pattern})" for rule, _, _ in self.rules))
+            if self.rules
+            else None
+        )
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "GitignoreRules | None":
+        """Carrega um .gitignore; None se não puder ser lido ou não tiver regras"""
+        try:
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                rules = cls(f)
+        except OSError as e:
+            logger.warning(f"⚠️ Erro ao ler {path}: {e}")
+            return None
+        return rules if rules.rules else None
+
+    def match(self, rel_path: str, is_dir: bool) -> bool | None:
+        """
+        Avalia um caminho relativo (separado por "/") contra as regras.
+
+        Returns:
+            True se ignorado, False se reincluído por uma negação, None se nenhuma regra casa
+        """
+        if self._any is None or not self._any.match(rel_path):
+            return None
+        # A última regra que casa decide
+        for regex, negate, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                return not negate
+        return None
+
+
+# Pilha de regras ativas em um diretório: (prefixo relativo com "/", regras)
+IgnoreStack = tuple[tuple[str, GitignoreRules], ...]
+
+
+def is_ignored(stack: IgnoreStack, rel_path: str, is_dir: bool) -> bool:
+    """Aplica as regras do .gitignore mais profundo para o mais raso"""
+    for prefix, rules in reversed(stack):
+        result = rules.match(rel_path[len(prefix) :], is_dir)
+        if result is not None:
+            return result
+    return False
@@ -0,0 +1,151 @@
+"""
+#️⃣ Hash Index - Índice de conteúdo endereçado por hash
+======================================================
+
+Calcula hashes blake2b dos arquivos (leitura em blocos, em pool de threads) e
+mantém um armazenamento SQLite local com trechos e resumos já calculados por
+hash de conteúdo. Arquivos idênticos em repositórios diferentes (licenças,
+lockfiles, utilitários copiados, código gerado) são processados uma única vez.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.scanner.classify import SNIFF_BYTES, classify_head
+from src.scanner.walker import DEFAULT_WORKERS
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+HASH_DIGEST_SIZE = 16
+
+
+def hash_and_sniff(path: str | Path, chunk_size: int = HASH_CHUNK_SIZE) -> tuple[str, bytes]:
+    """Hash blake2b (128 bits) do conteúdo, lido em blocos, e os primeiros SNIFF_BYTES"""
+    digest = hashlib.blake2b(digest_size=HASH_DIGEST_SIZE)
+    with open(path, "rb") as f:
+        head = chunk = f.read(max(chunk_size, SNIFF_BYTES))
+        while chunk:
+            digest.update(chunk)
+            chunk = f.read(chunk_size)
+    return digest.hexdigest(), head[:SNIFF_BYTES]
+
+
+def hash_file(path: str | Path, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """Hash blake2b (128 bits) do conteúdo do arquivo, lido em blocos"""
+    return hash_and_sniff(path, chunk_size)[0]
+
+
+def hash_files(base_path: str | Path, files: list[dict], workers: int | None = None) -> None:
+    """
+    Preenche file["hash"] (None se não puder ser lido) e file["kind"] para cada arquivo.
+
+    A classificação (fonte/binário/gerado/minificado) usa o primeiro bloco já
+    lido para o hash, sem abrir o arquivo de novo.
+    """
+    if not files:
+        return
+    base = Path(base_path)
+
+    def compute(info: dict) -> None:
+        try:
+            info["hash"], head = hash_and_sniff(base / info["path"])
+            info["kind"] = classify_head(head, info["path"])
+        except OSError as e:
+            logger.warning(f"⚠️ Erro ao hashear {info['path']}: {e}")
+            info["hash"] = None
+
+    workers = DEFAULT_WORKERS if workers is None else workers
+    if workers <= 1 or len(files) == 1:
+        for info in files:
+            compute(info)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hash") as pool:
+        list(pool.map(compute, files))
+
+
+def group_duplicates(files: list[dict]) -> dict[str, list[dict]]:
+    """Agrupa arquivos com o mesmo hash de conteúdo (apenas grupos com 2+ arquivos)"""
+    groups: dict[str, list[dict]] = defaultdict(list)
+    for info in files:
+        digest = info.get("hash")
+        if digest:
+            groups[digest].append(info)
+    return {digest: items for digest, items in groups.items() if len(items) > 1}
+
+
+class HashIndex:
+    """
+    Armazenamento persistente de artefatos derivados do conteúdo de arquivos.
+
+    Cada artefato é identificado por (hash, variante), onde a variante descreve
+    como ele foi produzido (ex.: "excerpt:80:0"). Seguro para uso entre threads.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS artifacts (
+                hash TEXT NOT NULL,
+                variant TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (hash, variant)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, digest: str, variant: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content FROM artifacts WHERE hash = ? AND variant = ?", (digest, variant)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return str(row[0])
+
+    def put(self, digest: str, variant: str, content: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts (hash, variant, content, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (digest, variant, content, time.time()),
+            )
+            self._conn.commit()
+
+    def get_or_compute(self, digest: str, variant: str, compute: Callable[[], str]) -> str:
+        """Retorna o artefato armazenado ou o calcula e armazena"""
+        cached = self.get(digest, variant)
+        if cached is not None:
+            return cached
+        content = compute()
+        self.put(digest, variant, content)
+        return content
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "HashIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,351 @@
+"""
+🕸️ Import Graph - Grafo de imports e índice de símbolos Python
+==============================================================
+
+Analisa os arquivos Python em um pool de processos e monta:
+- o grafo de dependências entre os módulos internos da codebase
+- a tabela de símbolos (definições de funções/classes/métodos e referências a
+  eles a partir de outros módulos)
+
+Do grafo saem os indicadores usados no relatório: módulos com maior fan-in e
+fan-out, ciclos de import (componentes fortemente conexos) e camadas (módulos
+sem dependências internas na camada 0, e assim por diante).
+"""
+
+import ast
+import json
+import logging
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from src.scanner.python_summary import POOL_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+INDEX_VARIANT = "pyindex:v1"
+INDEX_VERSION = 1
+# Diretórios raiz de código comuns: src/pkg/mod.py também é importável como pkg.mod
+SOURCE_ROOTS = ("src", "lib", "python")
+
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def module_name(rel_path: str) -> tuple[str, bool]:
+    """Nome do módulo (pontuado) a partir do caminho relativo e se é um pacote (__init__)"""
+    parts = Path(rel_path).with_suffix("").parts
+    is_package = parts[-1] == "__init__"
+    if is_package:
+        parts = parts[:-1]
+    return ".".join(parts) or "__init__", is_package
+
+
+def _resolve_relative(module: str | None, level: int, current: str, is_package: bool) -> str:
+    """Converte um import relativo (from ..x import y) em nome absoluto"""
+    if level == 0:
+        return module or ""
+    base = current.split(".")
+    # Em um pacote, "." é o próprio pacote; em um módulo, é o pacote que o contém
+    drop = level - 1 if is_package else level
+    base = base[: len(base) - drop] if drop else base
+    return ".".join([*base, module] if module else base)
+
+
+def _kind(node: ast.AST) -> str:
+    if isinstance(node, ast.ClassDef):
+        return "class"
+    return "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+
+
+def index_source(source: str, current: str, is_package: bool) -> dict[str, Any]:
+    """
+    Extrai imports, definições e referências de um módulo.
+
+    Returns:
+        {"imports": [[nome, [símbolos]]], "defines": [[nome, tipo, linha]],
+         "references": {nome qualificado: ocorrências}}
+    """
+    tree = ast.parse(source)
+    imports: list[list] = []
+    aliases: dict[str, str] = {}
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.append([alias.name, []])
+                if alias.asname:
+                    aliases[alias.asname] = alias.name
+                else:
+                    root = alias.name.split(".")[0]
+                    aliases[root] = root
+        elif isinstance(node, ast.ImportFrom):
+            target = _resolve_relative(node.module, node.level, current, is_package)
+            names = [alias.name for alias in node.names if alias.name != "*"]
+            imports.append([target, names])
+            for alias in node.names:
+                if alias.name != "*":
+                    aliases[alias.asname or alias.name] = f"{target}.{alias.name}"
+
+    defines: list[list] = []
+    for node in tree.body:
+        if isinstance(node, _DEFINITIONS):
+            defines.append([node.name, _kind(node), node.lineno])
+            if isinstance(node, ast.ClassDef):
+                defines.extend(
+                    [f"{node.name}.{child.name}", _kind(child), child.lineno]
+                    for child in node.body
+                    if isinstance(child, _DEFINITIONS)
+                )
+
+    references: Counter[str] = Counter()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+            base = aliases.get(node.value.id)
+            if base:
+                references[f"{base}.{node.attr}"] += 1
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            qualified = aliases.get(node.id)
+            if qualified:
+                references[qualified] += 1
+
+    return {"imports": imports, "defines": defines, "references": dict(references)}
+
+
+def index_file(args: tuple[str, str, bool]) -> dict[str, Any] | None:
+    """Indexa um arquivo (caminho, módulo, é pacote); None se não puder ser analisado"""
+    path, current, is_package = args
+    try:
+        with open(path, "rb") as f:
+            source = f.read().decode("utf-8", errors="ignore")
+        return index_source(source, current, is_package)
+    except (SyntaxError, OSError, ValueError, RecursionError):
+        return None
+
+
+def index_files(jobs: list[tuple[str, str, bool]], workers: int | None = None) -> list:
+    """Indexa vários arquivos em um pool de processos (mesma ordem de jobs)"""
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers <= 1 or len(jobs) < POOL_THRESHOLD:
+        return [index_file(job) for job in jobs]
+
+    chunksize = max(1, len(jobs) // (workers * 4))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(index_file, jobs, chunksize=chunksize))
+    except (OSError, BrokenProcessPool) as e:
+        logger.warning(f"⚠️ Pool de processos indisponível, indexando em série: {e}")
+        return [index_file(job) for job in jobs]
+
+
+def strongly_connected(graph: dict[str, set[str]]) -> list[list[str]]:
+    """Componentes fortemente conexos (Tarjan iterativo), dependências antes dos dependentes"""
+    index: dict[str, int] = {}
+    low: dict[str, int] = {}
+    on_stack: set[str] = set()
+    stack: list[str] = []
+    components: list[list[str]] = []
+    counter = 0
+
+    for start in sorted(graph):
+        if start in index:
+            continue
+        work = [(start, iter(sorted(graph[start])))]
+        index[start] = low[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack.add(start)
+        while work:
+            node, edges = work[-1]
+            advanced = False
+            for succ in edges:
+                if succ not in index:
+                    index[succ] = low[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(sorted(graph[succ]))))
+                    advanced = True
+                    break
+                if succ in on_stack:
+                    low[node] = min(low[node], index[succ])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(sorted(component))
+    return components
+
+
+@dataclass
+class ImportGraph:
+    """Grafo de imports entre módulos internos e tabela de símbolos"""
+
+    # módulo -> caminho relativo
+    modules: dict[str, str] = field(default_factory=dict)
+    # módulo -> módulos internos importados
+    edges: dict[str, set[str]] = field(default_factory=dict)
+    # módulo -> imports externos (primeiro componente, ex.: "requests")
+    external: dict[str, set[str]] = field(default_factory=dict)
+    # "módulo.Símbolo" -> {"path", "kind", "line"}
+    definitions: dict[str, dict[str, Any]] = field(default_factory=dict)
+    # "módulo.Símbolo" -> {módulo que referencia: ocorrências}
+    references: dict[str, dict[str, int]] = field(default_factory=dict)
+    # Arquivos que não puderam ser analisados
+    failed: list[str] = field(default_factory=list)
+
+    @classmethod
+    def build(cls, files: list[dict], results: list[dict | None]) -> "ImportGraph":
+        """Monta o grafo a partir dos arquivos Python e de seus índices (index_files)"""
+        graph = cls()
+        names = [module_name(info["path"])[0] for info in files]
+        graph.modules = dict(zip(names, (info["path"] for info in files), strict=True))
+        lookup = graph._lookup_table()
+
+        for module, info, result in zip(names, files, results, strict=True):
+            graph.edges[module] = set()
+            graph.external[module] = set()
+            if result is None:
+                graph.failed.append(info["path"])
+                continue
+            for name, kind, line in result["defines"]:
+                graph.definitions[f"{module}.{name}"] = {
+                    "path": info["path"],
+                    "kind": kind,
+                    "line": line,
+                }
+            for target, symbols in result["imports"]:
+                # "from pacote import mod" pode importar submódulos
+                internal = {lookup[f"{target}.{s}"] for s in symbols if f"{target}.{s}" in lookup}
+                if len(internal) < len(symbols) or not symbols:
+                    prefix = _longest_prefix(lookup, target)
+                    if prefix:
+                        internal.add(prefix)
+                internal.discard(module)
+                if internal:
+                    graph.edges[module].update(internal)
+                elif target and not _longest_prefix(lookup, target):
+                    graph.external[module].add(target.split(".")[0])
+
+        for module, result in zip(names, results, strict=True):
+            if result is None:
+                continue
+            for qualified, count in result["references"].items():
+                symbol = graph._resolve_symbol(lookup, qualified)
+                if symbol and not symbol.startswith(module + "."):
+                    graph.references.setdefault(symbol, {})[module] = count
+        return graph
+
+    def _lookup_table(self) -> dict[str, str]:
+        """Nome importável -> módulo interno (inclui aliases sem a raiz src/lib)"""
+        lookup: dict[str, str] = {}
+        for module in self.modules:
+            lookup[module] = module
+            root, _, rest = module.partition(".")
+            if root in SOURCE_ROOTS and rest:
+                lookup.setdefault(rest, module)
+        return lookup
+
+    def _resolve_symbol(self, lookup: dict[str, str], qualified: str) -> str | None:
+        module, _, symbol = qualified.rpartition(".")
+        while module:
+            target = lookup.get(module)
+            if target is not None:
+                name = f"{target}.{symbol}"
+                return name if name in self.definitions else None
+            module, _, head = module.rpartition(".")
+            symbol = f"{head}.{symbol}"
+        return None
+
+    def fan_in(self) -> Counter[str]:
+        counts: Counter[str] = Counter(dict.fromkeys(self.modules, 0))
+        for targets in self.edges.values():
+            counts.update(targets)
+        return counts
+
+    def fan_out(self) -> Counter[str]:
+        return Counter({module: len(targets) for module, targets in self.edges.items()})
+
+    def cycles(self) -> list[list[str]]:
+        """Ciclos de import (componentes com mais de um módulo), maiores primeiro"""
+        components = [c for c in strongly_connected(self.edges) if len(c) > 1]
+        return sorted(components, key=len, reverse=True)
+
+    def layers(self) -> list[list[str]]:
+        """Camadas: 0 sem dependências internas; cada ciclo fica inteiro em uma camada"""
+        components = strongly_connected(self.edges)
+        component_of = {m: i for i, members in enumerate(components) for m in members}
+        depth: list[int] = []
+        for i, members in enumerate(components):
+            deps = {component_of[t] for m in members for t in self.edges[m]} - {i}
+            depth.append(1 + max((depth[d] for d in deps), default=-1))
+
+        layers: list[list[str]] = [[] for _ in range(max(depth, default=-1) + 1)]
+        for i, members in enumerate(components):
+            layers[depth[i]].extend(members)
+        return [sorted(layer) for layer in layers]
+
+    def most_referenced(self, limit: int = 15) -> list[tuple[str, int]]:
+        """Símbolos referenciados pelo maior número de outros módulos"""
+        counts = Counter({symbol: len(users) for symbol, users in self.references.items()})
+        return counts.most_common(limit)
+
+    def to_dict(self) -> dict[str, Any]:
+        fan_in, fan_out = self.fan_in(), self.fan_out()
+        return {
+            "version": INDEX_VERSION,
+            "modules": {
+                module: {
+                    "path": path,
+                    "imports": sorted(self.edges[module]),
+                    "external": sorted(self.external[module]),
+                    "fan_in": fan_in[module],
+                    "fan_out": fan_out[module],
+                }
+                for module, path in sorted(self.modules.items())
+            },
+            "definitions": self.definitions,
+            "references": self.references,
+            "cycles": self.cycles(),
+            "layers": self.layers(),
+            "failed": self.failed,
+        }
+
+    def save(self, path: str | Path) -> None:
+        """Grava o índice em JSON (arquivo temporário + rename)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+
+def _longest_prefix(lookup: dict[str, str], name: str) -> str | None:
+    while name:
+        if name in lookup:
+            return lookup[name]
+        name = name.rpartition(".")[0]
+    return None
+
+
+def load_import_index(path: str | Path) -> dict[str, Any]:
+    """Carrega o índice gravado por ImportGraph.save"""
+    with open(path, encoding="utf-8") as f:
+        data: dict[str, Any] = json.load(f)
+    if data.get("version") != INDEX_VERSION:
+        raise ValueError(f"Versão de índice não suportada: {data.get('version')}")
+    return data
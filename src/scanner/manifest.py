@@ -0,0 +1,150 @@
+"""
+🗂️ Manifest - Manifesto incremental de varredura
+================================================
+
+Persiste os metadados de cada arquivo escaneado (caminho, tamanho, mtime,
+inode, hash de conteúdo, classificação e extensão) junto com os agregados do relatório.
+Nas execuções seguintes, arquivos com metadados inalterados são reaproveitados
+e apenas os alterados são relidos e re-hasheados; os agregados by_extension e
+by_directory são ajustados a partir do delta, sem recomputar a árvore inteira.
+"""
+
+import json
+import logging
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+from src.scanner.hash_index import hash_files
+from src.scanner.walker import apply_file, new_stats
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 3
+MANIFEST_FILENAME = "scan_manifest.json"
+
+# Campos comparados para decidir se um arquivo mudou desde a última execução
+_METADATA_FIELDS = ("size", "mtime", "inode")
+
+
+class ScanManifest:
+    """Manifesto persistente de arquivos e agregados de uma codebase"""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.stats = new_stats()
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ScanManifest":
+        """Carrega o manifesto do disco; retorna um manifesto vazio se ausente ou inválido"""
+        manifest = cls(path)
+        if not manifest.path.exists():
+            return manifest
+
+        try:
+            with open(manifest.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != MANIFEST_VERSION:
+                logger.info(f"♻️ Versão de manifesto diferente, ignorando: {manifest.path}")
+                return manifest
+
+            manifest.entries = data["files"]
+            stats = manifest.stats
+            stats["total_files"] = data["total_files"]
+            stats["total_size"] = data["total_size"]
+            stats["by_extension"].update(data["by_extension"])
+            stats["by_directory"].update(data["by_directory"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"⚠️ Manifesto inválido, reconstruindo: {e}")
+            return cls(path)
+
+        return manifest
+
+    def refresh(
+        self, base_path: str, files: list[dict], workers: int | None = None
+    ) -> dict[str, int]:
+        """
+        Atualiza o manifesto com a listagem atual da árvore.
+
+        Args:
+            base_path: Diretório raiz escaneado
+            files: Arquivos retornados por scan_tree (path, size, ext, mtime, inode)
+            workers: Threads usadas para hashear e classificar os arquivos alterados
+
+        Returns:
+            Contagem de arquivos unchanged/added/modified/removed
+        """
+        delta = {"unchanged": 0, "added": 0, "modified": 0, "removed": 0}
+        current: dict[str, dict[str, Any]] = {}
+        changed: list[dict[str, Any]] = []
+
+        for info in files:
+            path = info["path"]
+            previous = self.entries.get(path)
+            if previous is not None and all(
+                previous.get(field) == info[field] for field in _METADATA_FIELDS
+            ):
+                current[path] = previous
+                delta["unchanged"] += 1
+                continue
+
+            entry = {
+                "path": path,
+                "size": info["size"],
+                "ext": info["ext"],
+                "mtime": info["mtime"],
+                "inode": info["inode"],
+            }
+            current[path] = entry
+            changed.append(entry)
+            if previous is None:
+                delta["added"] += 1
+            else:
+                delta["modified"] += 1
+                apply_file(self.stats, previous, sign=-1)
+
+        for path, previous in self.entries.items():
+            if path not in current:
+                delta["removed"] += 1
+                apply_file(self.stats, previous, sign=-1)
+
+        for entry in changed:
+            apply_file(self.stats, entry)
+
+        hash_files(base_path, changed, workers=workers)
+        self.entries = current
+        return delta
+
+    def to_stats(self) -> dict[str, Any]:
+        """Estatísticas no formato de quick_report.scan_directory"""
+        stats = new_stats()
+        stats["total_files"] = self.stats["total_files"]
+        stats["total_size"] = self.stats["total_size"]
+        stats["by_extension"] = defaultdict(
+            lambda: {"count": 0, "size": 0},
+            {k: dict(v) for k, v in self.stats["by_extension"].items()},
+        )
+        stats["by_directory"] = defaultdict(
+            lambda: {"count": 0, "size": 0},
+            {k: dict(v) for k, v in self.stats["by_directory"].items()},
+        )
+        stats["files"] = [dict(self.entries[path]) for path in sorted(self.entries)]
+        return stats
+
+    def save(self) -> None:
+        """Grava o manifesto de forma atômica (arquivo temporário + rename)"""
+        data = {
+            "version": MANIFEST_VERSION,
+            "total_files": self.stats["total_files"],
+            "total_size": self.stats["total_size"],
+            "by_extension": self.stats["by_extension"],
+            "by_directory": self.stats["by_directory"],
+            "files": self.entries,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
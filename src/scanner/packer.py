@@ -0,0 +1,179 @@
+"""
+🎒 Packer - Seleção de conteúdo por orçamento de tokens
+======================================================
+
+Estima o custo em tokens de cada bloco candidato do relatório e resolve uma
+mochila 0/1 para maximizar a relevância do conteúdo dentro do orçamento de
+contexto configurado em crew_config.llm_config. README, pontos de entrada e
+arquivos com nomes de alto sinal recebem prioridade maior.
+"""
+
+import math
+import operator
+import os
+from dataclasses import dataclass
+
+# Heurística usual para modelos Gemini/GPT: ~4 caracteres por token
+CHARS_PER_TOKEN = 4
+# Resolução máxima da tabela da mochila (orçamento é agrupado em faixas)
+MAX_BUCKETS = 1000
+# Acima de itens x faixas, usa seleção gulosa por densidade (valor/token)
+MAX_DP_CELLS = 5_000_000
+
+PRIORITY_README = 1000.0
+PRIORITY_ENTRY_POINT = 800.0
+PRIORITY_MANIFEST = 700.0
+PRIORITY_IMPORT_GRAPH = 600.0
+PRIORITY_LICENSE = 500.0
+PRIORITY_PYTHON_SUMMARY = 10.0
+PRIORITY_CODE_EXCERPT = 6.0
+PRIORITY_LARGE_FILE = 3.0
+PRIORITY_FILE_LIST = 8.0
+PRIORITY_TEST_LIST = 7.0
+PRIORITY_DOC_LIST = 7.0
+PRIORITY_DUPLICATES = 4.0
+
+# Nomes de arquivo que costumam concentrar a lógica central do projeto
+HIGH_SIGNAL_NAMES = {
+    "__main__",
+    "main",
+    "app",
+    "cli",
+    "server",
+    "api",
+    "routes",
+    "views",
+    "models",
+    "schema",
+    "schemas",
+    "settings",
+    "config",
+    "core",
+    "service",
+    "services",
+    "pipeline",
+    "manage",
+}
+
+
+@dataclass
+class ReportBlock:
+    """Trecho opcional do relatório, candidato à seleção pelo packer"""
+
+    key: str
+    text: str
+    priority: float
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa de tokens de um texto (sem depender de tokenizer)"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def file_priority(path: str, size: int, base: float) -> float:
+    """Relevância de um arquivo: nome de alto sinal, profundidade rasa e tamanho"""
+    stem = os.path.splitext(os.path.basename(path))[0].lower()
+    depth = path.count(os.sep)
+    lowered = path.lower()
+
+    priority = base + math.log2(size + 1)
+    if stem in HIGH_SIGNAL_NAMES:
+        priority += base * 2
+    if depth <= 1:
+        priority += base
+    if "test" in lowered:
+        priority *= 0.3
+    if any(part in lowered for part in ("generated", "migrations", "vendor", "_pb2")):
+        priority *= 0.2
+    return priority
+
+
+def knapsack(weights: list[int], values: list[float], capacity: int) -> list[int]:
+    """
+    Mochila 0/1 por programação dinâmica.
+
+    Args:
+        weights: Peso inteiro de cada item
+        values: Valor de cada item
+        capacity: Capacidade total
+
+    Returns:
+        Índices dos itens escolhidos
+    """
+    if capacity <= 0:
+        return []
+
+    dp = [0.0] * (capacity + 1)
+    choices: list[tuple[int, bytes] | None] = []
+    for weight, value in zip(weights, values, strict=True):
+        if weight > capacity:
+            choices.append(None)
+            continue
+        if weight == 0:
+            choices.append((0, b""))
+            dp = [x + value for x in dp]
+            continue
+        kept = dp[weight:]
+        taken = [x + value for x in dp[: capacity + 1 - weight]]
+        choices.append((weight, bytes(map(operator.lt, kept, taken))))
+        dp = dp[:weight] + list(map(max, kept, taken))
+
+    selected = []
+    remaining = capacity
+    for index in range(len(choices) - 1, -1, -1):
+        choice = choices[index]
+        if choice is None:
+            continue
+        weight, taken_flags = choice
+        if weight == 0:
+            selected.append(index)
+        elif remaining >= weight and taken_flags[remaining - weight]:
+            selected.append(index)
+            remaining -= weight
+    selected.reverse()
+    return selected
+
+
+def _greedy(weights: list[int], values: list[float], capacity: int) -> list[int]:
+    order = sorted(range(len(weights)), key=lambda i: values[i] / max(weights[i], 1), reverse=True)
+    selected = []
+    for index in order:
+        if weights[index] <= capacity:
+            selected.append(index)
+            capacity -= weights[index]
+    return sorted(selected)
+
+
+def pack_blocks(blocks: list[ReportBlock], budget: int) -> set[str]:
+    """
+    Escolhe os blocos que cabem no orçamento maximizando a prioridade total.
+
+    Args:
+        blocks: Candidatos
+        budget: Tokens disponíveis para os blocos
+
+    Returns:
+        Chaves dos blocos selecionados
+    """
+    if budget <= 0 or not blocks:
+        return set()
+
+    tokens = [block.tokens for block in blocks]
+    if sum(tokens) <= budget:
+        return {block.key for block in blocks}
+
+    # Agrupa o orçamento em faixas; arredondar para cima nunca estoura o limite
+    granularity = max(1, math.ceil(budget / MAX_BUCKETS))
+    capacity = budget // granularity
+    weights = [math.ceil(t / granularity) for t in tokens]
+    values = [block.priority for block in blocks]
+
+    if len(blocks) * (capacity + 1) > MAX_DP_CELLS:
+        chosen = _greedy(weights, values, capacity)
+    else:
+        chosen = knapsack(weights, values, capacity)
+    return {blocks[i].key for i in chosen}
@@ -0,0 +1,147 @@
+"""
+🧬 Python Summary - Resumo estrutural de módulos Python via AST
+===============================================================
+
+Em vez de colar as primeiras linhas de cada arquivo, extrai a estrutura do
+módulo: docstring, imports, classes e funções com assinaturas, decorators,
+primeira linha da docstring e quantidade de chamadas. A análise roda em um
+pool de processos para cobrir todos os arquivos Python da codebase.
+"""
+
+import ast
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_VARIANT = "pysummary:v1"
+# Abaixo disso o custo de subir o pool de processos não compensa
+POOL_THRESHOLD = 32
+
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def _first_line(doc: str | None) -> str:
+    if not doc or not doc.strip():
+        return ""
+    return doc.strip().splitlines()[0].strip()
+
+
+def _count_calls(node: ast.FunctionDef | ast.AsyncFunctionDef) -> int:
+    """Chamadas no corpo da função (decorators e defaults não contam)"""
+    return sum(isinstance(child, ast.Call) for stmt in node.body for child in ast.walk(stmt))
+
+
+def _describe(node: ast.AST, indent: str, lines: list[str]) -> None:
+    """Adiciona a descrição de uma classe/função (e métodos aninhados) às linhas"""
+    if not isinstance(node, _DEFINITIONS):
+        return
+
+    for decorator in node.decorator_list:
+        lines.append(f"{indent}@{ast.unparse(decorator)}")
+
+    doc = _first_line(ast.get_docstring(node))
+    comment = f"  # {doc}" if doc else ""
+
+    if isinstance(node, ast.ClassDef):
+        bases = [ast.unparse(b) for b in node.bases]
+        bases += [ast.unparse(k) for k in node.keywords]
+        header = f"class {node.name}({', '.join(bases)}):" if bases else f"class {node.name}:"
+        lines.append(f"{indent}{header}{comment}")
+        for child in node.body:
+            _describe(child, indent + "    ", lines)
+        return
+
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    calls = _count_calls(node)
+    lines.append(
+        f"{indent}{prefix} {node.name}({ast.unparse(node.args)}){returns}"
+        f"  [{calls} chamadas]{comment}"
+    )
+    for child in node.body:
+        if isinstance(child, _DEFINITIONS):
+            _describe(child, indent + "    ", lines)
+
+
+def _imported_names(tree: ast.Module) -> list[str]:
+    names: set[str] = set()
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            module = "." * node.level + (node.module or "")
+            names.add(module)
+    return sorted(names)
+
+
+def summarize_source(source: str, filename: str = "<string>") -> str:
+    """Resumo estrutural do código-fonte de um módulo Python"""
+    tree = ast.parse(source, filename=filename)
+    lines: list[str] = []
+
+    doc = _first_line(ast.get_docstring(tree))
+    if doc:
+        lines.append(f'"""{doc}"""')
+
+    imports = _imported_names(tree)
+    if imports:
+        lines.append(f"# imports: {', '.join(imports)}")
+
+    constants = [
+        target.id
+        for node in tree.body
+        if isinstance(node, (ast.Assign, ast.AnnAssign))
+        for target in (node.targets if isinstance(node, ast.Assign) else [node.target])
+        if isinstance(target, ast.Name) and target.id.isupper()
+    ]
+    if constants:
+        lines.append(f"# constantes: {', '.join(constants)}")
+
+    for node in tree.body:
+        _describe(node, "", lines)
+
+    return "\n".join(lines)
+
+
+def summarize_file(path: str | Path) -> str:
+    """Resumo estrutural de um arquivo Python (mensagem de erro entre colchetes se falhar)"""
+    try:
+        with open(path, "rb") as f:
+            source = f.read().decode("utf-8", errors="ignore")
+        return summarize_source(source, filename=str(path))
+    except SyntaxError as e:
+        return f"[Erro de sintaxe na linha {e.lineno}: {e.msg}]"
+    except (OSError, ValueError, RecursionError) as e:
+        return f"[Erro ao analisar arquivo: {e}]"
+
+
+def summarize_files(paths: list[str | Path], workers: int | None = None) -> list[str]:
+    """
+    Resume vários arquivos Python em um pool de processos.
+
+    Args:
+        paths: Arquivos a resumir
+        workers: Processos do pool (None usa os.cpu_count(); <= 1 executa em série)
+
+    Returns:
+        Resumos na mesma ordem de paths
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers <= 1 or len(paths) < POOL_THRESHOLD:
+        return [summarize_file(p) for p in paths]
+
+    chunksize = max(1, len(paths) // (workers * 4))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(summarize_file, paths, chunksize=chunksize))
+    except (OSError, BrokenProcessPool) as e:
+        logger.warning(f"⚠️ Pool de processos indisponível, resumindo em série: {e}")
+        return [summarize_file(p) for p in paths]
+
+
+def is_error_summary(summary: str) -> bool:
+    return summary.startswith("[Erro")
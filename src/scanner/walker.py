@@ -0,0 +1,302 @@
+"""
+🚶 Walker - Varredura paralela de diretórios
+============================================
+
+Motor de varredura baseado em os.scandir. Reaproveita o stat em cache de cada
+DirEntry, distribui os diretórios entre threads e mescla os agregados parciais
+de cada worker no dicionário de estatísticas usado pelo quick_report.
+
+Em checkouts git, a listagem vem de `git ls-files` e apenas os arquivos
+listados recebem stat; fora deles, as regras dos .gitignore são aplicadas
+durante a varredura.
+"""
+
+import os
+import queue
+import stat
+import sys
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from typing import Any
+
+from src.scanner.git_files import list_git_files
+from src.scanner.gitignore import GITIGNORE_FILENAME, GitignoreRules, IgnoreStack, is_ignored
+
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+ROOT_DIR_NAME = "root"
+
+# Resultado de um job: diretório, arquivos, arquivos grandes e subdiretórios a varrer
+ScanResult = tuple[str, list[dict], list[dict], list[tuple[str, str, IgnoreStack | None]]]
+# Job de varredura: função (_scan_dir ou _stat_listed) e seus argumentos
+ScanJob = tuple[Callable[..., ScanResult], tuple[Any, ...]]
+
+
+def file_suffix(name: str) -> str:
+    """Extensão do arquivo com a mesma semântica de Path.suffix, sem alocar um Path"""
+    i = name.rfind(".")
+    if 0 < i < len(name) - 1:
+        return name[i:]
+    return ""
+
+
+def new_stats() -> dict[str, Any]:
+    """Estrutura vazia de estatísticas (mesmo formato de quick_report.scan_directory)"""
+    return {
+        "total_files": 0,
+        "total_size": 0,
+        "by_extension": defaultdict(lambda: {"count": 0, "size": 0}),
+        "by_directory": defaultdict(lambda: {"count": 0, "size": 0}),
+        "files": [],
+        "large_files": [],
+    }
+
+
+def _scan_dir(
+    abs_dir: str,
+    rel_dir: str,
+    ignore_folders: frozenset[str],
+    ignore_extensions: frozenset[str],
+    max_file_size: int,
+    ignore_stack: IgnoreStack | None = None,
+) -> ScanResult:
+    """Varre um único diretório (sem recursão) e devolve arquivos, arquivos grandes e subdiretórios"""
+    files: list[dict] = []
+    large: list[dict] = []
+    subdirs: list[tuple[str, str, IgnoreStack | None]] = []
+    prefix = rel_dir + os.sep if rel_dir else ""
+    # Caminhos relativos com "/" para as regras de .gitignore
+    posix_prefix = prefix.replace(os.sep, "/")
+
+    try:
+        with os.scandir(abs_dir) as it:
+            entries = list(it)
+    except OSError as e:
+        print(f"⚠️ Erro ao listar {abs_dir}: {e}", file=sys.stderr)
+        return rel_dir, files, large, subdirs
+
+    if ignore_stack is not None and any(e.name == GITIGNORE_FILENAME for e in entries):
+        rules = GitignoreRules.from_file(os.path.join(abs_dir, GITIGNORE_FILENAME))
+        if rules is not None:
+            ignore_stack = (*ignore_stack, (posix_prefix, rules))
+
+    for entry in entries:
+        name = entry.name
+        try:
+            is_dir = entry.is_dir()
+            if is_dir:
+                # Assim como os.walk, não segue links simbólicos de diretório
+                if name in ignore_folders or entry.is_symlink():
+                    continue
+        except OSError:
+            continue
+
+        if ignore_stack and is_ignored(ignore_stack, posix_prefix + name, is_dir):
+            continue
+        if is_dir:
+            subdirs.append((entry.path, prefix + name, ignore_stack))
+            continue
+
+        suffix = file_suffix(name)
+        if suffix.lower() in ignore_extensions:
+            continue
+
+        try:
+            st = entry.stat()
+        except OSError as e:
+            print(f"⚠️ Erro ao processar {entry.path}: {e}", file=sys.stderr)
+            continue
+
+        _classify(prefix + name, suffix, st, max_file_size, files, large)
+
+    return rel_dir, files, large, subdirs
+
+
+def _classify(
+    path: str, suffix: str, st: os.stat_result, max_file_size: int, files: list, large: list
+) -> None:
+    info = {
+        "path": path,
+        "size": st.st_size,
+        "ext": suffix or "no_extension",
+        "mtime": st.st_mtime_ns,
+        "inode": st.st_ino,
+    }
+    # Arquivos grandes ficam fora dos totais, mas podem render trechos amostrados
+    (large if st.st_size > max_file_size else files).append(info)
+
+
+def _stat_listed(
+    root: str,
+    rel_dir: str,
+    names: list[str],
+    ignore_extensions: frozenset[str],
+    max_file_size: int,
+) -> ScanResult:
+    """Faz stat dos arquivos listados pelo git em um diretório (mesmo retorno de _scan_dir)"""
+    files: list[dict] = []
+    large: list[dict] = []
+    prefix = rel_dir + os.sep if rel_dir else ""
+    abs_dir = os.path.join(root, rel_dir) if rel_dir else root
+
+    for name in names:
+        suffix = file_suffix(name)
+        if suffix.lower() in ignore_extensions:
+            continue
+        try:
+            st = os.stat(os.path.join(abs_dir, name))
+        except FileNotFoundError:
+            continue  # Removido da árvore de trabalho, mas ainda no índice
+        except OSError as e:
+            print(f"⚠️ Erro ao processar {prefix + name}: {e}", file=sys.stderr)
+            continue
+        # Submódulos aparecem como diretórios na listagem
+        if stat.S_ISREG(st.st_mode):
+            _classify(prefix + name, suffix, st, max_file_size, files, large)
+
+    return rel_dir, files, large, []
+
+
+def directory_key(path: str) -> str:
+    """Chave de by_directory para o caminho relativo de um arquivo"""
+    return os.path.dirname(path) or ROOT_DIR_NAME
+
+
+def apply_file(stats: dict[str, Any], info: dict, sign: int = 1) -> None:
+    """Soma (sign=1) ou subtrai (sign=-1) um arquivo dos agregados, sem tocar em stats["files"]"""
+    size = info["size"] * sign
+    stats["total_files"] += sign
+    stats["total_size"] += size
+
+    for bucket, key in (
+        (stats["by_extension"], info["ext"]),
+        (stats["by_directory"], directory_key(info["path"])),
+    ):
+        entry = bucket[key]
+        entry["count"] += sign
+        entry["size"] += size
+        if entry["count"] <= 0:
+            del bucket[key]
+
+
+def _merge(
+    stats: dict[str, Any], rel_dir: str, files: list[dict], large: list[dict], aggregate: bool
+) -> None:
+    """Mescla o agregado parcial de um diretório nas estatísticas globais"""
+    stats["large_files"].extend(large)
+    if not files:
+        return
+
+    stats["files"].extend(files)
+    if not aggregate:
+        return
+
+    dir_size = 0
+    by_extension = stats["by_extension"]
+    for info in files:
+        size = info["size"]
+        dir_size += size
+        ext_stats = by_extension[info["ext"]]
+        ext_stats["count"] += 1
+        ext_stats["size"] += size
+
+    dir_stats = stats["by_directory"][rel_dir or ROOT_DIR_NAME]
+    dir_stats["count"] += len(files)
+    dir_stats["size"] += dir_size
+
+    stats["total_files"] += len(files)
+    stats["total_size"] += dir_size
+
+
+def _group_listing(paths: Iterable[str], ignore_folders: frozenset[str]) -> dict[str, list[str]]:
+    """Agrupa a listagem do git por diretório, descartando pastas de ignore_folders"""
+    by_dir: dict[str, list[str]] = defaultdict(list)
+    for path in paths:
+        rel_dir, _, name = path.rpartition(os.sep)
+        if rel_dir and not ignore_folders.isdisjoint(rel_dir.split(os.sep)):
+            continue
+        by_dir[rel_dir].append(name)
+    return by_dir
+
+
+def scan_tree(
+    base_path: str,
+    ignore_folders: Iterable[str],
+    ignore_extensions: Iterable[str],
+    max_file_size: int,
+    workers: int | None = None,
+    aggregate: bool = True,
+    use_git: bool = True,
+    use_gitignore: bool = True,
+) -> dict[str, Any]:
+    """
+    Escaneia a árvore de diretórios em paralelo.
+
+    Args:
+        base_path: Diretório raiz a ser escaneado
+        ignore_folders: Nomes de diretórios que não devem ser visitados
+        ignore_extensions: Extensões (minúsculas) que devem ser ignoradas
+        max_file_size: Tamanho máximo (bytes) de arquivo a ser contabilizado
+        workers: Número de threads (None usa DEFAULT_WORKERS, <= 1 executa sem pool)
+        aggregate: Se False, apenas lista os arquivos (agregados ficam zerados)
+        use_git: Em checkouts git, lista os arquivos com `git ls-files`
+        use_gitignore: Na varredura de diretórios, aplica as regras dos .gitignore
+
+    Returns:
+        Estatísticas com totais, agregados por extensão/diretório, lista de
+        arquivos ordenada por caminho e arquivos acima de max_file_size
+    """
+    folders = frozenset(ignore_folders)
+    extensions = frozenset(ignore_extensions)
+    workers = DEFAULT_WORKERS if workers is None else workers
+    stats = new_stats()
+    root = os.fspath(base_path)
+
+    listing = list_git_files(root) if use_git else None
+    jobs: list[ScanJob]
+    if listing is not None:
+        # Apenas stat dos arquivos listados, um job por diretório
+        jobs = [
+            (_stat_listed, (root, rel_dir, names, extensions, max_file_size))
+            for rel_dir, names in _group_listing(listing, folders).items()
+        ]
+    else:
+        stack: IgnoreStack | None = () if use_gitignore else None
+        jobs = [(_scan_dir, (root, "", folders, extensions, max_file_size, stack))]
+
+    if workers <= 1:
+        while jobs:
+            func, args = jobs.pop()
+            rel_dir, files, large, subdirs = func(*args)
+            _merge(stats, rel_dir, files, large, aggregate)
+            for abs_dir, sub_rel, sub_stack in subdirs:
+                jobs.append(
+                    (_scan_dir, (abs_dir, sub_rel, folders, extensions, max_file_size, sub_stack))
+                )
+    else:
+        # Os workers só varrem; a mesclagem fica na thread principal, sem locks
+        results: queue.Queue = queue.Queue()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan") as pool:
+
+            def submit(func, args) -> None:
+                pool.submit(func, *args).add_done_callback(results.put)
+
+            for func, args in jobs:
+                submit(func, args)
+            outstanding = len(jobs)
+            while outstanding:
+                rel_dir, files, large, subdirs = results.get().result()
+                outstanding -= 1
+                _merge(stats, rel_dir, files, large, aggregate)
+                for abs_dir, sub_rel, sub_stack in subdirs:
+                    submit(
+                        _scan_dir,
+                        (abs_dir, sub_rel, folders, extensions, max_file_size, sub_stack),
+                    )
+                    outstanding += 1
+
+    # Ordem determinística independente do agendamento das threads
+    stats["files"].sort(key=itemgetter("path"))
+    stats["large_files"].sort(key=itemgetter("path"))
+    return stats
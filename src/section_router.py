@@ -0,0 +1,172 @@
+"""
+📑 Section Router - Fatias do relatório base por task
+=====================================================
+
+Divide o relatório base (src/quick_report.py) em trechos marcados por tags e
+monta, para cada task da crew, apenas os trechos que ela declara em `sections`
+no crew_config.yaml. Ex.: conformidade_legal recebe licenças e manifestos;
+auditoria_documentacao recebe README e documentação.
+
+Tags: overview (sempre incluída), structure, readme, docs, entry_points,
+manifests, licenses, architecture, code, tests e code:<diretório> (código de um
+diretório de primeiro nível, ex.: code:src). "all" (ou task sem `sections`)
+recebe o relatório completo.
+
+As seções são reconhecidas pelos títulos que quick_report escreve; blocos por
+arquivo ("### caminho (tamanho)") das seções de código recebem tags pelo caminho.
+"""
+
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.quick_report import is_test_path
+
+TAG_ALL = "all"
+TAG_OVERVIEW = "overview"
+TAG_CODE = "code"
+TAG_TESTS = "tests"
+KNOWN_TAGS = {
+    TAG_OVERVIEW,
+    "structure",
+    "readme",
+    "docs",
+    "entry_points",
+    "manifests",
+    "licenses",
+    "architecture",
+    TAG_CODE,
+    TAG_TESTS,
+}
+ALWAYS_TAGS = frozenset({TAG_OVERVIEW})
+
+# Título da seção em quick_report -> tags (None: seção com blocos por arquivo)
+SECTION_TAGS: dict[str, frozenset[str] | None] = {
+    "# 📊 Relatório Técnico da Codebase": frozenset({TAG_OVERVIEW}),
+    "## 📈 Distribuição por Extensão": frozenset({"structure"}),
+    "## 📁 Estrutura de Diretórios": frozenset({"structure"}),
+    "## 📖 README": frozenset({"readme"}),
+    "## 📚 Documentação": frozenset({"docs"}),
+    "## 💻 Código Principal": frozenset({"entry_points"}),
+    "## 🧾 Manifestos de Dependências": frozenset({"manifests"}),
+    "## 📜 Licenças": frozenset({"licenses"}),
+    "## 🕸️ Arquitetura Python": frozenset({"architecture"}),
+    "## 🧬 Estrutura do Código Python": None,
+    "## 📄 Arquivos de Código Detalhados": None,
+    "## 📦 Arquivos Grandes": None,
+    "## ♻️ Conteúdo Duplicado": frozenset({"structure"}),
+    "## 🧪 Testes": frozenset({TAG_TESTS}),
+    "## 📂 Lista Completa de Arquivos": frozenset({"structure"}),
+}
+FOOTER_LINE = "---"
+FILE_HEADING = re.compile(r"^### (.+) \(\d+(?:\.\d+)? (?:B|KB|MB|GB|TB)\)$")
+
+
+@dataclass
+class ReportPiece:
+    """Trecho do relatório; intro é o texto de abertura de uma seção"""
+
+    text: str
+    tags: frozenset[str]
+    section: int
+    intro: bool = True
+
+
+def validate_tags(tags: Iterable[str]) -> None:
+    """
+    Raises:
+        ValueError: Se alguma tag não for conhecida
+    """
+    unknown = [
+        tag
+        for tag in tags
+        if tag not in KNOWN_TAGS and tag != TAG_ALL and not tag.startswith(f"{TAG_CODE}:")
+    ]
+    if unknown:
+        raise ValueError(f"Seções desconhecidas: {', '.join(unknown)}")
+
+
+def path_tags(path: str) -> frozenset[str]:
+    """Tags de um bloco por arquivo: tests ou code + code:<diretório de primeiro nível>"""
+    if is_test_path(path):
+        return frozenset({TAG_TESTS})
+    parts = Path(path).parts
+    top = parts[0] if len(parts) > 1 else "."
+    return frozenset({TAG_CODE, f"{TAG_CODE}:{top}"})
+
+
+def _section_tags(line: str) -> tuple[bool, frozenset[str] | None]:
+    for title, tags in SECTION_TAGS.items():
+        if line.startswith(title):
+            return True, tags
+    return False, None
+
+
+def split_report(text: str) -> list[ReportPiece]:
+    """Divide o relatório em trechos marcados (juntos, reproduzem o texto original)"""
+    lines = text.splitlines(keepends=True)
+    # O rodapé começa na última linha "---" (o README pode ter outras)
+    footer_at = max(
+        (i for i, line in enumerate(lines) if line.rstrip("\n") == FOOTER_LINE), default=-1
+    )
+
+    pieces: list[ReportPiece] = []
+    current: list[str] = []
+    tags: frozenset[str] = ALWAYS_TAGS
+    section, intro, per_file = 0, True, False
+
+    def flush() -> None:
+        if current:
+            pieces.append(ReportPiece("".join(current), tags, section, intro))
+            current.clear()
+
+    for index, line in enumerate(lines):
+        stripped = line.rstrip("\n")
+        is_section, section_tags = _section_tags(stripped)
+        if index == footer_at:
+            is_section, section_tags = True, ALWAYS_TAGS
+        if is_section:
+            flush()
+            section += 1
+            intro = True
+            per_file = section_tags is None
+            tags = section_tags or frozenset()
+        elif per_file and (match := FILE_HEADING.match(stripped)):
+            flush()
+            intro = False
+            tags = path_tags(match.group(1))
+        current.append(line)
+    flush()
+    return pieces
+
+
+class SectionRouter:
+    """Monta a fatia do relatório base para um conjunto de tags"""
+
+    def __init__(self, report_text: str):
+        self.text = report_text
+        self.pieces = split_report(report_text)
+
+    def route(self, tags: Iterable[str] | None) -> str:
+        """Relatório com os trechos das tags (None ou "all": relatório completo)"""
+        if tags is None:
+            return self.text
+        wanted = set(tags)
+        validate_tags(wanted)
+        if TAG_ALL in wanted:
+            return self.text
+        wanted |= ALWAYS_TAGS
+
+        selected = [bool(piece.tags & wanted) for piece in self.pieces]
+        # Abertura de seções por arquivo entra se algum bloco da seção entrou
+        sections_used = {
+            piece.section
+            for piece, keep in zip(self.pieces, selected, strict=True)
+            if keep and not piece.intro
+        }
+        return "".join(
+            piece.text
+            for piece, keep in zip(self.pieces, selected, strict=True)
+            if keep or (piece.intro and not piece.tags and piece.section in sections_used)
+        )
@@ -0,0 +1,130 @@
+"""
+🪶 Sparse Clone - Clones parciais e sparse checkout guiados pelo scanner
+========================================================================
+
+Em repositórios de vários GB, um clone raso ainda baixa todos os blobs, embora
+o quick_report ignore arquivos acima de MAX_FILE_SIZE e pastas como
+node_modules. Os modos abaixo usam clone parcial (`--filter`) e sparse checkout
+(padrões no-cone) para que só sejam baixados os blobs que o scanner lê:
+
+- full: clone normal (comportamento anterior)
+- partial: `--filter=blob:limit=<MAX_FILE_SIZE>`; blobs grandes nem chegam ao
+  clone e ficam fora do checkout, junto com as pastas/extensões ignoradas
+- blobless: `--filter=blob:none`; nenhum blob no clone, o checkout busca sob
+  demanda apenas os arquivos incluídos pelo sparse checkout
+
+O servidor precisa aceitar filtros (GitHub/GitLab aceitam; em repositórios
+locais use URL file:// e `uploadpack.allowFilter=true`).
+"""
+
+import logging
+import shutil
+import subprocess  # nosec
+
+from src.quick_report import IGNORE_EXTENSIONS, IGNORE_FOLDERS, MAX_FILE_SIZE
+
+logger = logging.getLogger(__name__)
+
+CLONE_FULL = "full"
+CLONE_PARTIAL = "partial"
+CLONE_BLOBLESS = "blobless"
+CLONE_MODES = (CLONE_FULL, CLONE_PARTIAL, CLONE_BLOBLESS)
+GIT_TIMEOUT = 300
+
+
+def filter_spec(mode: str, blob_limit: int = MAX_FILE_SIZE) -> str | None:
+    """Filtro de objetos do clone para o modo (None no modo full)"""
+    if mode == CLONE_PARTIAL:
+        return f"blob:limit={blob_limit}"
+    if mode == CLONE_BLOBLESS:
+        return "blob:none"
+    if mode != CLONE_FULL:
+        raise ValueError(f"Modo de clone desconhecido: {mode} (use {', '.join(CLONE_MODES)})")
+    return None
+
+
+def clone_args(mode: str) -> list[str]:
+    """Argumentos extras de `git clone` (o checkout é feito depois do sparse checkout)"""
+    spec = filter_spec(mode)
+    return [] if spec is None else [f"--filter={spec}", "--no-checkout"]
+
+
+def _escape(path: str) -> str:
+    """Escapa caracteres especiais de padrões gitignore em um caminho literal"""
+    for char in "\\*?[!# ":
+        path = path.replace(char, "\\" + char)
+    return path
+
+
+def sparse_patterns(exclude_paths: list[str] | tuple[str, ...] = ()) -> list[str]:
+    """
+    Padrões no-cone: tudo, exceto pastas/extensões ignoradas pelo scanner e exclude_paths.
+
+    Args:
+        exclude_paths: Caminhos relativos (com "/") a deixar fora do checkout
+    """
+    patterns = ["/*"]
+    patterns += [f"!{_escape(folder)}/" for folder in sorted(IGNORE_FOLDERS)]
+    patterns += [f"!*{_escape(ext)}" for ext in sorted(IGNORE_EXTENSIONS)]
+    patterns += [f"!/{_escape(path)}" for path in exclude_paths]
+    return patterns
+
+
+def run_git(*args: str, cwd: str | None = None, input: str | None = None) -> str:
+    """Executa git e devolve stdout (CalledProcessError/TimeoutExpired em caso de falha)"""
+    git_path = shutil.which("git")
+    if not git_path:
+        raise FileNotFoundError("git não encontrado")
+    result = subprocess.run(  # nosec
+        [git_path, *args],
+        cwd=cwd,
+        input=input,
+        capture_output=True,
+        text=True,
+        timeout=GIT_TIMEOUT,
+        check=True,
+    )
+    return result.stdout
+
+
+def missing_blob_paths(repo_dir: str, rev: str = "HEAD") -> list[str]:
+    """
+    Arquivos de rev cujos blobs não foram baixados pelo clone parcial.
+
+    Usa `rev-list --missing=print` e `ls-tree` (nenhum dos dois busca blobs).
+    """
+    output = run_git("rev-list", "--objects", "--no-walk", "--missing=print", rev, cwd=repo_dir)
+    missing = {line[1:] for line in output.splitlines() if line.startswith("?")}
+    if not missing:
+        return []
+
+    paths = []
+    listing = run_git("ls-tree", "-r", "-z", "--full-tree", rev, cwd=repo_dir)
+    for entry in listing.split("\0"):
+        if not entry:
+            continue
+        meta, path = entry.split("\t", 1)
+        if meta.split()[2] in missing:
+            paths.append(path)
+    return paths
+
+
+def sparse_checkout(repo_dir: str, mode: str, ref: str = "HEAD") -> list[str]:
+    """
+    Configura o sparse checkout e faz checkout de ref em um clone --no-checkout.
+
+    No modo partial os blobs acima do limite ficam fora do checkout (o git não
+    tenta buscá-los); no blobless o checkout busca em lote só os incluídos.
+
+    Returns:
+        Caminhos deixados fora do checkout por não terem sido baixados
+    """
+    skipped = missing_blob_paths(repo_dir, ref) if mode == CLONE_PARTIAL else []
+    patterns = sparse_patterns(skipped)
+    run_git(
+        "sparse-checkout", "set", "--no-cone", "--stdin", cwd=repo_dir, input="\n".join(patterns)
+    )
+    run_git("checkout", "--quiet", "--detach", ref, cwd=repo_dir)
+    if skipped:
+        logger.info(f"🪶 Sparse checkout: {len(skipped)} arquivos grandes não baixados")
+    return skipped
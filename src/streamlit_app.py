@@ -11,10 +11,7 @@ from __future__ import annotations
 
 import io
 import mimetypes
-import os
-import shutil
 import sys
-import tempfile
 import time
 import zipfile
 from pathlib import Path
@@ -27,11 +24,41 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from src.analyze_repo import (  # noqa: E402
-    clone_repository,
+    checkout_repository,
     generate_base_report,
     get_git_diff,
     run_crewai_analysis,
+    write_metrics,
 )
+from src.job_queue import STATUS_DONE, JobQueue  # noqa: E402
+from src.job_worker import enqueue_analysis  # noqa: E402
+from src.metrics import STATUS_ERROR, MetricsRecorder  # noqa: E402
+from src.quick_report import format_size  # noqa: E402
+from src.scanner.artifact import load_scan_artifact  # noqa: E402
+
+
+def render_job_lookup() -> None:
+    """Consulta de jobs da fila por ID (status, erro e relatório final)"""
+    job_id = st.number_input("🔎 ID do job", min_value=0, step=1, value=0)
+    if not job_id:
+        return
+    job = JobQueue().get(int(job_id))
+    if job is None:
+        st.warning(f"Job {job_id} não encontrado.")
+        return
+    st.write(
+        f"**Status:** {job.status} · **Estágio:** {job.stage} · **Tentativas:** {job.attempts}"
+    )
+    if job.error:
+        st.error(job.error)
+    final_report = job.state.get("final_report")
+    if job.status == STATUS_DONE and final_report and Path(final_report).exists():
+        st.download_button(
+            "📥 Relatório final",
+            Path(final_report).read_bytes(),
+            file_name=Path(final_report).name,
+            mime="text/markdown",
+        )
 
 
 def list_outputs_for_project(outputs_dir: Path) -> list[Path]:
@@ -44,6 +71,38 @@ def list_outputs_for_project(outputs_dir: Path) -> list[Path]:
     )
 
 
+def render_scan_stats(artifact_path: str | None) -> None:
+    """Mostra as estatísticas da varredura a partir do artefato estruturado"""
+    if not artifact_path:
+        st.info("Nenhum artefato de varredura disponível para esta análise.")
+        return
+    try:
+        scan = load_scan_artifact(artifact_path)
+    except Exception as e:
+        st.error(f"Não foi possível ler o artefato de varredura: {e}")
+        return
+
+    summary = scan["summary"]
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Arquivos", f"{scan['total_files']:,}")
+    c2.metric("Tamanho", format_size(scan["total_size"]))
+    c3.metric("Tokens do relatório", f"{summary.get('report_tokens', 0):,}")
+
+    st.markdown("**Distribuição por extensão**")
+    st.dataframe(
+        [
+            {"extensão": ext, "arquivos": data["count"], "tamanho": format_size(data["size"])}
+            for ext, data in sorted(
+                scan["by_extension"].items(), key=lambda x: x[1]["count"], reverse=True
+            )
+        ],
+        use_container_width=True,
+    )
+    if summary.get("kinds"):
+        st.markdown("**Classificação dos arquivos**")
+        st.bar_chart(summary["kinds"])
+
+
 def app():
     st.set_page_config(
         page_title="CrewAvaliadora — AI Code Analyzer",
@@ -86,6 +145,12 @@ def app():
         st.markdown("---")
         st.markdown("### ⚙️ Configurações")
         st.info("Versão: 2.0.0 (Beta)")
+        use_queue = st.checkbox(
+            "📬 Executar em segundo plano (fila)",
+            help="Enfileira a análise para `python src/job_worker.py worker`; "
+            "consulte o resultado pelo ID do job.",
+        )
+        render_job_lookup()
 
         st.markdown("### 📝 Sobre")
         st.markdown(
@@ -160,6 +225,13 @@ def app():
                     st.error(f"⛔ Erro de Segurança (Head Ref): {error}")
                     return
 
+        if use_queue:
+            job_id = enqueue_analysis(JobQueue(), repo_url, base_ref, head_ref)
+            st.success(
+                f"📬 Análise enfileirada: job **{job_id}**. Consulte o status na barra lateral."
+            )
+            return
+
         project_name = repo_url.rstrip("/").split("/")[-1].replace(".git", "")
         outputs_dir = ROOT / "outputs" / project_name
         outputs_dir.mkdir(parents=True, exist_ok=True)
@@ -167,26 +239,29 @@ def app():
         # Status Container
         status_container = st.status("🔄 Processando análise...", expanded=True)
 
-        temp_dir = None
+        checkout = None
         diff_content = None
+        metrics = MetricsRecorder(project_name)
 
         try:
-            status_container.write("📂 Preparando ambiente temporário...")
-            temp_dir = tempfile.mkdtemp(prefix=f"crew_analysis_{project_name}_")
-
-            status_container.write("⬇️ Clonando repositório...")
+            status_container.write("⬇️ Clonando repositório (cache de mirrors)...")
             # Se for incremental, precisamos de histórico completo ou suficiente
             depth = 0 if analyze_mode == "Incremental (Diff)" else 1
-            ok = clone_repository(repo_url, temp_dir, depth=depth)
+            with metrics.stage("clone") as stage:
+                checkout = checkout_repository(repo_url, project_name, depth=depth)
 
-            if not ok:
+            if checkout is None:
+                stage.status = STATUS_ERROR
                 status_container.update(label="❌ Falha na clonagem!", state="error")
                 st.error("Falha ao clonar o repositório. Verifique a URL e tente novamente.")
                 return
+            temp_dir = str(checkout.path)
 
             if analyze_mode == "Incremental (Diff)" and base_ref and head_ref:
                 status_container.write(f"🔍 Extraindo diff entre `{base_ref}` e `{head_ref}`...")
-                diff_content = get_git_diff(temp_dir, base_ref, head_ref)
+                with metrics.stage("diff") as stage:
+                    diff_content = get_git_diff(temp_dir, base_ref, head_ref)
+                    stage.bytes_processed = len(diff_content)
                 if not diff_content:
                     st.warning(
                         "⚠️ Não foi possível obter o diff ou ele está vazio. Prosseguindo com análise completa."
@@ -196,9 +271,11 @@ def app():
 
             status_container.write("📊 Gerando relatório base (estatísticas)...")
             base_report_path = outputs_dir / "relatorio_codebase_inicial.md"
-            ok = generate_base_report(temp_dir, str(base_report_path))
+            with metrics.stage("base_report") as stage:
+                report = generate_base_report(temp_dir, str(base_report_path))
 
-            if not ok:
+            if report is None:
+                stage.status = STATUS_ERROR
                 status_container.update(label="❌ Falha no relatório base!", state="error")
                 st.error("Falha ao gerar o relatório base.")
                 return
@@ -206,11 +283,24 @@ def app():
             status_container.write(
                 "🤖 Executando Agentes de IA (CrewAI)... Isso pode levar alguns minutos."
             )
-            ok = run_crewai_analysis(
-                str(base_report_path), str(outputs_dir), project_name, temp_dir, diff_content
+            status_container.write(
+                f"✅ Relatório base: {report.stats['total_files']} arquivos, "
+                f"~{report.tokens:,} tokens"
             )
+            stage.bytes_processed = report.stats["total_size"]
+            with metrics.stage("crew") as stage:
+                ok = run_crewai_analysis(
+                    str(base_report_path),
+                    str(outputs_dir),
+                    project_name,
+                    temp_dir,
+                    diff_content,
+                    report=report,
+                    metrics=metrics,
+                )
 
             if not ok:
+                stage.status = STATUS_ERROR
                 status_container.update(label="❌ Falha na análise da IA!", state="error")
                 st.error(
                     "Falha na análise CrewAI. Verifique os logs do servidor para mais detalhes."
@@ -229,8 +319,13 @@ def app():
 
             if files:
                 # Tabs for better organization
-                tab1, tab2, tab3 = st.tabs(
-                    ["📄 Relatório Final", "📂 Arquivos & Downloads", "🔍 Diff Analisado"]
+                tab1, tab2, tab3, tab4 = st.tabs(
+                    [
+                        "📄 Relatório Final",
+                        "📂 Arquivos & Downloads",
+                        "🔍 Diff Analisado",
+                        "📈 Estatísticas",
+                    ]
                 )
 
                 # Tab 1: Report Preview
@@ -301,6 +396,10 @@ def app():
                             "Nenhum diff foi utilizado nesta análise (Modo Completo ou Diff vazio)."
                         )
 
+                # Tab 4: Estatísticas da varredura (artefato estruturado, sem re-escanear)
+                with tab4:
+                    render_scan_stats(report.artifact_path)
+
             else:
                 st.warning("Nenhum arquivo de output encontrado.")
 
@@ -308,11 +407,9 @@ def app():
             st.error(f"Ocorreu um erro inesperado: {e}")
             st.exception(e)
         finally:
-            if temp_dir and os.path.exists(temp_dir):
-                try:
-                    shutil.rmtree(temp_dir)
-                except Exception as e:
-                    print(f"Erro ao limpar diretório temporário: {e}")
+            if checkout is not None:
+                checkout.release()
+            write_metrics(metrics, outputs_dir)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,171 @@
+"""
+🕸️ Task Graph - Execução das tasks da crew como grafo de dependências
+=====================================================================
+
+Cada task em config/crew_config.yaml pode declarar `depends_on` com as tasks
+cujas saídas usa como contexto. Tasks sem dependências pendentes rodam em
+paralelo (até max_concurrent_tasks); a síntese começa assim que suas entradas
+terminam. A latência total cai da soma das tasks para o caminho crítico.
+
+Tasks sem `depends_on` dependem de todas as anteriores no YAML (comportamento
+sequencial); `depends_on: []` indica uma task independente.
+"""
+
+import contextvars
+import logging
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENT_TASKS = 3
+
+
+def task_dependencies(tasks_config: dict[str, dict]) -> dict[str, list[str]]:
+    """
+    Dependências de cada task, na ordem do YAML.
+
+    Raises:
+        ValueError: Dependência desconhecida ou ciclo
+    """
+    keys = list(tasks_config)
+    dependencies: dict[str, list[str]] = {}
+    for index, key in enumerate(keys):
+        declared = tasks_config[key].get("depends_on")
+        if declared is None:
+            dependencies[key] = keys[:index]
+            continue
+        unknown = [dep for dep in declared if dep not in tasks_config]
+        if unknown:
+            raise ValueError(f"Task '{key}' depende de tasks inexistentes: {', '.join(unknown)}")
+        dependencies[key] = list(declared)
+    topological_order(dependencies)
+    return dependencies
+
+
+def topological_order(dependencies: dict[str, list[str]]) -> list[str]:
+    """
+    Ordem de execução que respeita as dependências (estável em relação à entrada).
+
+    Raises:
+        ValueError: Se houver ciclo
+    """
+    order: list[str] = []
+    placed: set[str] = set()
+    remaining = list(dependencies)
+    while remaining:
+        ready = [key for key in remaining if all(dep in placed for dep in dependencies[key])]
+        if not ready:
+            raise ValueError(f"Ciclo de dependências entre as tasks: {', '.join(remaining)}")
+        order.extend(ready)
+        placed.update(ready)
+        remaining = [key for key in remaining if key not in placed]
+    return order
+
+
+def critical_path(dependencies: dict[str, list[str]], durations: dict[str, float]) -> float:
+    """Duração do caminho mais longo do grafo (latência mínima com paralelismo ilimitado)"""
+    finish: dict[str, float] = {}
+    for key in topological_order(dependencies):
+        start = max((finish[dep] for dep in dependencies[key]), default=0.0)
+        finish[key] = start + durations.get(key, 0.0)
+    return max(finish.values(), default=0.0)
+
+
+def sink_task(dependencies: dict[str, list[str]]) -> str:
+    """
+    Task final do grafo: a única da qual nenhuma outra depende (a síntese).
+
+    Raises:
+        ValueError: Nenhuma ou mais de uma task sem dependentes
+    """
+    used = {dep for deps in dependencies.values() for dep in deps}
+    sinks = [key for key in dependencies if key not in used]
+    if len(sinks) != 1:
+        raise ValueError(
+            f"O grafo de tasks deve ter uma única task final (sem dependentes): {sinks}"
+        )
+    return sinks[0]
+
+
+class DagScheduler:
+    """
+    Executa as tasks assim que suas dependências terminam, em um pool de threads.
+
+    resources associa tasks a um recurso exclusivo (ex.: o agente que as
+    executa): duas tasks do mesmo recurso nunca rodam ao mesmo tempo.
+    """
+
+    def __init__(
+        self,
+        dependencies: dict[str, list[str]],
+        max_workers: int = DEFAULT_MAX_CONCURRENT_TASKS,
+        resources: dict[str, str] | None = None,
+    ):
+        self.dependencies = dependencies
+        self.order = topological_order(dependencies)
+        self.max_workers = max(1, max_workers)
+        self.resources = resources or {}
+
+    def run(
+        self,
+        run_task: Callable[[str, dict[str, str]], str],
+        done: dict[str, str] | None = None,
+    ) -> dict[str, str]:
+        """
+        Executa as tasks pendentes.
+
+        Args:
+            run_task: Recebe a chave da task e as saídas das suas dependências;
+                devolve a saída da task
+            done: Saídas já conhecidas (ex.: checkpoint); essas tasks não rodam
+
+        Returns:
+            Saídas de todas as tasks
+
+        Raises:
+            A primeira exceção de run_task, depois que as tasks em andamento terminam
+            (tasks que dependem da que falhou não são iniciadas)
+        """
+        outputs = dict(done or {})
+        pending = [key for key in self.order if key not in outputs]
+        running: dict[Future, str] = {}
+        busy: set[str] = set()
+        error: BaseException | None = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="task") as pool:
+            while pending or running:
+                if error is None:
+                    for key in list(pending):
+                        if len(running) >= self.max_workers:
+                            break
+                        resource = self.resources.get(key)
+                        ready = all(dep in outputs for dep in self.dependencies[key])
+                        if not ready or (resource is not None and resource in busy):
+                            continue
+                        pending.remove(key)
+                        if resource is not None:
+                            busy.add(resource)
+                        context = {dep: outputs[dep] for dep in self.dependencies[key]}
+                        # Contexto de quem chamou (ex.: análise dona do log) segue para a task
+                        future = pool.submit(contextvars.copy_context().run, run_task, key, context)
+                        running[future] = key
+                        logger.info(f"▶️ Task iniciada: {key} ({len(running)} em andamento)")
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    key = running.pop(future)
+                    busy.discard(self.resources.get(key, ""))
+                    try:
+                        outputs[key] = future.result()
+                        logger.info(f"✅ Task concluída: {key}")
+                    except Exception as e:
+                        logger.error(f"❌ Task {key} falhou: {e}")
+                        if error is None:
+                            error = e
+
+        if error is not None:
+            raise error
+        return outputs
@@ -0,0 +1,249 @@
+"""
+🪙 Token Budget - Contabilidade de tokens e custo por agente e task
+===================================================================
+
+Cada chamada ao LLM registra tokens de prompt e de resposta (lidos do contador
+do LLM do CrewAI; sem ele, estimados pelo tamanho do texto) na task e no agente
+que a fizeram. Ao final da análise o resumo vai para um JSON ao lado do
+relatório final.
+
+Os orçamentos vêm de `token_budgets` no crew_config.yaml e são verificados antes
+de cada chamada:
+    - max_tokens_per_run: estourado, a análise é abortada
+    - max_tokens_per_task: estourado, a task é abortada (on_exceed: "abort") ou
+      passa a usar downgrade_model (on_exceed: "downgrade"), com uma nova cota do
+      mesmo tamanho; estourada também essa cota, a task é abortada
+"""
+
+import json
+import logging
+import threading
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from src.scanner.packer import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_VERSION = 1
+ON_EXCEED_ABORT = "abort"
+ON_EXCEED_DOWNGRADE = "downgrade"
+SCOPE_RUN = "run"
+SCOPE_TASK = "task"
+
+
+class BudgetExceededError(RuntimeError):
+    """Orçamento de tokens da execução ou de uma task estourado"""
+
+    def __init__(self, scope: str, name: str, used: int, limit: int):
+        where = f"{scope} {name}" if name else scope
+        super().__init__(f"orçamento de tokens estourado ({where}): {used:,} de {limit:,} tokens")
+        self.scope = scope
+        self.name = name
+        self.used = used
+        self.limit = limit
+
+
+@dataclass
+class TokenUsage:
+    """Tokens e custo acumulados"""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    calls: int = 0
+    estimated_calls: int = 0
+    cost_usd: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, other: "TokenUsage") -> None:
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.calls += other.calls
+        self.estimated_calls += other.estimated_calls
+        self.cost_usd += other.cost_usd
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "total_tokens": self.total_tokens}
+
+
+@dataclass(frozen=True)
+class TokenBudget:
+    """Orçamentos e preços de `token_budgets` (None: sem limite)"""
+
+    max_tokens_per_run: int | None = None
+    max_tokens_per_task: int | None = None
+    on_exceed: str = ON_EXCEED_ABORT
+    downgrade_model: str | None = None
+    # Modelo -> {"prompt": USD, "completion": USD} por milhão de tokens
+    pricing: Mapping[str, Mapping[str, float]] = field(default_factory=dict)
+
+    @classmethod
+    def from_config(cls, data: Mapping[str, Any] | None) -> "TokenBudget":
+        """
+        Raises:
+            ValueError: on_exceed inválido ou downgrade sem downgrade_model
+        """
+        data = data or {}
+        budget = cls(
+            max_tokens_per_run=data.get("max_tokens_per_run"),
+            max_tokens_per_task=data.get("max_tokens_per_task"),
+            on_exceed=data.get("on_exceed", ON_EXCEED_ABORT),
+            downgrade_model=data.get("downgrade_model"),
+            pricing=data.get("pricing") or {},
+        )
+        if budget.on_exceed not in (ON_EXCEED_ABORT, ON_EXCEED_DOWNGRADE):
+            raise ValueError(f"token_budgets.on_exceed inválido: {budget.on_exceed}")
+        if budget.on_exceed == ON_EXCEED_DOWNGRADE and not budget.downgrade_model:
+            raise ValueError("token_budgets.on_exceed 'downgrade' exige downgrade_model")
+        return budget
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """Custo em USD (0 se o modelo não tiver preço configurado)"""
+        # Aceita o modelo com ou sem prefixo do provedor ("gemini/...")
+        bare = model.split("/")[-1]
+        prices = self.pricing.get(model) or next(
+            (value for key, value in self.pricing.items() if key.split("/")[-1] == bare), {}
+        )
+        return (
+            prompt_tokens * prices.get("prompt", 0.0)
+            + completion_tokens * prices.get("completion", 0.0)
+        ) / 1_000_000
+
+
+def estimate_usage(messages: str | list[dict[str, Any]], response: Any) -> tuple[int, int]:
+    """Tokens de prompt e resposta estimados pelo tamanho do texto"""
+    if isinstance(messages, str):
+        prompt = messages
+    else:
+        prompt = "\n".join(str(message.get("content") or "") for message in messages)
+    return estimate_tokens(prompt), estimate_tokens(str(response or ""))
+
+
+class TokenLedger:
+    """Registro de tokens por task e por agente, com verificação de orçamento (thread-safe)"""
+
+    def __init__(self, budget: TokenBudget | None = None):
+        self.budget = budget or TokenBudget()
+        self.total = TokenUsage()
+        self.by_task: dict[str, TokenUsage] = {}
+        self.by_agent: dict[str, TokenUsage] = {}
+        self.by_model: dict[str, TokenUsage] = {}
+        self.downgraded: dict[str, str] = {}
+        self.aborted: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        task: str,
+        agent: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        estimated: bool = False,
+    ) -> TokenUsage:
+        """Registra uma chamada ao LLM e devolve o uso dela"""
+        usage = TokenUsage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            calls=1,
+            estimated_calls=int(estimated),
+            cost_usd=self.budget.cost(model, prompt_tokens, completion_tokens),
+        )
+        with self._lock:
+            self.total.add(usage)
+            for bucket, key in (
+                (self.by_task, task),
+                (self.by_agent, agent),
+                (self.by_model, model),
+            ):
+                bucket.setdefault(key, TokenUsage()).add(usage)
+        return usage
+
+    def task_tokens(self, task: str) -> int:
+        with self._lock:
+            usage = self.by_task.get(task)
+            return usage.total_tokens if usage else 0
+
+    def check(self, task: str) -> str | None:
+        """
+        Verifica os orçamentos antes de uma chamada da task.
+
+        Returns:
+            Modelo a usar no lugar do configurado (downgrade) ou None
+
+        Raises:
+            BudgetExceededError: Orçamento da execução ou da task estourado
+        """
+        budget = self.budget
+        with self._lock:
+            run_used = self.total.total_tokens
+            task_usage = self.by_task.get(task)
+            task_used = task_usage.total_tokens if task_usage else 0
+            downgraded = task in self.downgraded
+
+            if budget.max_tokens_per_run is not None and run_used >= budget.max_tokens_per_run:
+                self.aborted[task] = SCOPE_RUN
+                raise BudgetExceededError(SCOPE_RUN, "", run_used, budget.max_tokens_per_run)
+
+            limit = budget.max_tokens_per_task
+            if limit is None or task_used < limit:
+                return self.downgraded.get(task)
+            if budget.on_exceed == ON_EXCEED_DOWNGRADE and task_used < 2 * limit:
+                if not downgraded:
+                    self.downgraded[task] = budget.downgrade_model or ""
+                    logger.warning(
+                        f"🪙 Task {task} passou de {limit:,} tokens: "
+                        f"continuando com {budget.downgrade_model}"
+                    )
+                return self.downgraded[task]
+            self.aborted[task] = SCOPE_TASK
+            raise BudgetExceededError(
+                SCOPE_TASK, task, task_used, 2 * limit if downgraded else limit
+            )
+
+    def summary(self) -> dict[str, Any]:
+        """Resumo da execução (totais, por task, por agente e por modelo)"""
+        with self._lock:
+            return {
+                "version": SUMMARY_VERSION,
+                "total": self.total.to_dict(),
+                "tasks": {key: usage.to_dict() for key, usage in self.by_task.items()},
+                "agents": {key: usage.to_dict() for key, usage in self.by_agent.items()},
+                "models": {key: usage.to_dict() for key, usage in self.by_model.items()},
+                "budget": {
+                    "max_tokens_per_run": self.budget.max_tokens_per_run,
+                    "max_tokens_per_task": self.budget.max_tokens_per_task,
+                    "on_exceed": self.budget.on_exceed,
+                    "downgrade_model": self.budget.downgrade_model,
+                },
+                "downgraded_tasks": dict(self.downgraded),
+                "aborted_tasks": dict(self.aborted),
+            }
+
+    def write_json(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.summary(), indent=2, ensure_ascii=False), encoding="utf-8")
+        return path
+
+    def format_table(self) -> str:
+        """Tabela legível (por task + total) para o log"""
+        summary = self.summary()
+        rows = [f"{'Task':<32} {'Prompt':>10} {'Resposta':>10} {'Chamadas':>9} {'USD':>9}"]
+        for key, usage in [*summary["tasks"].items(), ("Total", summary["total"])]:
+            rows.append(
+                f"{key:<32} {usage['prompt_tokens']:>10,} {usage['completion_tokens']:>10,} "
+                f"{usage['calls']:>9} {usage['cost_usd']:>9.4f}"
+            )
+        return "\n".join(rows)
+
+
+def summary_path(report_file: str | Path) -> Path:
+    """Arquivo do resumo de tokens ao lado do relatório final"""
+    report_file = Path(report_file)
+    return report_file.with_name(f"{report_file.stem}.tokens.json")
@@ -0,0 +1,103 @@
+import json
+import os
+import subprocess
+import threading
+import time
+
+import pytest
+
+from src import analyze_repo, batch_analyze
+from src.batch_analyze import STATUS_FAILED, STATUS_OK, BatchPipeline, parse_jobs, write_summary
+
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "t",
+    "GIT_AUTHOR_EMAIL": "t@t",
+    "GIT_COMMITTER_NAME": "t",
+    "GIT_COMMITTER_EMAIL": "t@t",
+}
+
+
+def make_repo(root, name):
+    repo = root / name
+    (repo / "src").mkdir(parents=True)
+    (repo / "README.md").write_text(f"# {name}\n")
+    (repo / "src" / "main.py").write_text("print('ok')\n")
+    env = {**os.environ, **GIT_ENV}
+    for cmd in (["init", "-q", "-b", "main"], ["add", "."], ["commit", "-q", "-m", "init"]):
+        subprocess.run(["git", *cmd], cwd=repo, check=True, capture_output=True, env=env)
+    return str(repo)
+
+
+@pytest.fixture
+def no_cache(monkeypatch):
+    """Clones temporários simples (sem o cache de mirrors em outputs/)"""
+
+    def checkout(repo_url, name, depth=1):
+        return analyze_repo.checkout_repository(repo_url, name, depth=depth, use_cache=False)
+
+    monkeypatch.setattr(batch_analyze, "checkout_repository", checkout)
+
+
+class TestBatchAnalyze:
+    def test_parse_jobs_formats_and_unique_names(self):
+        jobs = parse_jobs(
+            [
+                "# comentário",
+                "https://github.com/a/repo",
+                "",
+                "https://github.com/b/repo.git main feature",
+                '{"url": "https://github.com/c/other", "base_ref": "v1", "head_ref": "v2"}',
+            ]
+        )
+        assert [job.name for job in jobs] == ["repo", "repo-2", "other"]
+        assert (jobs[1].base_ref, jobs[1].head_ref) == ("main", "feature")
+        assert (jobs[2].base_ref, jobs[2].head_ref) == ("v1", "v2")
+
+    def test_pipeline_without_crew(self, tmp_path, no_cache):
+        jobs = parse_jobs(
+            [make_repo(tmp_path, "alpha"), str(tmp_path / "missing"), make_repo(tmp_path, "beta")]
+        )
+        pipeline = BatchPipeline(
+            run_crew=False, outputs_root=tmp_path / "out", scan_in_worker=False
+        )
+        results = pipeline.run(jobs)
+
+        assert [job.name for job in results] == ["alpha", "missing", "beta"]
+        assert [job.status for job in results] == [STATUS_OK, STATUS_FAILED, STATUS_OK]
+        assert results[1].failed_stage == "clone"
+        assert set(results[0].timings) == {"clone", "scan"}
+        assert results[0].files == 2
+        assert (tmp_path / "out" / "alpha" / "relatorio_codebase_inicial.md").exists()
+        assert all(job.checkout is None for job in results)
+
+        summary = json.loads(write_summary(results, tmp_path / "lote.json", 1.0).read_text())
+        assert summary["ok"] == 2
+        assert summary["repos"][1]["error"] == "falha ao clonar repositório"
+
+    def test_crew_stage_overlaps_and_respects_limit(self, tmp_path, no_cache, monkeypatch):
+        running, peak = [0], [0]
+        lock = threading.Lock()
+
+        def fake_crew(base_report, output_dir, name, repo_path, diff, report=None):
+            assert report is not None and os.path.isdir(repo_path)
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.1)
+            with lock:
+                running[0] -= 1
+            return name != "gamma"
+
+        monkeypatch.setattr(batch_analyze, "run_crewai_analysis", fake_crew)
+        names = ["alpha", "beta", "gamma", "delta"]
+        jobs = parse_jobs(make_repo(tmp_path, name) for name in names)
+        pipeline = BatchPipeline(
+            crew_workers=2, outputs_root=tmp_path / "out", scan_in_worker=False
+        )
+        results = pipeline.run(jobs)
+
+        assert peak[0] == 2
+        statuses = {job.name: (job.status, job.failed_stage) for job in results}
+        assert statuses["gamma"] == (STATUS_FAILED, "crew")
+        assert statuses["alpha"] == (STATUS_OK, None)
+        assert all(set(job.timings) == {"clone", "scan", "crew"} for job in results)
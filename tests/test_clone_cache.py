@@ -0,0 +1,199 @@
+import os
+import subprocess
+import threading
+
+import pytest
+
+from src.clone_cache import CloneCache, CloneCacheError, cache_key
+from src.quick_report import MAX_FILE_SIZE
+from src.sparse_clone import (
+    CLONE_BLOBLESS,
+    CLONE_FULL,
+    CLONE_PARTIAL,
+    filter_spec,
+    sparse_patterns,
+)
+
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "t",
+    "GIT_AUTHOR_EMAIL": "t@t",
+    "GIT_COMMITTER_NAME": "t",
+    "GIT_COMMITTER_EMAIL": "t@t",
+}
+
+
+def git(*args, cwd=None):
+    env = {**os.environ, **GIT_ENV}
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True, env=env
+    ).stdout
+
+
+@pytest.fixture
+def origin(tmp_path):
+    """Repositório bare local com um commit, usado como "remoto" """
+    work = tmp_path / "work"
+    work.mkdir()
+    git("init", "-q", "-b", "main", cwd=work)
+    (work / "README.md").write_text("# v1\n")
+    git("add", "README.md", cwd=work)
+    git("commit", "-q", "-m", "v1", cwd=work)
+    bare = tmp_path / "origin.git"
+    git("clone", "-q", "--bare", str(work), str(bare))
+    git("remote", "add", "origin", str(bare), cwd=work)
+    return bare, work
+
+
+class TestCloneCache:
+    def test_cache_key_normalizes_url(self):
+        assert cache_key("https://github.com/u/Repo.git") == cache_key("https://github.com/u/repo/")
+        assert cache_key("https://github.com/u/a") != cache_key("https://github.com/v/a")
+        assert cache_key("https://github.com/u/socket.io").startswith("socket.io-")
+
+    def test_checkout_creates_mirror_and_reuses_it(self, origin, tmp_path):
+        bare, work = origin
+        cache = CloneCache(tmp_path / "cache")
+
+        with cache.checkout(str(bare)) as first:
+            assert (first.path / "README.md").read_text() == "# v1\n"
+            assert cache.mirror_path(str(bare)).is_dir()
+        assert not first.path.exists()
+
+        (work / "README.md").write_text("# v2\n")
+        git("commit", "-q", "-am", "v2", cwd=work)
+        git("push", "-q", "origin", "main", cwd=work)
+
+        with cache.checkout(str(bare)) as second:
+            # Fetch incremental no mirror existente traz o novo commit
+            assert (second.path / "README.md").read_text() == "# v2\n"
+            assert "v1" in git("log", "--format=%s", cwd=second.path)
+
+    def test_concurrent_checkouts_of_same_repo(self, origin, tmp_path):
+        bare, _ = origin
+        cache = CloneCache(tmp_path / "cache")
+        checkouts, errors = [], []
+
+        def run():
+            try:
+                checkouts.append(cache.checkout(str(bare)))
+            except CloneCacheError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors
+        assert len({c.path for c in checkouts}) == 4
+        for checkout in checkouts:
+            assert (checkout.path / "README.md").exists()
+            checkout.release()
+
+    def test_invalid_url_raises(self, tmp_path):
+        cache = CloneCache(tmp_path / "cache")
+        with pytest.raises(CloneCacheError):
+            cache.checkout(str(tmp_path / "missing.git"))
+        assert not cache.entries()
+
+    def test_lru_eviction_skips_mirrors_in_use(self, origin, tmp_path):
+        bare, _ = origin
+        other = tmp_path / "other.git"
+        git("clone", "-q", "--bare", str(bare), str(other))
+        cache = CloneCache(tmp_path / "cache")
+
+        in_use = cache.checkout(str(bare))
+        with cache.checkout(str(other)):
+            pass
+        assert len(cache.entries()) == 2
+
+        cache.max_bytes = 0
+        # bare está em uso e other é mantido explicitamente: nada é removido
+        assert cache.evict(keep={cache.mirror_path(str(other))}) == []
+        in_use.release()
+
+        removed = cache.evict()
+        assert set(removed) == {cache.mirror_path(str(bare)), cache.mirror_path(str(other))}
+        assert cache.entries() == []
+
+    def test_checkout_repository_falls_back_to_plain_clone(self, origin, monkeypatch):
+        from src import analyze_repo
+
+        bare, _ = origin
+
+        def broken_checkout(self, *args, **kwargs):
+            raise CloneCacheError("sem cache")
+
+        monkeypatch.setattr(CloneCache, "checkout", broken_checkout)
+        checkout = analyze_repo.checkout_repository(str(bare), "origin")
+        assert checkout is not None
+        assert checkout.mirror is None
+        assert (checkout.path / "README.md").exists()
+        checkout.release()
+        assert not checkout.path.exists()
+
+
+@pytest.fixture
+def large_origin(tmp_path):
+    """Remoto bare (file://) com arquivo acima de MAX_FILE_SIZE e node_modules"""
+    work = tmp_path / "large_work"
+    (work / "src").mkdir(parents=True)
+    (work / "node_modules" / "lib").mkdir(parents=True)
+    git("init", "-q", "-b", "main", cwd=work)
+    (work / "src" / "app.py").write_text("print('ok')\n")
+    (work / "node_modules" / "lib" / "index.js").write_text("module.exports = 1\n")
+    (work / "data.bin").write_bytes(os.urandom(MAX_FILE_SIZE + 1024))
+    git("add", ".", cwd=work)
+    git("commit", "-q", "-m", "init", cwd=work)
+    bare = tmp_path / "large.git"
+    git("clone", "-q", "--bare", str(work), str(bare))
+    git("config", "uploadpack.allowFilter", "true", cwd=bare)
+    git("config", "uploadpack.allowAnySHA1InWant", "true", cwd=bare)
+    return "file://" + str(bare)
+
+
+def missing_objects(repo):
+    output = git("rev-list", "--objects", "--all", "--missing=print", cwd=repo)
+    return [line for line in output.splitlines() if line.startswith("?")]
+
+
+class TestSparseClone:
+    def test_filter_spec(self):
+        assert filter_spec(CLONE_FULL) is None
+        assert filter_spec(CLONE_PARTIAL) == f"blob:limit={MAX_FILE_SIZE}"
+        assert filter_spec(CLONE_BLOBLESS) == "blob:none"
+        with pytest.raises(ValueError):
+            filter_spec("shallow")
+
+    def test_sparse_patterns_exclude_scanner_ignores(self):
+        patterns = sparse_patterns(["big files/a*.bin"])
+        assert patterns[0] == "/*"
+        assert "!node_modules/" in patterns
+        assert "!*.log" in patterns
+        assert patterns[-1] == "!/big\\ files/a\\*.bin"
+
+    @pytest.mark.parametrize("mode", [CLONE_PARTIAL, CLONE_BLOBLESS])
+    def test_clone_repository_skips_unneeded_blobs(self, large_origin, tmp_path, mode):
+        from src.analyze_repo import clone_repository
+
+        target = tmp_path / "clone"
+        assert clone_repository(large_origin, str(target), mode=mode)
+
+        assert (target / "src" / "app.py").read_text() == "print('ok')\n"
+        assert not (target / "node_modules").exists()
+        # partial: só o blob grande falta (fora do checkout);
+        # blobless: só o de node_modules (o checkout busca os incluídos)
+        assert len(missing_objects(target)) == 1
+        assert (target / "data.bin").exists() == (mode == CLONE_BLOBLESS)
+
+    def test_cache_partial_mode_uses_sparse_worktrees(self, large_origin, tmp_path):
+        cache = CloneCache(tmp_path / "cache", mode=CLONE_PARTIAL)
+        with cache.checkout(large_origin) as checkout:
+            assert sorted(os.listdir(checkout.path)) == [".git", "src"]
+            mirror = cache.mirror_path(large_origin)
+            assert len(missing_objects(mirror)) == 1
+
+        # Outro worktree em modo full no mesmo mirror não herda o sparse checkout
+        with CloneCache(tmp_path / "cache").checkout(large_origin) as full:
+            assert (full.path / "node_modules" / "lib" / "index.js").exists()
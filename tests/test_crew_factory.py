@@ -0,0 +1,99 @@
+import dataclasses
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+import yaml
+
+from src.crew_factory import (
+    UPSTREAM_PLACEHOLDER,
+    build_crew_template,
+    clear_template_cache,
+    load_crew_template,
+)
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "crew_config.yaml"
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_template_cache()
+    yield
+    clear_template_cache()
+
+
+@pytest.fixture
+def config_copy(tmp_path):
+    path = tmp_path / "crew_config.yaml"
+    shutil.copy(CONFIG_PATH, path)
+    return path
+
+
+def _edit(path: Path, change) -> None:
+    data = yaml.safe_load(path.read_text(encoding="utf-8"))
+    change(data)
+    path.write_text(yaml.safe_dump(data, allow_unicode=True), encoding="utf-8")
+
+
+class TestCrewTemplate:
+    def test_project_config(self):
+        template = build_crew_template(CONFIG_PATH)
+        raw = yaml.safe_load(CONFIG_PATH.read_text(encoding="utf-8"))
+        assert list(template.agents) == list(raw["agents"])
+        assert list(template.tasks) == list(raw["tasks"])
+        synthesis = template.tasks[template.final_task]
+        assert synthesis.key == "orquestracao_analise"
+        assert synthesis.description.endswith(UPSTREAM_PLACEHOLDER)
+        assert template.budget.max_tokens_per_run == raw["token_budgets"]["max_tokens_per_run"]
+        assert template.task_agents[synthesis.key] == synthesis.agent
+
+    def test_templates_are_immutable(self):
+        template = build_crew_template(CONFIG_PATH)
+        agent = next(iter(template.agents.values()))
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            agent.goal = "outro"
+        with pytest.raises(TypeError):
+            template.tasks["nova"] = None
+
+    def test_agent_hash_changes_only_for_edited_agent(self, config_copy):
+        before = build_crew_template(config_copy)
+        first, second = list(before.agents)[:2]
+        _edit(config_copy, lambda data: data["agents"][first].update(goal="Novo objetivo"))
+        after = build_crew_template(config_copy)
+        assert after.agents[first].config_hash != before.agents[first].config_hash
+        assert after.agents[second].config_hash == before.agents[second].config_hash
+
+    def test_invalid_sections_and_missing_fields(self, config_copy):
+        task = list(yaml.safe_load(config_copy.read_text(encoding="utf-8"))["tasks"])[0]
+        _edit(config_copy, lambda data: data["tasks"][task].update(sections=["licencas"]))
+        with pytest.raises(ValueError, match="desconhecidas"):
+            build_crew_template(config_copy)
+        _edit(config_copy, lambda data: data["tasks"][task].update(sections=["readme"]))
+        _edit(config_copy, lambda data: data["tasks"][task].pop("expected_output"))
+        with pytest.raises(ValueError, match="expected_output"):
+            build_crew_template(config_copy)
+
+    def test_requires_a_single_final_task(self, config_copy):
+        _edit(config_copy, lambda data: data["tasks"]["orquestracao_analise"]["depends_on"].pop())
+        with pytest.raises(ValueError, match="única task final"):
+            build_crew_template(config_copy)
+
+    def test_sequential_process_forces_one_task(self, config_copy):
+        _edit(
+            config_copy, lambda data: data["operational_settings"].update(process_type="sequential")
+        )
+        template = build_crew_template(config_copy)
+        assert template.sequential and template.max_concurrent_tasks == 1
+
+
+class TestLoadCrewTemplate:
+    def test_cached_until_file_changes(self, config_copy):
+        first = load_crew_template(config_copy)
+        assert load_crew_template(config_copy) is first
+
+        _edit(config_copy, lambda data: data["crew_config"].update(name="OutraCrew"))
+        stat = config_copy.stat()
+        os.utime(config_copy, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        reloaded = load_crew_template(config_copy)
+        assert reloaded is not first and reloaded.name == "OutraCrew"
@@ -0,0 +1,143 @@
+import pytest
+
+pytest.importorskip("crewai")
+
+from crewai.llms.base_llm import BaseLLM  # noqa: E402
+
+from src import crew_avaliadora  # noqa: E402
+from src.crew_avaliadora import CachedLLM, CrewFactory, MeteredLLM  # noqa: E402
+from src.llm_cache import ResponseCache  # noqa: E402
+from src.token_budget import TokenBudget, TokenLedger  # noqa: E402
+
+MODEL = "gemini/gemini-2.5-flash"
+MESSAGES = [{"role": "user", "content": "Analise a arquitetura"}]
+
+
+class StubLLM(BaseLLM):
+    """LLM sem rede: devolve uma resposta fixa e conta tokens como o CrewAI"""
+
+    def __init__(self, model: str = MODEL, response: str = "resposta do modelo"):
+        super().__init__(model=model)
+        self.response = response
+        self.calls: list[dict] = []
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        self.calls.append({"tools": tools, "stop": list(self.stop), **kwargs})
+        self._track_token_usage_internal({"prompt_tokens": 100, "completion_tokens": 20})
+        return self.response
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = ResponseCache(tmp_path / "llm.sqlite3")
+    yield c
+    c.close()
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    """Substitui o LLM do CrewAI; devolve os stubs criados, por modelo"""
+    created: dict[str, StubLLM] = {}
+
+    def factory(model: str) -> StubLLM:
+        created[model] = StubLLM(model)
+        return created[model]
+
+    monkeypatch.setattr(crew_avaliadora, "LLM", factory)
+    return created
+
+
+class TestCachedLLM:
+    def test_second_call_is_served_from_cache(self, cache):
+        inner = StubLLM()
+        llm = CachedLLM(MODEL, cache, "arquiteto", inner=inner)
+        assert llm.call(MESSAGES) == "resposta do modelo"
+        assert llm.call(MESSAGES) == "resposta do modelo"
+        assert len(inner.calls) == 1
+
+    def test_tools_and_response_model_bypass_the_cache(self, cache):
+        inner = StubLLM()
+        llm = CachedLLM(MODEL, cache, "arquiteto", inner=inner)
+        tools = [{"name": "grep"}]
+        llm.call(MESSAGES, tools=tools)
+        llm.call(MESSAGES, tools=tools)
+        llm.call(MESSAGES, response_model=dict)
+        llm.call(MESSAGES, response_model=dict)
+        assert len(inner.calls) == 4
+        assert cache.stats()["stores"] == 0
+
+    def test_stop_words_are_part_of_the_key(self, cache):
+        inner = StubLLM()
+        llm = CachedLLM(MODEL, cache, "arquiteto", inner=inner)
+        llm.stop = ["\nObservation:"]
+        llm.call(MESSAGES)
+        llm.stop = ["\nResultado:"]
+        llm.call(MESSAGES)
+        assert len(inner.calls) == 2
+        # O agente define as stop words no wrapper; o modelo recebe as mesmas
+        assert inner.calls[-1]["stop"] == ["\nResultado:"]
+
+
+class TestMeteredLLM:
+    def test_records_tokens_reported_by_the_model(self, stub_llm):
+        ledger = TokenLedger()
+        llm = MeteredLLM(MODEL, ledger, "arquiteto")
+        llm.start_task("analise_arquitetural")
+        llm.call(MESSAGES)
+        usage = ledger.by_task["analise_arquitetural"]
+        assert (usage.prompt_tokens, usage.completion_tokens, usage.estimated_calls) == (100, 20, 0)
+        assert ledger.by_agent["arquiteto"].calls == 1
+
+    def test_cache_hit_is_not_charged(self, cache, stub_llm):
+        ledger = TokenLedger()
+        metered = MeteredLLM(MODEL, ledger, "arquiteto")
+        metered.start_task("analise_arquitetural")
+        llm = CachedLLM(MODEL, cache, "arquiteto", inner=metered)
+        llm.call(MESSAGES)
+        llm.call(MESSAGES)
+        assert ledger.total.calls == 1
+        assert ledger.total.total_tokens == 120
+
+    def test_downgrade_switches_model_until_next_task(self, stub_llm):
+        budget = TokenBudget(
+            max_tokens_per_task=100, on_exceed="downgrade", downgrade_model="gemini/gemini-mini"
+        )
+        ledger = TokenLedger(budget)
+        llm = MeteredLLM(MODEL, ledger, "arquiteto")
+        llm.start_task("analise_arquitetural")
+        llm.call(MESSAGES)
+        llm.call(MESSAGES)
+        assert llm.inner is stub_llm["gemini/gemini-mini"]
+        assert len(stub_llm["gemini/gemini-mini"].calls) == 1
+        assert set(ledger.by_model) == {MODEL, "gemini/gemini-mini"}
+
+        llm.start_task("avaliacao_qualidade")
+        assert llm.inner is stub_llm[MODEL]
+        llm.call(MESSAGES)
+        assert len(stub_llm[MODEL].calls) == 2
+
+
+class TestCrewFactory:
+    def test_create_reuses_key_tools_and_released_llms(self, monkeypatch, stub_llm):
+        monkeypatch.setenv("GEMINI_API_KEY", "chave-de-teste")
+        configured = []
+        configure = crew_avaliadora.configure_api_key
+        monkeypatch.setattr(
+            crew_avaliadora,
+            "configure_api_key",
+            lambda key=None: configured.append(key) or configure(key),
+        )
+        factory = CrewFactory(use_llm_cache=False)
+        first = factory.create()
+        second = factory.create()
+        assert len(configured) == 1
+        assert first.agent_tools is second.agent_tools
+
+        # LLMs guardam estado da análise: duas crews ativas nunca dividem o mesmo
+        key = next(iter(first.agent_llms))
+        assert first.agent_llms[key].metered is not second.agent_llms[key].metered
+        leased = {name: agent_llm.metered for name, agent_llm in first.agent_llms.items()}
+        factory.release(first)
+        third = factory.create()
+        assert third.metered_llms == leased
+        assert all(llm.ledger is third.token_ledger for llm in third.metered_llms.values())
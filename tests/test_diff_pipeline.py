@@ -0,0 +1,154 @@
+import os
+import subprocess
+
+import pytest
+
+from src.diff_pipeline import (
+    MAX_FILE_DIFF_CHARS,
+    DiffEntry,
+    build_diff_context,
+    diff_entries,
+    ensure_refs,
+    risk_score,
+    skip_reason,
+)
+
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "t",
+    "GIT_AUTHOR_EMAIL": "t@t",
+    "GIT_COMMITTER_NAME": "t",
+    "GIT_COMMITTER_EMAIL": "t@t",
+}
+
+
+def git(*args, cwd=None):
+    env = {**os.environ, **GIT_ENV}
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True, env=env
+    ).stdout
+
+
+def write(root, rel, content):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(content, bytes):
+        path.write_bytes(content)
+    else:
+        path.write_text(content)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Repositório com branch main (base) e feature (head) com mudanças variadas"""
+    root = tmp_path / "repo"
+    root.mkdir()
+    git("init", "-q", "-b", "main", cwd=root)
+    write(root, "src/app.py", "".join(f"x{i} = {i}\n" for i in range(50)))
+    write(root, "src/old_name.py", "".join(f"def f{i}(): pass\n" for i in range(30)))
+    write(root, "docs/guide.md", "guia\n")
+    git("add", ".", cwd=root)
+    git("commit", "-q", "-m", "base", cwd=root)
+
+    git("checkout", "-q", "-b", "feature", cwd=root)
+    write(root, "src/app.py", "".join(f"x{i} = {i * 2}\n" for i in range(50)))
+    git("mv", "src/old_name.py", "src/new_name.py", cwd=root)
+    write(root, "src/auth/login.py", "def login(user): return True\n")
+    write(root, "vendor/lib/dep.js", "var x = 1;\n" * 200)
+    write(root, "package-lock.json", "{}\n" * 100)
+    write(root, "static/app.min.js", "var a=1;" * 100 + "\n")
+    write(root, "assets/logo.png", b"\x89PNG\0\0\0" * 10)
+    write(root, "docs/guide.md", "guia atualizado\n")
+    git("add", ".", cwd=root)
+    git("commit", "-q", "-m", "feature", cwd=root)
+    return root
+
+
+class TestDiffPipeline:
+    def test_diff_entries_statuses_and_numstat(self, repo):
+        entries = {e.path: e for e in diff_entries(str(repo), "main", "feature")}
+        assert entries["src/app.py"].status == "M"
+        assert (entries["src/app.py"].added, entries["src/app.py"].deleted) == (49, 49)
+        assert entries["src/new_name.py"].status == "R"
+        assert entries["src/new_name.py"].old_path == "src/old_name.py"
+        assert entries["src/auth/login.py"].status == "A"
+        assert entries["assets/logo.png"].binary
+
+    def test_skip_reasons(self):
+        assert skip_reason(DiffEntry("vendor/lib/dep.js", "A")) == "vendorizado"
+        assert skip_reason(DiffEntry("web/node_modules/x/i.js", "A")) == "ignorado"
+        assert skip_reason(DiffEntry("package-lock.json", "M")) == "lockfile"
+        assert skip_reason(DiffEntry("static/app.min.js", "A")) == "gerado"
+        assert skip_reason(DiffEntry("proto/api_pb2.py", "A")) == "gerado"
+        assert skip_reason(DiffEntry("logo.png", "A", binary=True)) == "binário"
+        assert skip_reason(DiffEntry("src/app.py", "M")) is None
+
+    def test_risk_score_prefers_code_hotspots_and_sensitive_paths(self):
+        code = DiffEntry("src/app.py", "M", added=10, deleted=10)
+        doc = DiffEntry("docs/guide.md", "M", added=10, deleted=10)
+        assert risk_score(code) > risk_score(doc)
+        assert risk_score(code, {"src/app.py": 20}) > risk_score(code)
+        small_auth = DiffEntry("src/auth/login.py", "A", added=1)
+        assert risk_score(small_auth) > risk_score(DiffEntry("src/util.py", "A", added=1))
+
+    def test_context_ranks_and_skips(self, repo):
+        context = build_diff_context(str(repo), "main", "feature")
+        relevant = [e.path for e in context.entries if not e.skip_reason]
+        assert relevant[0] == "src/app.py"
+        assert "vendor/lib/dep.js" not in relevant
+        assert "diff --git a/src/app.py b/src/app.py" in context.text
+        assert "var x = 1;" not in context.text
+        assert "A vendor/lib/dep.js +200 -0 (vendorizado)" in context.text
+        assert context.omitted == []
+
+    def test_context_is_size_bounded(self, repo):
+        context = build_diff_context(str(repo), "main", "feature", max_chars=1500)
+        assert len(context.text) <= 1500
+        assert context.omitted
+        assert "sem diff (limite de contexto)" in context.text
+
+    def test_truncated_diff_keeps_note_and_stops(self, repo):
+        context = build_diff_context(str(repo), "main", "feature", max_chars=1200)
+        assert len(context.text) <= 1200
+        assert context.included == ["src/app.py"]
+        assert "[diff de src/app.py truncado em" in context.text
+        assert context.text.endswith("3 arquivos relevantes sem diff (limite de contexto)\n")
+
+    def test_file_cut_at_its_own_cap_does_not_stop_the_others(self, tmp_path):
+        root = tmp_path / "big"
+        root.mkdir()
+        git("init", "-q", "-b", "main", cwd=root)
+        write(root, "big.py", "".join(f"v{i} = {i}\n" for i in range(3000)))
+        for i in range(5):
+            write(root, f"small_{i}.py", "a = 1\n")
+        git("add", ".", cwd=root)
+        git("commit", "-q", "-m", "base", cwd=root)
+        write(root, "big.py", "".join(f"v{i} = {i + 1}\n" for i in range(3000)))
+        for i in range(5):
+            write(root, f"small_{i}.py", "a = 2\n")
+        git("commit", "-q", "-am", "mudança", cwd=root)
+
+        context = build_diff_context(str(root), "HEAD~1", "HEAD", hotspots={})
+        assert context.included[0] == "big.py"
+        assert "[diff de big.py truncado em" in context.text
+        assert len(context.entries[0].text) <= MAX_FILE_DIFF_CHARS
+        assert sorted(context.included[1:]) == [f"small_{i}.py" for i in range(5)]
+        assert context.omitted == []
+
+    def test_summary_is_capped_by_budget(self, repo):
+        context = build_diff_context(str(repo), "main", "feature", max_chars=400)
+        assert len(context.text) <= 400
+        assert "... e mais 4 arquivos" in context.text
+        assert context.text.endswith("4 arquivos relevantes sem diff (limite de contexto)\n")
+
+    def test_missing_ref_is_fetched_only_when_needed(self, repo, tmp_path):
+        clone = tmp_path / "clone"
+        git("clone", "-q", "--single-branch", "-b", "main", f"file://{repo}", str(clone))
+        with pytest.raises(subprocess.CalledProcessError):
+            git("rev-parse", "--verify", "feature", cwd=clone)
+
+        base, head = ensure_refs(str(clone), "main", "feature")
+        assert head == git("rev-parse", "feature", cwd=repo).strip()
+        assert base == git("rev-parse", "main", cwd=repo).strip()
+
+        with pytest.raises(ValueError):
+            ensure_refs(str(clone), "nao-existe")
@@ -0,0 +1,155 @@
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.job_queue import STATUS_DEAD, STATUS_DONE, STATUS_LEASED, STATUS_QUEUED, JobQueue
+from src.job_worker import STAGES, WorkerPool, enqueue_analysis, release_checkout, run_clone
+
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "t",
+    "GIT_AUTHOR_EMAIL": "t@t",
+    "GIT_COMMITTER_NAME": "t",
+    "GIT_COMMITTER_EMAIL": "t@t",
+}
+
+
+def git(*args, cwd=None):
+    env = {**os.environ, **GIT_ENV}
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, env=env)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = JobQueue(tmp_path / "jobs.sqlite3", lease_seconds=60, max_attempts=2, retry_delay=0)
+    yield q
+    q.close()
+
+
+class TestJobQueue:
+    def test_enqueue_lease_complete(self, queue):
+        job_id = queue.enqueue({"repo_url": "x"}, "clone")
+        job = queue.lease("clone", "w1")
+        assert job.id == job_id and job.status == STATUS_LEASED and job.attempts == 1
+        assert queue.lease("clone", "w2") is None
+
+        assert queue.complete(job_id, "w1", {"repo_path": "/tmp/x"}, "report")
+        advanced = queue.get(job_id)
+        assert (advanced.stage, advanced.status, advanced.attempts) == ("report", STATUS_QUEUED, 0)
+
+        job = queue.lease("report", "w1")
+        assert job.state == {"repo_path": "/tmp/x"}
+        assert queue.complete(job_id, "w1", job.state, None)
+        assert queue.get(job_id).status == STATUS_DONE
+        assert queue.pending() == 0
+
+    def test_concurrent_leases_never_duplicate(self, queue):
+        ids = {queue.enqueue({"n": i}, "clone") for i in range(40)}
+        leased, lock = [], threading.Lock()
+
+        def worker(name):
+            while (job := queue.lease("clone", name)) is not None:
+                with lock:
+                    leased.append(job.id)
+
+        threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(leased) == sorted(ids)
+
+    def test_expired_lease_is_taken_over_and_old_owner_loses_it(self, tmp_path):
+        queue = JobQueue(tmp_path / "q.sqlite3", lease_seconds=0.05, max_attempts=3)
+        job_id = queue.enqueue({}, "clone")
+        queue.lease("clone", "crashed")
+        time.sleep(0.1)
+
+        job = queue.lease("clone", "w2")
+        assert job.id == job_id and job.attempts == 2
+        assert not queue.heartbeat(job_id, "crashed")
+        assert not queue.complete(job_id, "crashed", {}, None)
+        assert queue.heartbeat(job_id, "w2")
+
+    def test_retry_then_dead_letter(self, queue):
+        job_id = queue.enqueue({}, "clone")
+        queue.lease("clone", "w1")
+        assert queue.fail(job_id, "w1", "erro 1") == STATUS_QUEUED
+        queue.lease("clone", "w1")
+        assert queue.fail(job_id, "w1", "erro 2") == STATUS_DEAD
+
+        dead = queue.get(job_id)
+        assert dead.error == "erro 2"
+        assert queue.lease("clone", "w1") is None
+        assert [job.id for job in queue.jobs(STATUS_DEAD)] == [job_id]
+
+        assert queue.retry_dead(job_id)
+        assert queue.lease("clone", "w1").attempts == 1
+
+    def test_retry_backoff_delays_next_lease(self, tmp_path):
+        queue = JobQueue(tmp_path / "q.sqlite3", retry_delay=60)
+        job_id = queue.enqueue({}, "clone")
+        queue.lease("clone", "w1")
+        queue.fail(job_id, "w1", "temporário")
+        assert queue.lease("clone", "w1") is None
+        assert queue.pending() == 1
+
+
+class TestWorkerPool:
+    def test_pool_runs_all_stages_with_retries(self, queue, tmp_path):
+        calls = []
+        flaky = {"failed": False}
+
+        def runner(stage):
+            def run(job, outputs_root):
+                calls.append((job.id, stage))
+                if stage == "report" and job.payload["name"] == "b" and not flaky["failed"]:
+                    flaky["failed"] = True
+                    raise RuntimeError("falha temporária")
+                if job.payload["name"] == "dead":
+                    raise RuntimeError("sempre falha")
+                return {**job.state, stage: True}
+
+            return run
+
+        ids = [enqueue_analysis(queue, f"https://github.com/u/{name}") for name in "ab"]
+        dead_id = enqueue_analysis(queue, "https://github.com/u/dead")
+        pool = WorkerPool(
+            queue,
+            {"clone": 2, "report": 1, "crew": 1},
+            outputs_root=tmp_path,
+            poll_interval=0.01,
+            runners={stage: runner(stage) for stage in STAGES},
+        )
+        pool.run(drain=True)
+
+        for job_id in ids:
+            job = queue.get(job_id)
+            assert job.status == STATUS_DONE
+            assert all(job.state[stage] for stage in STAGES)
+            assert set(job.state["timings"]) == set(STAGES)
+        assert queue.get(dead_id).status == STATUS_DEAD
+        assert queue.get(dead_id).error == "clone: sempre falha"
+        assert calls.count((ids[1], "report")) == 2
+
+    def test_clone_is_self_contained_and_released(self, queue, tmp_path):
+        origin = tmp_path / "origin"
+        origin.mkdir()
+        git("init", "-q", "-b", "main", cwd=origin)
+        (origin / "README.md").write_text("# origem\n")
+        git("add", "README.md", cwd=origin)
+        git("commit", "-q", "-m", "v1", cwd=origin)
+
+        enqueue_analysis(queue, str(origin))
+        job = queue.lease("clone", "w1")
+        job.state = run_clone(job, tmp_path / "outputs")
+        repo_path = Path(job.state["repo_path"])
+        # Clone próprio (.git é diretório), não um worktree de um mirror do cache
+        assert (repo_path / ".git").is_dir()
+        assert (repo_path / "README.md").read_text() == "# origem\n"
+
+        release_checkout(job)
+        assert not repo_path.exists()
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from src.llm_cache import ResponseCache, cache_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = ResponseCache(tmp_path / "llm.sqlite3", max_bytes=1000, ttl=60)
+    yield c
+    c.close()
+
+
+def messages(report: str, upstream: str = "") -> list[dict]:
+    return [
+        {"role": "system", "content": "Você é o Arquiteto"},
+        {"role": "user", "content": f"RELATÓRIO:\n{report}\n\nContexto:\n{upstream}"},
+    ]
+
+
+class TestCacheKey:
+    def test_normalizes_timestamp_and_checkout_path(self):
+        first = messages("**Gerado em:** 2026-01-01 10:00:00\nDir: /tmp/crew_analysis_x_ab12/src")
+        second = messages("**Gerado em:** 2026-02-03 11:11:11\nDir: /tmp/crew_analysis_x_zz99/src")
+        key_a = cache_key("gemini", "agent", first, {"/tmp/crew_analysis_x_ab12": "<repo>"})
+        key_b = cache_key("gemini", "agent", second, {"/tmp/crew_analysis_x_zz99": "<repo>"})
+        assert key_a == key_b
+
+    def test_changes_with_model_agent_prompt_and_upstream(self):
+        base = cache_key("gemini", "agent", messages("r"))
+        assert cache_key("other", "agent", messages("r")) != base
+        assert cache_key("gemini", "agent2", messages("r")) != base
+        assert cache_key("gemini", "agent", messages("r2")) != base
+        assert cache_key("gemini", "agent", messages("r", "saída anterior")) != base
+
+
+class TestResponseCache:
+    def test_hit_miss_counters(self, cache):
+        assert cache.get("k") is None
+        cache.put("k", "resposta", model="gemini")
+        assert cache.get("k") == "resposta"
+        assert cache.stats() == {"hits": 1, "misses": 1, "stores": 1, "evictions": 0}
+
+    def test_persists_between_instances(self, tmp_path):
+        with ResponseCache(tmp_path / "llm.sqlite3") as first:
+            first.put("k", "resposta")
+        with ResponseCache(tmp_path / "llm.sqlite3") as second:
+            assert second.get("k") == "resposta"
+
+    def test_expired_entries_miss_and_are_evicted(self, tmp_path):
+        cache = ResponseCache(tmp_path / "llm.sqlite3", ttl=0.05)
+        cache.put("k", "resposta")
+        time.sleep(0.1)
+        assert cache.get("k") is None
+        assert cache.evict() == 1
+        assert cache.size_bytes() == 0
+
+    def test_size_limit_evicts_least_recently_used(self, cache):
+        cache.put("a", "x" * 400)
+        time.sleep(0.01)
+        cache.put("b", "y" * 400)
+        time.sleep(0.01)
+        assert cache.get("a") is not None  # "a" passa a ser o mais recente
+        time.sleep(0.01)
+        cache.put("c", "z" * 400)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+        assert cache.size_bytes() <= 1000
+        assert cache.evictions == 1
+
+    def test_bypass_skips_lookups_but_stores(self, tmp_path):
+        path = tmp_path / "llm.sqlite3"
+        with ResponseCache(path) as cache:
+            cache.put("k", "antiga")
+        with ResponseCache(path, bypass=True) as cache:
+            assert cache.get("k") is None
+            cache.put("k", "nova")
+            assert cache.stats()["misses"] == 1
+        with ResponseCache(path) as cache:
+            assert cache.get("k") == "nova"
@@ -0,0 +1,65 @@
+import json
+import time
+
+import pytest
+
+from src.metrics import STATUS_ERROR, STATUS_OK, MetricsRecorder
+
+
+class TestMetricsRecorder:
+    def test_stage_records_timing_and_bytes(self):
+        metrics = MetricsRecorder("proj")
+        with metrics.stage("scan", bytes_processed=10) as stage:
+            time.sleep(0.02)
+            stage.bytes_processed += 5
+
+        (recorded,) = metrics.stages
+        assert recorded.name == "scan" and recorded.status == STATUS_OK
+        assert recorded.wall_time >= 0.02
+        assert recorded.cpu_time >= 0
+        assert recorded.peak_rss > 0
+        assert recorded.bytes_processed == 15
+
+    def test_exception_marks_stage_as_error(self):
+        metrics = MetricsRecorder("proj")
+        with pytest.raises(ValueError):
+            with metrics.stage("crew"):
+                raise ValueError("falhou")
+        assert metrics.stages[0].status == STATUS_ERROR
+
+    def test_write_json(self, tmp_path):
+        metrics = MetricsRecorder("proj")
+        with metrics.stage("clone"):
+            pass
+        data = json.loads(metrics.write_json(tmp_path / "m" / "metricas.json").read_text())
+        assert data["project"] == "proj"
+        assert data["stages"][0]["name"] == "clone"
+        assert set(data["stages"][0]) >= {"wall_time", "cpu_time", "peak_rss", "bytes_processed"}
+
+    def test_prometheus_text_format(self, tmp_path):
+        metrics = MetricsRecorder('pro"j')
+        with metrics.stage("clone", bytes_processed=42):
+            pass
+        with pytest.raises(RuntimeError):
+            with metrics.stage("crew"):
+                raise RuntimeError
+
+        text = metrics.write_prometheus(tmp_path / "crew.prom").read_text()
+        assert "# TYPE crew_stage_wall_seconds gauge" in text
+        assert 'crew_stage_bytes_processed{project="pro\\"j",stage="clone"} 42' in text
+        assert 'crew_stage_success{project="pro\\"j",stage="crew"} 0' in text
+        assert not (tmp_path / "crew.prom.tmp").exists()
+
+    def test_format_table(self):
+        metrics = MetricsRecorder("proj")
+        with metrics.stage("base_report", bytes_processed=2048):
+            pass
+        table = metrics.format_table()
+        assert "base_report" in table and "2,048" in table and "Total" in table
+
+    def test_counters_in_outputs(self):
+        metrics = MetricsRecorder("proj")
+        metrics.set_counter("llm_cache.hits", 3)
+        assert metrics.to_dict()["counters"] == {"llm_cache.hits": 3}
+        assert 'crew_run_counter{project="proj",name="llm_cache.hits"} 3' in metrics.to_prometheus()
+        assert "llm_cache.hits" in metrics.format_table()
@@ -0,0 +1,591 @@
+"""Tests for the quick_report codebase scanner."""
+
+import io
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from src import quick_report
+from src.quick_report import (
+    REPORT_SECTIONS,
+    ReportTimeoutError,
+    build_report,
+    generate_report,
+    read_file_content,
+    scan_directory,
+)
+from src.scanner import (
+    artifact,
+    classify,
+    excerpt,
+    git_files,
+    gitignore,
+    hash_index,
+    import_graph,
+    manifest,
+    packer,
+    python_summary,
+)
+
+
+@pytest.fixture(autouse=True)
+def isolated_hash_index(tmp_path_factory, monkeypatch):
+    path = tmp_path_factory.mktemp("cache") / "hash_index.sqlite3"
+    monkeypatch.setattr(quick_report, "HASH_INDEX_PATH", path)
+    return path
+
+
+@pytest.fixture
+def sample_repo(tmp_path):
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "node_modules" / "dep").mkdir(parents=True)
+    (tmp_path / "README.md").write_text("# Sample\n")
+    (tmp_path / ".bashrc").write_text("export A=1\n")
+    (tmp_path / "src" / "main.py").write_text("print('hi')\n")
+    (tmp_path / "src" / "pkg" / "util.py").write_text("x = 1\n")
+    (tmp_path / "src" / "debug.log").write_text("ignored\n")
+    (tmp_path / "node_modules" / "dep" / "index.js").write_text("ignored\n")
+    return tmp_path
+
+
+class TestScanDirectory:
+    def test_collects_files_and_aggregates(self, sample_repo):
+        stats = scan_directory(str(sample_repo))
+
+        paths = [f["path"] for f in stats["files"]]
+        assert paths == sorted(paths)
+        assert set(paths) == {
+            ".bashrc",
+            "README.md",
+            os.path.join("src", "main.py"),
+            os.path.join("src", "pkg", "util.py"),
+        }
+        assert stats["total_files"] == 4
+        assert stats["total_size"] == sum(f["size"] for f in stats["files"])
+        assert stats["by_extension"][".py"]["count"] == 2
+        assert stats["by_extension"]["no_extension"]["count"] == 1
+        assert stats["by_directory"]["root"]["count"] == 2
+        assert stats["by_directory"][os.path.join("src", "pkg")]["count"] == 1
+
+    def test_skips_large_files(self, sample_repo, monkeypatch):
+        monkeypatch.setattr(quick_report, "MAX_FILE_SIZE", 8)
+        (sample_repo / "big.txt").write_text("x" * 100)
+
+        stats = scan_directory(str(sample_repo))
+
+        assert "big.txt" not in [f["path"] for f in stats["files"]]
+
+    def test_sequential_and_parallel_match(self, sample_repo):
+        sequential = scan_directory(str(sample_repo), workers=1)
+        parallel = scan_directory(str(sample_repo), workers=8)
+
+        assert sequential["files"] == parallel["files"]
+        assert dict(sequential["by_directory"]) == dict(parallel["by_directory"])
+        assert dict(sequential["by_extension"]) == dict(parallel["by_extension"])
+
+
+class TestReadFileContent:
+    @pytest.fixture
+    def numbered(self, tmp_path):
+        path = tmp_path / "numbered.py"
+        path.write_text("".join(f"line {i}\n" for i in range(1000)))
+        return path
+
+    def test_exact_line_count_is_not_truncated(self, tmp_path):
+        path = tmp_path / "short.py"
+        path.write_text("a\nb\n")
+
+        assert read_file_content(path, max_lines=2) == "a\nb\n"
+
+    def test_head_only(self, numbered):
+        content = read_file_content(numbered, max_lines=3)
+
+        assert content == "line 0\nline 1\nline 2\n\n... (truncado após 3 linhas)\n"
+
+    @pytest.mark.parametrize("mmap_threshold", [excerpt.MMAP_THRESHOLD, 1])
+    def test_head_and_tail_sampling(self, numbered, monkeypatch, mmap_threshold):
+        monkeypatch.setattr(excerpt, "MMAP_THRESHOLD", mmap_threshold)
+
+        content = read_file_content(numbered, max_lines=2, tail_lines=2)
+
+        head, omitted, tail = content.split("\n\n")
+        assert head == "line 0\nline 1"
+        assert "bytes omitidos" in omitted
+        assert tail == "line 998\nline 999\n"
+
+    def test_long_line_ends_excerpt(self, tmp_path):
+        path = tmp_path / "bundle.min.js"
+        path.write_text("x" * (excerpt.MAX_LINE_BYTES * 4))
+
+        content = read_file_content(path, max_lines=10)
+
+        assert len(content) < excerpt.MAX_LINE_BYTES + 100
+        assert "[...]" in content
+
+    def test_large_files_are_sampled_in_report(self, sample_repo, monkeypatch):
+        monkeypatch.setattr(quick_report, "MAX_FILE_SIZE", 64)
+        (sample_repo / "src" / "huge.py").write_text("".join(f"v{i} = {i}\n" for i in range(500)))
+
+        sink = io.StringIO()
+        generate_report(str(sample_repo), sink, use_manifest=False)
+
+        report = sink.getvalue()
+        assert "Arquivos Grandes" in report
+        assert "v0 = 0" in report and "v499 = 499" in report
+        assert "v250 = 250" not in report
+
+
+class TestScanManifest:
+    def test_incremental_rescan_matches_full_scan(self, sample_repo, tmp_path_factory, monkeypatch):
+        manifest_path = str(tmp_path_factory.mktemp("out") / "scan_manifest.json")
+        first = scan_directory(str(sample_repo), manifest_path=manifest_path)
+        assert all(f["hash"] for f in first["files"])
+
+        (sample_repo / "README.md").write_text("# Sample changed\n")
+        (sample_repo / "src" / "pkg" / "util.py").unlink()
+        (sample_repo / "docs").mkdir()
+        (sample_repo / "docs" / "guide.md").write_text("guide\n")
+
+        hashed = []
+        original_hash = hash_index.hash_and_sniff
+        monkeypatch.setattr(
+            hash_index, "hash_and_sniff", lambda path: hashed.append(path) or original_hash(path)
+        )
+        incremental = scan_directory(str(sample_repo), manifest_path=manifest_path)
+        full = scan_directory(str(sample_repo), hash_contents=False)
+
+        assert sorted(os.path.relpath(p, sample_repo) for p in hashed) == [
+            "README.md",
+            os.path.join("docs", "guide.md"),
+        ]
+        assert incremental["total_files"] == full["total_files"]
+        assert incremental["total_size"] == full["total_size"]
+        assert dict(incremental["by_extension"]) == dict(full["by_extension"])
+        assert dict(incremental["by_directory"]) == dict(full["by_directory"])
+        assert [f["path"] for f in incremental["files"]] == [f["path"] for f in full["files"]]
+
+    def test_invalid_manifest_is_rebuilt(self, sample_repo, tmp_path_factory):
+        manifest_path = tmp_path_factory.mktemp("out") / "scan_manifest.json"
+        manifest_path.write_text("{not json")
+
+        stats = scan_directory(str(sample_repo), manifest_path=str(manifest_path))
+
+        assert stats["total_files"] == 4
+        assert manifest.ScanManifest.load(manifest_path).entries.keys() == {
+            f["path"] for f in stats["files"]
+        }
+
+
+class TestGenerateReport:
+    def test_writes_to_file_with_manifest(self, sample_repo, tmp_path_factory):
+        out_dir = tmp_path_factory.mktemp("out")
+        output_file = out_dir / "relatorio.md"
+
+        generate_report(str(sample_repo), str(output_file))
+
+        content = output_file.read_text(encoding="utf-8")
+        assert content.startswith("# 📊 Relatório Técnico da Codebase")
+        assert "### Conteúdo de README.md" in content
+        assert "### src/main.py" in content
+        assert (out_dir / manifest.MANIFEST_FILENAME).exists()
+
+    def test_streams_to_sink_flushing_each_section(self, sample_repo):
+        class Sink(io.StringIO):
+            flushes = 0
+
+            def flush(self):
+                self.flushes += 1
+                super().flush()
+
+        sink = Sink()
+        generate_report(str(sample_repo), sink)
+
+        assert sink.flushes == len(REPORT_SECTIONS)
+        assert sink.getvalue().rstrip().endswith("fornecidos acima.")
+
+
+class TestHashIndex:
+    def test_duplicates_are_excerpted_once(self, sample_repo):
+        (sample_repo / "src" / "copy.js").write_text("function f() {\n  return 42;\n}\n" * 50)
+        (sample_repo / "src" / "pkg" / "vendored.js").write_text(
+            "function f() {\n  return 42;\n}\n" * 50
+        )
+
+        sink = io.StringIO()
+        generate_report(str(sample_repo), sink, use_manifest=False)
+
+        report = sink.getvalue()
+        assert "Conteúdo Duplicado" in report
+        assert report.count("Conteúdo idêntico a") == 1
+        assert report.count("return 42") == 27
+
+    def test_excerpts_are_reused_across_repos(self, sample_repo, tmp_path_factory):
+        other_repo = tmp_path_factory.mktemp("other")
+        (other_repo / "README.md").write_text((sample_repo / "README.md").read_text())
+
+        generate_report(str(sample_repo), io.StringIO(), use_manifest=False)
+        with hash_index.HashIndex(quick_report.HASH_INDEX_PATH) as index:
+            digest = hash_index.hash_file(other_repo / "README.md")
+            assert index.get(digest, f"{quick_report.EXCERPT_VARIANT}:200:0") == "# Sample\n"
+
+
+class TestPythonSummary:
+    SOURCE = """
+\"\"\"Module docstring.\"\"\"
+import os
+from pathlib import Path
+
+LIMIT = 10
+
+
+@decorator(1)
+def helper(a: int, b=2) -> str:
+    \"\"\"Returns a thing.
+
+    More details.
+    \"\"\"
+    return str(os.path.join(Path(a), b))
+
+
+class Service(Base, metaclass=Meta):
+    \"\"\"Service docs.\"\"\"
+
+    async def run(self):
+        await self.step()
+"""
+
+    def test_summarize_source(self):
+        summary = python_summary.summarize_source(self.SOURCE)
+
+        assert summary.splitlines() == [
+            '"""Module docstring."""',
+            "# imports: os, pathlib",
+            "# constantes: LIMIT",
+            "@decorator(1)",
+            "def helper(a: int, b=2) -> str  [3 chamadas]  # Returns a thing.",
+            "class Service(Base, metaclass=Meta):  # Service docs.",
+            "    async def run(self)  [1 chamadas]",
+        ]
+
+    def test_syntax_error_is_reported(self, tmp_path):
+        path = tmp_path / "broken.py"
+        path.write_text("def broken(:\n")
+
+        assert python_summary.summarize_file(path).startswith("[Erro de sintaxe")
+
+    def test_process_pool_matches_serial(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(python_summary, "POOL_THRESHOLD", 2)
+        paths = []
+        for i in range(4):
+            path = tmp_path / f"mod{i}.py"
+            path.write_text(f"def f{i}(x):\n    return g(x)\n")
+            paths.append(path)
+
+        assert python_summary.summarize_files(paths, workers=2) == python_summary.summarize_files(
+            paths, workers=1
+        )
+
+    def test_report_summarizes_python_instead_of_raw_lines(self, sample_repo):
+        (sample_repo / "src" / "service.py").write_text(self.SOURCE + "\nSECRET_BODY = 1\n")
+
+        sink = io.StringIO()
+        generate_report(str(sample_repo), sink, use_manifest=False)
+
+        report = sink.getvalue()
+        assert "## 🧬 Estrutura do Código Python" in report
+        assert "def helper(a: int, b=2) -> str" in report
+        assert "return str(os.path.join" not in report
+
+
+class TestPacker:
+    def test_knapsack_finds_optimal_subset(self):
+        # Guloso por densidade pegaria o item 0 e deixaria 5 de capacidade sem uso
+        weights, values = [6, 5, 5], [7.0, 5.0, 5.0]
+
+        assert packer.knapsack(weights, values, 10) == [1, 2]
+        assert packer.knapsack(weights, values, 0) == []
+
+    def test_pack_blocks_respects_budget_and_priority(self):
+        blocks = [
+            packer.ReportBlock("readme", "r" * 400, packer.PRIORITY_README),
+            packer.ReportBlock("big", "b" * 4000, 50.0),
+            packer.ReportBlock("small", "s" * 200, 5.0),
+        ]
+
+        selected = packer.pack_blocks(blocks, 200)
+
+        assert selected == {"readme", "small"}
+        assert sum(b.tokens for b in blocks if b.key in selected) <= 200
+        assert packer.pack_blocks(blocks, 10_000) == {"readme", "big", "small"}
+
+    def test_greedy_fallback_on_large_tables(self, monkeypatch):
+        monkeypatch.setattr(packer, "MAX_DP_CELLS", 1)
+        blocks = [packer.ReportBlock(f"b{i}", "x" * 40 * (i + 1), float(i)) for i in range(5)]
+
+        selected = packer.pack_blocks(blocks, 100)
+
+        assert selected
+        assert sum(b.tokens for b in blocks if b.key in selected) <= 100
+
+    def test_file_priority_prefers_high_signal_files(self):
+        base = packer.PRIORITY_CODE_EXCERPT
+        assert packer.file_priority("main.js", 100, base) > packer.file_priority(
+            os.path.join("a", "b", "helpers.js"), 100, base
+        )
+        assert packer.file_priority("app.js", 100, base) > packer.file_priority(
+            "app_test.js", 100, base
+        )
+
+    def test_report_under_budget_keeps_readme(self, sample_repo):
+        for i in range(30):
+            (sample_repo / "src" / f"lib{i}.js").write_text(f"// lib {i}\n" + "call();\n" * 60)
+
+        full = io.StringIO()
+        full_tokens = generate_report(str(sample_repo), full, use_manifest=False)
+        sink = io.StringIO()
+        budget = full_tokens // 2
+        tokens = generate_report(str(sample_repo), sink, use_manifest=False, token_budget=budget)
+
+        report = sink.getvalue()
+        assert packer.estimate_tokens(report) <= tokens <= budget
+        assert "### Conteúdo de README.md" in report
+        assert report.count("### src/lib") < full.getvalue().count("### src/lib")
+
+
+class TestBuildReport:
+    def test_returns_text_and_stats_in_memory(self, sample_repo, tmp_path_factory):
+        output = tmp_path_factory.mktemp("out") / "report.md"
+
+        result = build_report(str(sample_repo), output)
+
+        assert result.stats["total_files"] == 4
+        assert result.stats["by_extension"][".py"] == {"count": 2, "size": 18}
+        assert "# Sample" in result.text
+        assert output.read_text(encoding="utf-8") == result.text
+        assert result.output_file == str(output)
+        assert result.tokens > 0
+
+    def test_cooperative_timeout(self, sample_repo):
+        with pytest.raises(ReportTimeoutError):
+            build_report(str(sample_repo), timeout=0)
+
+    def test_worker_process_matches_in_process(self, sample_repo):
+        local = build_report(str(sample_repo), use_hash_index=False)
+        remote = build_report(str(sample_repo), use_hash_index=False, in_worker=True, timeout=60)
+
+        assert remote.stats == local.stats
+        assert remote.text.split("\n")[3:] == local.text.split("\n")[3:]
+
+    def test_worker_process_propagates_timeout(self, sample_repo):
+        with pytest.raises(ReportTimeoutError):
+            build_report(str(sample_repo), use_hash_index=False, in_worker=True, timeout=0)
+
+
+class TestGitignore:
+    def test_rules_follow_gitignore_semantics(self):
+        rules = gitignore.GitignoreRules(
+            ["# comentário", "*.pyc", "!keep.pyc", "/build/", "docs/**/*.md", "cache/"]
+        )
+
+        assert rules.match("pkg/mod.pyc", False) is True
+        assert rules.match("pkg/keep.pyc", False) is False
+        assert rules.match("build", True) is True
+        assert rules.match("src/build", True) is None
+        assert rules.match("docs/a/b/page.md", False) is True
+        assert rules.match("cache", False) is None
+        assert rules.match("src/cache", True) is True
+
+    def test_walker_honours_nested_gitignores(self, sample_repo):
+        (sample_repo / ".gitignore").write_text("dist/\n*.gen.js\n")
+        (sample_repo / "dist").mkdir()
+        (sample_repo / "dist" / "bundle.js").write_text("x")
+        (sample_repo / "src" / "api.gen.js").write_text("x")
+        (sample_repo / "src" / "pkg" / ".gitignore").write_text("*.py\n!util.py\n")
+        (sample_repo / "src" / "pkg" / "scratch.py").write_text("x")
+
+        paths = {f["path"] for f in scan_directory(str(sample_repo))["files"]}
+
+        assert os.path.join("dist", "bundle.js") not in paths
+        assert os.path.join("src", "api.gen.js") not in paths
+        assert os.path.join("src", "pkg", "scratch.py") not in paths
+        assert os.path.join("src", "pkg", "util.py") in paths
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="git não instalado")
+    def test_git_checkout_uses_ls_files(self, sample_repo, monkeypatch):
+        (sample_repo / ".gitignore").write_text("generated/\n")
+        (sample_repo / "generated").mkdir()
+        (sample_repo / "generated" / "out.js").write_text("x")
+        subprocess.run(["git", "init", "-q"], cwd=sample_repo, check=True)
+        subprocess.run(["git", "add", "README.md", "src"], cwd=sample_repo, check=True)
+        (sample_repo / "untracked.txt").write_text("novo")
+
+        listed = set(git_files.list_git_files(str(sample_repo)))
+        assert os.path.join("src", "main.py") in listed
+        assert "untracked.txt" in listed
+        assert os.path.join("generated", "out.js") not in listed
+
+        # A varredura não visita os diretórios, apenas faz stat da listagem
+        monkeypatch.setattr(os, "scandir", None)
+        stats = scan_directory(str(sample_repo))
+
+        paths = {f["path"] for f in stats["files"]}
+        ignored = {
+            os.path.join("src", "debug.log"),
+            os.path.join("node_modules", "dep", "index.js"),
+        }
+        assert paths == listed - ignored
+        assert stats["total_files"] == len(paths)
+
+    def test_non_checkout_is_not_listed(self, sample_repo):
+        assert git_files.list_git_files(str(sample_repo)) is None
+
+
+class TestClassify:
+    def test_classify_head(self):
+        assert classify.classify_head(b"def f():\n    return 1\n", "a.py") == "source"
+        assert classify.classify_head(b"\x89PNG\r\n\x1a\n\0\0", "logo.js") == "binary"
+        assert classify.classify_head(b"// Code generated by protoc. DO NOT EDIT.\n", "a.go") == (
+            "generated"
+        )
+        assert classify.classify_head(b"var a=1;" * 200, "app.js") == "minified"
+        assert classify.classify_head(b"var a = 1;\n", "vendor/jquery.min.js") == "minified"
+        assert classify.classify_head(b"", "empty.py") == "source"
+
+    def test_report_excerpts_only_source_files(self, sample_repo):
+        (sample_repo / "src" / "app.js").write_text("function main() {\n  return 1;\n}\n")
+        (sample_repo / "src" / "bundle.js").write_text("var a=1;" * 500)
+        (sample_repo / "src" / "proto_pb.js").write_text("// @generated\nvar pb = {};\n")
+        (sample_repo / "src" / "image.js").write_bytes(b"GIF89a\0\0\1\2")
+        (sample_repo / "src" / "models_pb2.py").write_text(
+            "# Generated by the protocol buffer compiler.  DO NOT EDIT!\nX = 1\n"
+        )
+
+        sink = io.StringIO()
+        generate_report(str(sample_repo), sink, use_manifest=False)
+
+        report = sink.getvalue()
+        assert "### src/app.js" in report
+        for name in ("bundle.js", "proto_pb.js", "image.js", "models_pb2.py"):
+            assert f"### src/{name}" not in report
+        assert "1 binários, 2 gerados, 1 minificados" in report
+
+    def test_classification_is_cached_in_manifest(self, sample_repo, tmp_path_factory, monkeypatch):
+        (sample_repo / "src" / "bundle.js").write_text("var a=1;" * 500)
+        manifest_path = str(tmp_path_factory.mktemp("out") / "scan_manifest.json")
+        scan_directory(str(sample_repo), manifest_path=manifest_path)
+
+        monkeypatch.setattr(hash_index, "classify_head", None)
+        stats = scan_directory(str(sample_repo), manifest_path=manifest_path)
+
+        kinds = {f["path"]: f["kind"] for f in stats["files"]}
+        assert kinds[os.path.join("src", "bundle.js")] == "minified"
+        assert kinds[os.path.join("src", "main.py")] == "source"
+
+
+class TestScanArtifact:
+    def test_build_report_writes_loadable_artifact(self, sample_repo, tmp_path_factory):
+        output = tmp_path_factory.mktemp("out") / "report.md"
+
+        result = build_report(str(sample_repo), output)
+
+        assert result.artifact_path == str(output.with_name("report.scan.jsonl"))
+        scan = artifact.load_scan_artifact(result.artifact_path)
+        assert scan["total_files"] == result.stats["total_files"]
+        assert scan["by_extension"] == result.stats["by_extension"]
+        assert scan["by_directory"] == result.stats["by_directory"]
+        assert [f["path"] for f in scan["files"]] == [f["path"] for f in result.stats["files"]]
+        assert scan["files"][0].keys() == set(artifact.FILE_FIELDS)
+        assert scan["summary"]["report_tokens"] == result.tokens
+        assert scan["summary"]["kinds"] == {"source": 4}
+
+    def test_msgpack_falls_back_to_jsonl_without_dependency(
+        self, sample_repo, tmp_path, monkeypatch
+    ):
+        monkeypatch.setattr(artifact, "msgpack", None)
+        stats = scan_directory(str(sample_repo))
+
+        path = artifact.write_scan_artifact(
+            stats, tmp_path / "r.scan.msgpack", str(sample_repo), artifact.FORMAT_MSGPACK
+        )
+
+        assert path.name == "r.scan.jsonl"
+        assert artifact.load_scan_artifact(path)["total_files"] == 4
+
+    def test_msgpack_roundtrip(self, sample_repo, tmp_path):
+        pytest.importorskip("msgpack")
+        stats = scan_directory(str(sample_repo))
+
+        path = artifact.write_scan_artifact(
+            stats, tmp_path / "r.scan.msgpack", str(sample_repo), artifact.FORMAT_MSGPACK
+        )
+
+        loaded = artifact.load_scan_artifact(path)
+        assert [f["hash"] for f in loaded["files"]] == [f["hash"] for f in stats["files"]]
+
+    def test_rejects_unknown_version(self, tmp_path):
+        path = tmp_path / "r.scan.jsonl"
+        path.write_text('{"type": "summary", "version": 999}\n')
+
+        with pytest.raises(ValueError):
+            artifact.load_scan_artifact(path)
+
+
+class TestImportGraph:
+    @pytest.fixture
+    def layered_repo(self, tmp_path):
+        pkg = tmp_path / "src" / "app"
+        pkg.mkdir(parents=True)
+        (pkg / "__init__.py").write_text("from .core import Engine\n")
+        (pkg / "core.py").write_text(
+            "import json\n\nclass Engine:\n    def run(self):\n        return json.dumps({})\n"
+        )
+        (pkg / "api.py").write_text(
+            "from app.core import Engine\nfrom . import jobs\n\n"
+            "def handler():\n    return Engine().run(), jobs.schedule()\n"
+        )
+        (pkg / "jobs.py").write_text(
+            "import requests\nfrom app import api\n\ndef schedule():\n    return api.handler\n"
+        )
+        return tmp_path
+
+    def test_module_name_and_relative_imports(self):
+        assert import_graph.module_name(os.path.join("src", "app", "__init__.py")) == (
+            "src.app",
+            True,
+        )
+        result = import_graph.index_source("from ..util import x\n", "pkg.sub.mod", False)
+        assert result["imports"] == [["pkg.util", ["x"]]]
+
+    def test_graph_metrics(self, layered_repo):
+        stats = scan_directory(str(layered_repo))
+        files = [f for f in stats["files"] if f["ext"] == ".py"]
+        jobs = [
+            (str(layered_repo / f["path"]), *import_graph.module_name(f["path"])) for f in files
+        ]
+
+        graph = import_graph.ImportGraph.build(files, import_graph.index_files(jobs, workers=1))
+
+        assert graph.edges["src.app.api"] == {"src.app.core", "src.app.jobs"}
+        assert graph.fan_in()["src.app.core"] == 2
+        assert graph.cycles() == [["src.app.api", "src.app.jobs"]]
+        assert graph.layers()[0] == ["src.app.core"]
+        assert graph.external["src.app.jobs"] == {"requests"}
+        assert graph.references["src.app.core.Engine"] == {"src.app.api": 1}
+        assert graph.definitions["src.app.core.Engine.run"]["kind"] == "def"
+
+    def test_report_section_and_persisted_index(self, layered_repo, tmp_path_factory):
+        output = tmp_path_factory.mktemp("out") / "report.md"
+
+        result = build_report(str(layered_repo), output)
+
+        assert "## 🕸️ Arquitetura Python (Grafo de Imports)" in result.text
+        assert "`src.app.api` ↔ `src.app.jobs`" in result.text
+        index = import_graph.load_import_index(result.import_index_path)
+        assert index["modules"]["src.app.core"]["fan_in"] == 2
+        assert index["cycles"] == [["src.app.api", "src.app.jobs"]]
+
+        # Segunda execução reaproveita os índices por arquivo do hash index
+        again = build_report(str(layered_repo), output)
+        assert again.text.split("\n")[3:] == result.text.split("\n")[3:]
@@ -0,0 +1,103 @@
+import json
+import os
+import subprocess
+
+import pytest
+
+from src import analyze_repo
+from src.analyze_repo import checkout_repository
+from src.clone_cache import CloneCache
+from src.diff_pipeline import resolve_ref
+from src.run_checkpoint import (
+    BASE_REPORT_FILE,
+    STAGE_BASE_REPORT,
+    STAGE_CLONE,
+    CheckpointError,
+    RunCheckpoint,
+    config_hash,
+)
+
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "t",
+    "GIT_AUTHOR_EMAIL": "t@t",
+    "GIT_COMMITTER_NAME": "t",
+    "GIT_COMMITTER_EMAIL": "t@t",
+}
+
+
+def git(repo, *args):
+    env = {**os.environ, **GIT_ENV}
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, env=env)
+
+
+class TestRunCheckpoint:
+    def test_start_complete_and_load(self, tmp_path):
+        checkpoint = RunCheckpoint.start("proj", "https://x/proj", "a" * 40, "c" * 16, tmp_path)
+        assert checkpoint.run_id == "proj-aaaaaaaaaaaa-cccccccc"
+        checkpoint.complete(STAGE_CLONE, commit="a" * 40)
+        checkpoint.save_artifact(BASE_REPORT_FILE, "# relatório")
+        checkpoint.complete(STAGE_BASE_REPORT, files=3)
+
+        loaded = RunCheckpoint.load(checkpoint.run_id, tmp_path)
+        assert loaded.repo_url == "https://x/proj" and loaded.commit == "a" * 40
+        assert loaded.is_done(STAGE_BASE_REPORT) and not loaded.is_done("crew")
+        assert loaded.stage_data(STAGE_BASE_REPORT)["files"] == 3
+        assert loaded.read_artifact(BASE_REPORT_FILE) == "# relatório"
+
+    def test_task_outputs_keep_completion_order(self, tmp_path):
+        checkpoint = RunCheckpoint.start("proj", "u", "b" * 40, "c" * 16, tmp_path)
+        checkpoint.save_task_output("quality", "saída q")
+        checkpoint.save_task_output("architecture", "saída a {chaves}")
+
+        loaded = RunCheckpoint.load(checkpoint.run_id, tmp_path)
+        assert loaded.task_outputs() == {"quality": "saída q", "architecture": "saída a {chaves}"}
+        manifest = json.loads((loaded.path / "manifest.json").read_text())
+        assert manifest["stages"]["crew.task.quality"]["chars"] == len("saída q")
+
+    def test_start_discards_previous_run(self, tmp_path):
+        first = RunCheckpoint.start("proj", "u", "b" * 40, "c" * 16, tmp_path)
+        first.save_task_output("quality", "antiga")
+        second = RunCheckpoint.start("proj", "u", "b" * 40, "c" * 16, tmp_path)
+        assert second.path == first.path
+        assert second.task_outputs() == {}
+
+    def test_load_missing_or_invalid(self, tmp_path):
+        with pytest.raises(CheckpointError):
+            RunCheckpoint.load("nada", tmp_path)
+        (tmp_path / "ruim").mkdir()
+        (tmp_path / "ruim" / "manifest.json").write_text("{")
+        with pytest.raises(CheckpointError):
+            RunCheckpoint.load("ruim", tmp_path)
+
+    def test_config_hash_changes_with_inputs(self, tmp_path):
+        config = tmp_path / "crew.yaml"
+        config.write_text("tasks: {}\n")
+        base = config_hash(config, "gemini/a")
+        assert config_hash(config, "gemini/a") == base
+        assert config_hash(config, "gemini/b") != base
+        config.write_text("tasks: {x: 1}\n")
+        assert config_hash(config, "gemini/a") != base
+
+
+class TestPinnedCheckout:
+    @pytest.mark.parametrize("use_cache", [False, True])
+    def test_checkout_at_recorded_commit(self, tmp_path, monkeypatch, use_cache):
+        monkeypatch.setattr(
+            analyze_repo, "CloneCache", lambda mode: CloneCache(tmp_path / "mirrors", mode=mode)
+        )
+        repo = tmp_path / "origin"
+        repo.mkdir()
+        git(repo, "init", "-q", "-b", "main")
+        (repo / "app.py").write_text("v1\n")
+        git(repo, "add", ".")
+        git(repo, "commit", "-q", "-m", "v1")
+        first = resolve_ref(str(repo), "HEAD")
+        (repo / "app.py").write_text("v2\n")
+        git(repo, "commit", "-q", "-am", "v2")
+
+        checkout = checkout_repository(str(repo), "origin", use_cache=use_cache, ref=first)
+        try:
+            assert resolve_ref(str(checkout.path), "HEAD") == first
+            assert (checkout.path / "app.py").read_text() == "v1\n"
+        finally:
+            checkout.release()
@@ -0,0 +1,74 @@
+from pathlib import Path
+
+import pytest
+import yaml
+
+from src import quick_report
+from src.quick_report import build_report
+from src.section_router import SectionRouter, split_report, validate_tags
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "crew_config.yaml"
+
+
+@pytest.fixture
+def report(tmp_path, monkeypatch):
+    monkeypatch.setattr(quick_report, "HASH_INDEX_PATH", tmp_path / "hash_index.sqlite3")
+    repo = tmp_path / "repo"
+    (repo / "src").mkdir(parents=True)
+    (repo / "tests").mkdir()
+    (repo / "docs").mkdir()
+    (repo / "README.md").write_text("# Projeto\n\nDescrição.\n\n---\n\nRodapé do README.\n")
+    (repo / "LICENSE").write_text("MIT License\n\nCopyright (c) 2024 Fulano\n")
+    (repo / "pyproject.toml").write_text('[project]\nname = "projeto"\ndependencies = ["httpx"]\n')
+    (repo / "main.py").write_text("from src import core\n\ncore.run()\n")
+    (repo / "src" / "__init__.py").write_text("")
+    (repo / "src" / "core.py").write_text("def run():\n    return 'ok_core'\n")
+    (repo / "tests" / "test_core.py").write_text("def test_run():\n    assert 'ok_teste'\n")
+    (repo / "docs" / "guia.md").write_text("# Guia\n\nComo usar o projeto.\n")
+    return build_report(str(repo), use_hash_index=False).text
+
+
+class TestQuickReportSections:
+    def test_new_sections_are_written(self, report):
+        for title in ("## 📜 Licenças", "## 🧾 Manifestos", "## 🧪 Testes", "## 📚 Documentação"):
+            assert title in report
+        assert "MIT License" in report
+        assert "httpx" in report
+
+
+class TestSectionRouter:
+    def test_pieces_reproduce_report(self, report):
+        assert "".join(piece.text for piece in split_report(report)) == report
+
+    def test_all_or_none_returns_full_report(self, report):
+        router = SectionRouter(report)
+        assert router.route(None) == report
+        assert router.route(["all"]) == report
+
+    def test_licenses_slice_has_no_code(self, report):
+        sliced = SectionRouter(report).route(["licenses"])
+        assert "MIT License" in sliced
+        assert "# 📊 Relatório Técnico da Codebase" in sliced
+        assert "### src/core.py" not in sliced and "## 🧬" not in sliced
+        assert len(sliced) < len(report)
+
+    def test_code_dir_excludes_tests(self, report):
+        sliced = SectionRouter(report).route(["code:src"])
+        assert "### src/core.py" in sliced
+        assert "### tests/test_core.py" not in sliced
+        assert "## 🧬 Estrutura do Código Python" in sliced
+
+    def test_footer_always_included(self, report):
+        footer = report[report.rindex("\n---\n") :]
+        assert SectionRouter(report).route(["readme"]).endswith(footer)
+
+    def test_unknown_tags_raise(self, report):
+        with pytest.raises(ValueError, match="desconhecidas"):
+            SectionRouter(report).route(["licencas"])
+
+    def test_project_config_tags_are_valid(self):
+        tasks = yaml.safe_load(CONFIG_PATH.read_text(encoding="utf-8"))["tasks"]
+        declared = [data["sections"] for data in tasks.values() if "sections" in data]
+        assert declared
+        for tags in declared:
+            validate_tags(tags)
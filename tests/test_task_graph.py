@@ -0,0 +1,135 @@
+import contextvars
+import threading
+import time
+from pathlib import Path
+
+import pytest
+import yaml
+
+from src.task_graph import (
+    DagScheduler,
+    critical_path,
+    sink_task,
+    task_dependencies,
+    topological_order,
+)
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "crew_config.yaml"
+
+
+class TestTaskDependencies:
+    def test_missing_depends_on_means_all_previous(self):
+        deps = task_dependencies({"a": {}, "b": {"depends_on": []}, "c": {}})
+        assert deps == {"a": [], "b": [], "c": ["a", "b"]}
+
+    def test_unknown_dependency_and_cycle(self):
+        with pytest.raises(ValueError, match="inexistentes"):
+            task_dependencies({"a": {"depends_on": ["x"]}})
+        with pytest.raises(ValueError, match="Ciclo"):
+            task_dependencies({"a": {"depends_on": ["b"]}, "b": {"depends_on": ["a"]}})
+
+    def test_topological_order_is_stable(self):
+        order = topological_order({"s": ["a", "b"], "a": [], "b": ["a"], "c": []})
+        assert order == ["a", "c", "b", "s"]
+
+    def test_project_config_synthesis_depends_on_all_specialists(self):
+        tasks = yaml.safe_load(CONFIG_PATH.read_text(encoding="utf-8"))["tasks"]
+        deps = task_dependencies(tasks)
+        synthesis = list(tasks)[-1]
+        assert set(deps[synthesis]) == set(tasks) - {synthesis}
+        assert sum(1 for key in tasks if not deps[key]) >= 5
+
+    def test_sink_task_is_the_single_task_without_dependents(self):
+        assert sink_task({"a": [], "b": [], "s": ["a", "b"]}) == "s"
+        # A síntese não precisa ser a última do YAML
+        assert sink_task({"s": ["a", "b"], "a": [], "b": []}) == "s"
+        with pytest.raises(ValueError, match="única task final"):
+            sink_task({"a": [], "b": [], "s": ["a"]})
+
+    def test_critical_path(self):
+        deps = {"a": [], "b": [], "s": ["a", "b"]}
+        assert critical_path(deps, {"a": 1.0, "b": 3.0, "s": 2.0}) == 5.0
+
+
+class TestDagScheduler:
+    def test_runs_independent_tasks_concurrently_with_cap(self):
+        deps = {key: [] for key in "abcde"} | {"s": list("abcde")}
+        running, peak = [0], [0]
+        lock = threading.Lock()
+        seen_context = {}
+
+        def run(key, context):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            seen_context[key] = context
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return f"saída {key}"
+
+        start = time.perf_counter()
+        outputs = DagScheduler(deps, max_workers=3).run(run)
+        elapsed = time.perf_counter() - start
+
+        assert peak[0] == 3
+        assert outputs["s"] == "saída s"
+        assert seen_context["s"] == {key: f"saída {key}" for key in "abcde"}
+        # 5 tasks independentes em 2 ondas de 3 + síntese, em vez de 6 em sequência
+        assert elapsed < 6 * 0.05
+
+    def test_same_resource_never_overlaps(self):
+        deps = {"a": [], "b": [], "c": []}
+        active: set[str] = set()
+        overlap = []
+
+        def run(key, context):
+            agent = "meta" if key in "ab" else key
+            if agent in active:
+                overlap.append(key)
+            active.add(agent)
+            time.sleep(0.03)
+            active.discard(agent)
+            return key
+
+        DagScheduler(deps, max_workers=3, resources={"a": "meta", "b": "meta"}).run(run)
+        assert overlap == []
+
+    def test_done_tasks_are_skipped_and_feed_dependents(self):
+        calls = []
+
+        def run(key, context):
+            calls.append((key, context))
+            return key.upper()
+
+        outputs = DagScheduler({"a": [], "b": [], "s": ["a", "b"]}).run(run, done={"a": "salva"})
+        assert [key for key, _ in calls if key != "s"] == ["b"]
+        assert dict(calls)["s"] == {"a": "salva", "b": "B"}
+        assert outputs == {"a": "salva", "b": "B", "s": "S"}
+
+    def test_failure_stops_dependents_and_propagates(self):
+        calls = []
+
+        def run(key, context):
+            calls.append(key)
+            if key == "a":
+                raise RuntimeError("rate limit")
+            time.sleep(0.02)
+            return key
+
+        with pytest.raises(RuntimeError, match="rate limit"):
+            DagScheduler({"a": [], "b": [], "s": ["a", "b"]}, max_workers=2).run(run)
+        assert "s" not in calls and "b" in calls
+
+    def test_tasks_run_in_the_caller_context(self):
+        analysis = contextvars.ContextVar("analysis", default=None)
+        analysis.set("a1")
+        seen = {}
+
+        def run(key, context):
+            seen[key] = (analysis.get(), threading.current_thread().name)
+            return key
+
+        DagScheduler({"a": [], "b": []}, max_workers=2).run(run)
+        assert {value for value, _ in seen.values()} == {"a1"}
+        assert all(name.startswith("task") for _, name in seen.values())
@@ -0,0 +1,98 @@
+import json
+from pathlib import Path
+
+import pytest
+import yaml
+
+from src.token_budget import (
+    BudgetExceededError,
+    TokenBudget,
+    TokenLedger,
+    estimate_usage,
+    summary_path,
+)
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "crew_config.yaml"
+PRICING = {"gemini/gemini-2.5-flash": {"prompt": 0.30, "completion": 2.50}}
+
+
+class TestTokenBudget:
+    def test_from_config_validates(self):
+        with pytest.raises(ValueError, match="on_exceed"):
+            TokenBudget.from_config({"on_exceed": "ignorar"})
+        with pytest.raises(ValueError, match="downgrade_model"):
+            TokenBudget.from_config({"on_exceed": "downgrade"})
+        assert TokenBudget.from_config(None).max_tokens_per_run is None
+
+    def test_project_config_is_valid(self):
+        data = yaml.safe_load(CONFIG_PATH.read_text(encoding="utf-8"))["token_budgets"]
+        budget = TokenBudget.from_config(data)
+        assert budget.max_tokens_per_task < budget.max_tokens_per_run
+
+    def test_cost_per_million_tokens(self):
+        budget = TokenBudget(pricing=PRICING)
+        assert budget.cost("gemini/gemini-2.5-flash", 1_000_000, 100_000) == pytest.approx(0.55)
+        assert budget.cost("gemini-2.5-flash", 1_000_000, 0) == pytest.approx(0.30)
+        assert budget.cost("outro", 1_000_000, 0) == 0
+
+
+class TestTokenLedger:
+    def test_aggregates_by_task_agent_and_model(self):
+        ledger = TokenLedger(TokenBudget(pricing=PRICING))
+        ledger.record("arq", "arquiteto", "gemini/gemini-2.5-flash", 1000, 200)
+        ledger.record("arq", "arquiteto", "gemini/gemini-2.5-flash", 500, 100)
+        ledger.record("legal", "advogado", "gemini/gemini-2.5-flash", 300, 50, estimated=True)
+
+        summary = ledger.summary()
+        assert summary["total"]["total_tokens"] == 2150
+        assert summary["total"]["calls"] == 3 and summary["total"]["estimated_calls"] == 1
+        assert summary["tasks"]["arq"]["prompt_tokens"] == 1500
+        assert summary["agents"]["advogado"]["completion_tokens"] == 50
+        assert summary["total"]["cost_usd"] > 0
+        assert "Total" in ledger.format_table()
+
+    def test_task_budget_aborts(self):
+        ledger = TokenLedger(TokenBudget(max_tokens_per_task=1000))
+        assert ledger.check("arq") is None
+        ledger.record("arq", "arquiteto", "m", 900, 200)
+        assert ledger.check("legal") is None
+        with pytest.raises(BudgetExceededError) as exc:
+            ledger.check("arq")
+        assert exc.value.scope == "task" and exc.value.used == 1100
+        assert ledger.summary()["aborted_tasks"] == {"arq": "task"}
+
+    def test_task_budget_downgrades_then_aborts(self):
+        budget = TokenBudget(
+            max_tokens_per_task=1000, on_exceed="downgrade", downgrade_model="lite"
+        )
+        ledger = TokenLedger(budget)
+        ledger.record("arq", "arquiteto", "m", 1000, 0)
+        assert ledger.check("arq") == "lite"
+        ledger.record("arq", "arquiteto", "lite", 500, 0)
+        assert ledger.check("arq") == "lite"
+        ledger.record("arq", "arquiteto", "lite", 500, 0)
+        with pytest.raises(BudgetExceededError, match="2,000"):
+            ledger.check("arq")
+        assert ledger.summary()["downgraded_tasks"] == {"arq": "lite"}
+
+    def test_run_budget_aborts_every_task(self):
+        budget = TokenBudget(max_tokens_per_run=1000, on_exceed="downgrade", downgrade_model="lite")
+        ledger = TokenLedger(budget)
+        ledger.record("arq", "arquiteto", "m", 600, 0)
+        ledger.record("legal", "advogado", "m", 600, 0)
+        with pytest.raises(BudgetExceededError) as exc:
+            ledger.check("outra")
+        assert exc.value.scope == "run"
+
+    def test_write_json_next_to_report(self, tmp_path):
+        ledger = TokenLedger()
+        ledger.record("arq", "arquiteto", "m", 10, 5)
+        path = ledger.write_json(summary_path(tmp_path / "relatorio_final_x.md"))
+        assert path.name == "relatorio_final_x.tokens.json"
+        assert json.loads(path.read_text())["tasks"]["arq"]["total_tokens"] == 15
+
+
+def test_estimate_usage():
+    messages = [{"role": "user", "content": "a" * 40}, {"role": "system", "content": None}]
+    assert estimate_usage(messages, "b" * 8) == (11, 2)
+    assert estimate_usage("abcd", None) == (1, 0)
@@ -111,6 +111,10 @@ class ConfigLoader:
         """Retorna configurações operacionais"""
         return cast(Dict[str, Any], self.config.get('operational_settings', {}))
     
+    def get_token_budgets(self) -> Dict[str, Any]:
+        """Retorna orçamentos de tokens e preços por modelo"""
+        return cast(Dict[str, Any], self.config.get('token_budgets', {}))
+    
     def get_crew_name(self) -> str:
         """Retorna nome da crew"""
         return cast(str, self.config.get('crew_config', {}).get('name', 'CrewAI'))